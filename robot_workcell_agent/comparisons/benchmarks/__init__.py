@@ -0,0 +1 @@
+"""Micro-benchmarks for the skill scripts used by the comparison pipelines."""
@@ -0,0 +1,63 @@
+"""
+Shared helpers for the skill-script benchmarks.
+
+Skill scripts live under skills/*/scripts/ and are not a package, so they
+are loaded by file path the same way the runtime locates them.
+"""
+
+import importlib.util
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+SKILLS_DIR = Path(__file__).parent.parent.parent / "skills"
+
+
+def load_skill_script(skill_name: str, script_name: str):
+    """Import skills/<skill_name>/scripts/<script_name>.py as a module."""
+    module_name = f"_bench_{skill_name}_{script_name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    script_path = SKILLS_DIR / skill_name / "scripts" / f"{script_name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def random_layout_inputs(count: int, seed: int = 0, max_length: float = 3.0) -> List[Dict[str, Any]]:
+    """
+    Random layout_generator inputs in the ranges seen in Stage 1 outputs.
+
+    ``max_length`` stretches conveyor/pallet/pedestal footprints to exercise
+    large or oddly shaped components.
+    """
+    rng = random.Random(seed)
+
+    def dims(lo, hi, h_lo, h_hi):
+        return [round(rng.uniform(lo[0], hi[0]), 3),
+                round(rng.uniform(lo[1], hi[1]), 3),
+                round(rng.uniform(h_lo, h_hi), 3)]
+
+    inputs = []
+    for _ in range(count):
+        reach = round(rng.uniform(0.5, 1.3), 3)
+        inputs.append({
+            "robot": {"name": "ur5e", "reach_max": reach, "reach_min": 0.20},
+            "pedestal": {"dimensions": dims((0.3, 0.3), (min(1.0, max_length), min(1.0, max_length)), 0.3, 0.8)},
+            "conveyor": {"dimensions": dims((0.8, 0.3), (max_length, 1.0), 0.5, 1.0)},
+            "pallet": {"dimensions": dims((0.6, 0.5), (max(1.4, max_length / 2), max(1.2, max_length / 2)), 0.1, 0.2)},
+            "box": {"dimensions": dims((0.1, 0.1), (0.5, 0.5), 0.1, 0.5)},
+        })
+    return inputs
+
+
+def time_per_call(fn: Callable[[], Any], repeat: int) -> float:
+    """Mean wall-clock seconds per call of ``fn`` over ``repeat`` calls."""
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
@@ -0,0 +1,79 @@
+"""
+Benchmark of Stage 3 validation modes: full physics vs kinematic.
+
+Solves a series of Stage 2 layouts for the catalog asset set (as in
+genesis_template.py) and runs the six-phase cycle on each in one template
+scene twice: stepping rigid-body dynamics ("mode": "physics") and setting
+joints along the planned paths with per-waypoint collision checks
+("mode": "kinematic"). Reports wall time per layout and whether both modes
+reach the same verdict. Requires Genesis and the component catalog.
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.genesis_modes --layouts 5
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+from comparisons.benchmarks.common import load_skill_script
+from comparisons.benchmarks.genesis_template import catalog_stage1
+from comparisons.shared.stage_scripts import fix_genesis_paths, prepare_genesis_input
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genesis physics vs kinematic validation benchmark")
+    parser.add_argument("--layouts", type=int, default=5, help="Layouts of the same assets")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("genesis") is None:
+        print("genesis is not installed - nothing to benchmark")
+        sys.exit(1)
+
+    os.environ["PLACEMENT_CACHE_PATH"] = "off"
+    core = load_skill_script("placement_solver", "placement_core")
+    inputs = []
+    for i in range(args.layouts):
+        stage1 = catalog_stage1(0.75 + 0.25 * i / max(1, args.layouts - 1))
+        genesis_input = fix_genesis_paths(prepare_genesis_input(stage1, core.solve(stage1, verbose=False)))
+        # Caches off so both modes solve and plan every phase themselves
+        inputs.append(dict(genesis_input, execute_trajectory=True, ik_cache=False, plan_cache=False))
+    if not all(c.get("urdf") and os.path.exists(c["urdf"]) for c in inputs[0]["components"]):
+        print("component catalog files not found - nothing to benchmark")
+        sys.exit(1)
+
+    bae = load_skill_script("genesis_scene_builder", "build_and_execute")
+    bae.init_genesis(headless=True)
+    templates = bae.TemplateScenes(headless=True)
+
+    rows = {}
+    for mode in bae.SIM_MODES:
+        wall, verdicts, phases = [], [], []
+        for genesis_input in inputs:
+            request = bae.parse_request(dict(genesis_input, mode=mode))
+            handle, _ = templates.scene_for(request["components"])
+            t0 = time.perf_counter()
+            result = bae.execute_request(handle, request)
+            wall.append(time.perf_counter() - t0)
+            verdicts.append(result.get("trajectory_status"))
+            phases.append(result.get("phases_completed", 0))
+        rows[mode] = (wall, verdicts, phases)
+    templates.clear()
+
+    print(f"{'Mode':<10} {'s/layout':>9} {'total s':>8} {'passed':>7}  phases completed")
+    print("-" * 60)
+    for mode, (wall, verdicts, phases) in rows.items():
+        print(f"{mode:<10} {sum(wall) / len(wall):>9.2f} {sum(wall):>8.2f} "
+              f"{verdicts.count('success'):>7}  {phases}")
+    physics, kinematic = rows["physics"], rows["kinematic"]
+    print(f"kinematic speedup: {sum(physics[0]) / max(sum(kinematic[0]), 1e-9):.1f}x")
+    same = physics[1] == kinematic[1]
+    print("verdicts agree" if same else "verdicts differ")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
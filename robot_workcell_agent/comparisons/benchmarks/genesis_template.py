@@ -0,0 +1,105 @@
+"""
+Benchmark of Genesis template scenes: rebuild vs reposition per layout.
+
+Solves a series of Stage 2 layouts for the same asset set (UR5e, pedestal,
+conveyor, euro pallet, carton; the robot reach is varied so conveyor and
+pallet move), then sets up one scene per layout twice: with a fresh
+scene.build() each time, and through a TemplateScenes pool that builds once
+and repositions the entities. With --batched the same layouts also run as
+parallel environments of one scene (scene.build(n_envs=N), lockstep cycle).
+Requires Genesis and the component catalog.
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.genesis_template --layouts 5 [--trajectory] [--batched]
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+from comparisons.benchmarks.common import load_skill_script
+from comparisons.shared.stage_scripts import fix_genesis_paths, prepare_genesis_input
+
+
+def catalog_stage1(reach):
+    return {
+        "robot_selection": {"model": "ur5e", "reach_m": reach},
+        "task_specification": {"dimensions": [0.2, 0.2, 0.2]},
+        "workcell_components": [
+            {"component_type": "pedestal", "name": "robot_pedestal", "dimensions": [0.6, 0.6, 0.5]},
+            {"component_type": "conveyor", "name": "conveyor_belt", "dimensions": [2.0, 0.64, 0.82]},
+            {"component_type": "pallet", "name": "euro_pallet", "dimensions": [1.2, 0.8, 0.15]},
+            {"component_type": "carton", "name": "cardboard_box", "dimensions": [0.2, 0.2, 0.2]},
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genesis template scene benchmark")
+    parser.add_argument("--layouts", type=int, default=5, help="Layouts of the same assets")
+    parser.add_argument("--trajectory", action="store_true", help="Also run the pick-and-place cycle per layout")
+    parser.add_argument("--batched", action="store_true", help="Also run all layouts as one batched scene")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("genesis") is None:
+        print("genesis is not installed - nothing to benchmark")
+        sys.exit(1)
+
+    os.environ["PLACEMENT_CACHE_PATH"] = "off"
+    core = load_skill_script("placement_solver", "placement_core")
+    inputs = []
+    for i in range(args.layouts):
+        stage1 = catalog_stage1(0.75 + 0.25 * i / max(1, args.layouts - 1))
+        genesis_input = fix_genesis_paths(prepare_genesis_input(stage1, core.solve(stage1, verbose=False)))
+        inputs.append(dict(genesis_input, execute_trajectory=args.trajectory))
+    if not all(c.get("urdf") and os.path.exists(c["urdf"]) for c in inputs[0]["components"]):
+        print("component catalog files not found - nothing to benchmark")
+        sys.exit(1)
+
+    bae = load_skill_script("genesis_scene_builder", "build_and_execute")
+    bae.init_genesis(headless=True)
+
+    rows = []
+    for label, reuse in (("rebuild", False), ("template", True)):
+        templates = bae.TemplateScenes(headless=True, reuse=reuse)
+        setup, total, ok = [], [], 0
+        for genesis_input in inputs:
+            request = bae.parse_request(genesis_input)
+            t0 = time.perf_counter()
+            handle, _ = templates.scene_for(request["components"])
+            setup.append(time.perf_counter() - t0)
+            result = bae.execute_request(handle, request)
+            total.append(time.perf_counter() - t0)
+            ok += bool(result.get("success"))
+        rows.append((label, setup, total, ok, dict(templates.stats)))
+        templates.clear()
+
+    print(f"{'Mode':<9} {'setup s/layout':>15} {'first s':>8} {'total s':>8} {'ok':>4}  scenes")
+    print("-" * 70)
+    for label, setup, total, ok, stats in rows:
+        later = setup[1:] or setup
+        print(f"{label:<9} {sum(later) / len(later):>15.3f} {setup[0]:>8.2f} {sum(total):>8.2f} "
+              f"{ok:>4}  built={stats['built']} repositioned={stats['repositioned']} reset={stats['reset']}")
+    speedup = (sum(rows[0][1][1:]) or 1e-9) / (sum(rows[1][1][1:]) or 1e-9)
+    print(f"per-layout setup speedup after the first build: {speedup:.1f}x")
+
+    same = rows[0][3] == rows[1][3]
+    if args.batched:
+        base = {k: v for k, v in inputs[0].items() if k != "components"}
+        layouts = [{"components": gi["components"], "motion_targets": gi["motion_targets"]} for gi in inputs]
+        t0 = time.perf_counter()
+        batch = bae.run_layouts_batched(dict(base, layouts=layouts, batched=True, headless=True))
+        total = time.perf_counter() - t0
+        passed = batch.get("passed", len(inputs) if batch.get("success") else 0)
+        print(f"batched   build {batch.get('build_s', 0):.2f}s  total {total:.2f}s  "
+              f"({total / len(inputs):.2f}s/layout)  ok={passed}")
+        if args.trajectory:
+            same = same and passed == rows[1][3]
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
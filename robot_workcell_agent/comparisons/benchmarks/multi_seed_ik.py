@@ -0,0 +1,77 @@
+"""
+Benchmark of multi-seed IK (solve_pose_ik + rank_ik_solutions) against a single seed.
+
+For each robot model: random downward-facing TCP poses inside the reach
+envelope are solved from the reference configuration alone and from K
+seeds (the reference plus uniform samples within the joint limits) in one
+batched call. Reports the success rate, the mean joint distance to the
+reference and the mean limit margin of the chosen solution, and the time
+per target.
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.multi_seed_ik --targets 100 --seeds 16
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from comparisons.benchmarks.common import load_skill_script
+
+
+def solve(kinematics, spec, poses, seeds_for):
+    """(success rate, mean joint distance, mean limit margin, ms per target) over ``poses``."""
+    reference = np.clip(np.zeros(len(spec["limits"])), *np.array(spec["limits"]).T)
+    dists, margins, solved = [], [], 0
+    t0 = time.perf_counter()
+    for pose in poses:
+        q, converged, _ = kinematics.solve_pose_ik(spec, pose, seeds_for(reference))
+        best, dist, margin = kinematics.rank_ik_solutions(spec, q, converged, reference)
+        if best is not None:
+            solved += 1
+            dists.append(dist[best])
+            margins.append(margin[best])
+    ms = 1e3 * (time.perf_counter() - t0) / len(poses)
+    mean = lambda values: float(np.mean(values)) if values else float("nan")  # noqa: E731
+    return solved / len(poses), mean(dists), mean(margins), ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-seed IK benchmark")
+    parser.add_argument("--targets", type=int, default=100, help="Random poses per model")
+    parser.add_argument("--seeds", type=int, default=16, help="Seeds per pose in the batched solve")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    kinematics = load_skill_script("placement_solver", "kinematics")
+    ur_ik = load_skill_script("placement_solver", "ur_ik")
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'Model':<7} {'seeds':>5} {'solved %':>9} {'joint dist':>11} {'limit margin':>13} {'ms/target':>10}")
+    print("-" * 60)
+    ok_all = True
+    for model, spec in kinematics.ROBOT_KINEMATICS.items():
+        reach = spec["reach"]
+        radius = reach * np.sqrt(rng.uniform(0.2, 0.8, args.targets))
+        angle = rng.uniform(-np.pi, np.pi, args.targets)
+        points = np.stack([radius * np.cos(angle), radius * np.sin(angle),
+                           rng.uniform(-0.2, 0.4, args.targets) * reach], axis=1)
+        poses = ur_ik.down_poses(points, rng.uniform(-np.pi / 2, np.pi / 2, args.targets))
+        lo, hi = np.array(spec["limits"]).T
+        lo, hi = np.maximum(lo, -np.pi), np.minimum(hi, np.pi)
+
+        single = solve(kinematics, spec, poses, lambda ref: ref[None])
+        multi = solve(kinematics, spec, poses, lambda ref: np.vstack(
+            [ref, rng.uniform(lo, hi, (args.seeds - 1, len(lo)))]))
+        for seeds, (rate, dist, margin, ms) in ((1, single), (args.seeds, multi)):
+            print(f"{model:<7} {seeds:>5} {100 * rate:>8.1f}% {dist:>11.3f} {margin:>13.3f} {ms:>10.2f}")
+        ok_all &= multi[0] >= single[0]
+
+    sys.exit(0 if ok_all else 1)
+
+
+if __name__ == "__main__":
+    main()
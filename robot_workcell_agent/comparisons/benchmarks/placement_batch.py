@@ -0,0 +1,60 @@
+"""
+Benchmark + byte-identity check for the vectorized batch layout API.
+
+Solves N random layouts with ``calculate_layouts`` in one call and with
+the scalar ``calculate_layout`` in a Python loop, then compares the JSON
+of every entry.
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.placement_batch --layouts 10000
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from comparisons.benchmarks.common import load_skill_script, random_layout_inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch layout API benchmark")
+    parser.add_argument("--layouts", type=int, default=10000, help="Random layouts to solve")
+    parser.add_argument("--max-length", type=float, default=3.0,
+                        help="Largest conveyor/pallet footprint edge in metres")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    solver = load_skill_script("placement_solver", "placement_core")
+    inputs = random_layout_inputs(args.layouts, seed=args.seed, max_length=args.max_length)
+    config_jsons = [json.dumps(i) for i in inputs]
+    batch = solver.stack_layout_inputs(inputs)
+
+    mismatches = 0
+    print(f"{'Mode':<8} {'scalar ms':>12} {'batch ms':>12} {'+dicts ms':>12} {'speed-up':>10} {'mismatches':>12}")
+    print("-" * 71)
+    for mode in ("grid", "tight"):
+        t0 = time.perf_counter()
+        scalar = [solver.calculate_layout(cj, offset_mode=mode, verbose=False) for cj in config_jsons]
+        t_scalar = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        layouts = solver.calculate_layouts(batch, offset_mode=mode)
+        t_batch = time.perf_counter() - t0
+        vectorized = solver.layouts_to_dicts(layouts)
+        t_dicts = time.perf_counter() - t0
+
+        mode_mismatches = sum(
+            json.dumps(a) != json.dumps(b) for a, b in zip(scalar, vectorized)
+        )
+        mismatches += mode_mismatches
+        print(f"{mode:<8} {t_scalar * 1e3:>12.1f} {t_batch * 1e3:>12.1f} {t_dicts * 1e3:>12.1f} "
+              f"{t_scalar / t_batch:>9.1f}x {mode_mismatches:>12}")
+
+    print(f"\n{len(inputs)} layouts per mode")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark of the persistent placement layout cache.
+
+Solves random layouts through ``cached_solve_layout`` against a throwaway
+SQLite file: the first pass is all misses, the second all hits. Also checks
+that hits return exactly the solved layout and that the LRU bound holds.
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.placement_cache --layouts 30 --mode reach
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from comparisons.benchmarks.common import load_skill_script, random_layout_inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Placement layout cache benchmark")
+    parser.add_argument("--layouts", type=int, default=30, help="Distinct random layouts")
+    parser.add_argument("--mode", default="reach", choices=["greedy", "reach", "pso"])
+    parser.add_argument("--max-entries", type=int, default=20, help="LRU bound for the eviction check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    solver = load_skill_script("placement_solver", "placement_core")
+    inputs = random_layout_inputs(args.layouts, seed=args.seed)
+    options = {"layout_mode": args.mode}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["PLACEMENT_CACHE_PATH"] = str(Path(tmp) / "cache.sqlite3")
+        os.environ["PLACEMENT_CACHE_MAX_ENTRIES"] = str(max(args.layouts, args.max_entries))
+        passes, first = [], None
+        for label in ("miss", "hit"):
+            times, layouts = [], []
+            for layout_input in inputs:
+                t0 = time.perf_counter()
+                solved, info = solver.cached_solve_layout(layout_input, options, [], verbose=False)
+                times.append(time.perf_counter() - t0)
+                layouts.append(solved)
+            passes.append((label, times, info))
+            first = first or layouts
+        same = layouts == first
+
+        print(f"{'Pass':<6} {'mean ms':>9} {'max ms':>9} {'hits':>6} {'misses':>7}")
+        print("-" * 42)
+        for label, times, info in passes:
+            print(f"{label:<6} {1e3 * sum(times) / len(times):>9.2f} {1e3 * max(times):>9.2f} "
+                  f"{info['hits']:>6} {info['misses']:>7}")
+        print(f"hits identical to solved layouts: {same}")
+
+        # LRU bound: a fresh cache limited to max_entries keeps only the newest keys
+        cache = solver.LayoutCache(Path(tmp) / "lru.sqlite3", max_entries=args.max_entries)
+        for i, layout_input in enumerate(inputs):
+            cache.put(solver.layout_fingerprint(layout_input, options, []), {"i": i})
+        stats = cache.stats()
+        newest = solver.layout_fingerprint(inputs[-1], options, [])
+        bounded = stats["entries"] == min(args.max_entries, len(inputs)) and cache.get(newest) == {"i": len(inputs) - 1}
+        cache.close()
+        print(f"LRU: {stats['entries']} entries (bound {args.max_entries}), "
+              f"{stats['evictions']} evicted, newest kept: {bounded}")
+
+    sys.exit(0 if same and bounded else 1)
+
+
+if __name__ == "__main__":
+    main()
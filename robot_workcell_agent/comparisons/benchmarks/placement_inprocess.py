@@ -0,0 +1,81 @@
+"""
+Benchmark of Stage 2 latency: solve_placement.py subprocess vs in-process solve().
+
+Runs the same Stage 1 inputs through the CLI script (what every caller used
+to do) and through ``placement_core.solve`` in-process, with the layout
+cache disabled so both paths really solve, and checks the results match.
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.placement_inprocess --layouts 20
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from comparisons.benchmarks.common import SKILLS_DIR, load_skill_script, random_layout_inputs
+
+
+def stage1_from_layout_input(layout_input):
+    """Minimal Stage 1 dict the placement solver maps back onto ``layout_input``."""
+    return {
+        "robot_selection": {"model": layout_input["robot"]["name"], "reach_m": layout_input["robot"]["reach_max"]},
+        "task_specification": {"dimensions": layout_input["box"]["dimensions"]},
+        "workcell_components": [
+            {"component_type": part, "name": f"bench_{part}", "mjcf_path": f"{part}.xml",
+             "dimensions": layout_input[part]["dimensions"]}
+            for part in ("pedestal", "conveyor", "pallet")
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Placement solver in-process vs subprocess benchmark")
+    parser.add_argument("--layouts", type=int, default=20, help="Random Stage 1 inputs")
+    parser.add_argument("--mode", default="greedy", choices=["greedy", "reach", "pso"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ["PLACEMENT_CACHE_PATH"] = "off"
+    core = load_skill_script("placement_solver", "placement_core")
+    script = SKILLS_DIR / "placement_solver" / "scripts" / "solve_placement.py"
+    stage1s = [dict(stage1_from_layout_input(li), solver_options={"layout_mode": args.mode})
+               for li in random_layout_inputs(args.layouts, seed=args.seed)]
+
+    sub_times, sub_results = [], []
+    for stage1 in stage1s:
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, str(script)], input=json.dumps(stage1),
+                              capture_output=True, text=True, check=True)
+        sub_results.append(json.loads(proc.stdout))
+        sub_times.append(time.perf_counter() - t0)
+
+    in_times, in_results = [], []
+    for stage1 in stage1s:
+        t0 = time.perf_counter()
+        in_results.append(core.solve(stage1, verbose=False))
+        in_times.append(time.perf_counter() - t0)
+
+    # PSO is time-budgeted, so only deterministic modes are compared exactly
+    drop = ("pso_stats",)
+    same = all({k: v for k, v in a.items() if k not in drop} == {k: v for k, v in b.items() if k not in drop}
+               for a, b in zip(sub_results, in_results)) if args.mode != "pso" else None
+
+    def row(label, times):
+        print(f"{label:<12} {1e3 * sum(times) / len(times):>10.3f} {1e3 * sorted(times)[len(times) // 2]:>10.3f} "
+              f"{1e3 * max(times):>10.3f}")
+
+    print(f"{'Path':<12} {'mean ms':>10} {'median ms':>10} {'max ms':>10}")
+    print("-" * 46)
+    row("subprocess", sub_times)
+    row("in-process", in_times)
+    print(f"speed-up (mean): {sum(sub_times) / sum(in_times):.0f}x, identical results: {same}")
+    sys.exit(0 if same in (True, None) else 1)
+
+
+if __name__ == "__main__":
+    main()
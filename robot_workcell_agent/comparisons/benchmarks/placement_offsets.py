@@ -0,0 +1,82 @@
+"""
+Benchmark + equivalence check for the placement solver offset modes.
+
+Compares the original 0.05 m stepping loop ("reference") against the
+closed-form separating-offset solver ("grid" and "tight").
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.placement_offsets --layouts 500
+"""
+
+import argparse
+import json
+import sys
+
+from comparisons.benchmarks.common import load_skill_script, random_layout_inputs, time_per_call
+
+
+def check_equivalence(solver, inputs) -> int:
+    """Return the number of inputs where "grid" differs from "reference"."""
+    mismatches = 0
+    for layout_input in inputs:
+        config_json = json.dumps(layout_input)
+        ref = solver.calculate_layout(config_json, offset_mode="reference", verbose=False)
+        grid = solver.calculate_layout(config_json, offset_mode="grid", verbose=False)
+        if json.dumps(ref) != json.dumps(grid):
+            mismatches += 1
+            print(f"MISMATCH for {config_json}:\n  reference={ref}\n  grid={grid}", file=sys.stderr)
+    return mismatches
+
+
+def check_tight(solver, inputs) -> int:
+    """Return the number of "tight" layouts that overlap or are looser than "grid"."""
+    bad = 0
+    for layout_input in inputs:
+        config_json = json.dumps(layout_input)
+        grid = solver.calculate_layout(config_json, offset_mode="grid", verbose=False)
+        tight = solver.calculate_layout(config_json, offset_mode="tight", verbose=False)
+        ped = layout_input["pedestal"]["dimensions"]
+        conv_ok = not solver.check_2d_overlap(tight["conveyor_pos"], layout_input["conveyor"]["dimensions"],
+                                              tight["pedestal_pos"], ped, solver.CONVEYOR_CLEARANCE)
+        pal_ok = not solver.check_2d_overlap(tight["pallet_pos"], layout_input["pallet"]["dimensions"],
+                                             tight["pedestal_pos"], ped, solver.PALLET_CLEARANCE)
+        tighter = (tight["conveyor_pos"][0] <= grid["conveyor_pos"][0]
+                   and tight["pallet_pos"][1] <= grid["pallet_pos"][1])
+        if not (conv_ok and pal_ok and tighter):
+            bad += 1
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Placement solver offset benchmark")
+    parser.add_argument("--layouts", type=int, default=500, help="Random layouts to check")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing passes over the layouts")
+    parser.add_argument("--max-length", type=float, default=6.0,
+                        help="Largest conveyor/pallet footprint edge in metres")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    solver = load_skill_script("placement_solver", "placement_core")
+    inputs = random_layout_inputs(args.layouts, seed=args.seed, max_length=args.max_length)
+    config_jsons = [json.dumps(i) for i in inputs]
+
+    mismatches = check_equivalence(solver, inputs)
+    bad_tight = check_tight(solver, inputs)
+
+    print(f"{'Mode':<12} {'us/layout':>12}")
+    print("-" * 26)
+    for mode in solver.OFFSET_MODES:
+        def run_all(mode=mode):
+            for cj in config_jsons:
+                solver.calculate_layout(cj, offset_mode=mode, verbose=False)
+        per_layout = time_per_call(run_all, args.repeat) / len(config_jsons)
+        print(f"{mode:<12} {per_layout * 1e6:>12.1f}")
+
+    print(f"\ngrid vs reference mismatches: {mismatches}/{len(inputs)}")
+    print(f"tight layouts overlapping or looser than grid: {bad_tight}/{len(inputs)}")
+    sys.exit(1 if mismatches or bad_tight else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark of the precomputed reachability maps.
+
+For every robot with a map in skills/placement_solver/reach_maps: times the
+memory-mapped load and batched lookups, and checks the map against a fresh
+damped-least-squares IK solve (different seeds) at random voxel centres.
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.placement_reachmap --samples 2000
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from comparisons.benchmarks.common import load_skill_script
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reachability map benchmark")
+    parser.add_argument("--samples", type=int, default=2000, help="Voxel centres re-solved with IK per robot")
+    parser.add_argument("--lookups", type=int, default=100000, help="Points per batched lookup")
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    solver = load_skill_script("placement_solver", "placement_core")
+    builder = load_skill_script("placement_solver", "build_reach_maps")
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'Model':<8} {'grid':>12} {'reach %':>8} {'load ms':>8} {'ns/pt':>7} {'IK ms/pt':>9} {'agree':>7}")
+    print("-" * 66)
+    ok = True
+    for model in builder.ROBOT_KINEMATICS:
+        t0 = time.perf_counter()
+        reach_map = solver.load_reach_map(model)
+        load_ms = 1e3 * (time.perf_counter() - t0)
+        if reach_map is None:
+            print(f"{model:<8} no map (run build_reach_maps.py)")
+            ok = False
+            continue
+
+        lo = reach_map.origin
+        hi = lo + reach_map.shape * reach_map.voxel
+        points = rng.uniform(lo, hi, size=(args.lookups, 3))
+        t0 = time.perf_counter()
+        reach_map.manipulability(points)
+        lookup_ns = 1e9 * (time.perf_counter() - t0) / args.lookups
+
+        # Re-solve IK at voxel centres, half of them drawn from reachable voxels
+        reachable = np.argwhere(np.asarray(reach_map.grid) > 0)
+        idx = np.concatenate([
+            reachable[rng.integers(0, len(reachable), args.samples // 2)],
+            rng.integers(0, reach_map.shape, size=(args.samples - args.samples // 2, 3)),
+        ])
+        centres = lo + (idx + 0.5) * reach_map.voxel
+        t0 = time.perf_counter()
+        ik = builder.solve_down_ik(builder.ROBOT_KINEMATICS[model], centres, rng=np.random.default_rng(args.seed + 1),
+                                   tool_length=reach_map.tool_length) > 0
+        ik_ms = 1e3 * (time.perf_counter() - t0) / len(centres)
+        agree = float((ik == reach_map.reachable(centres)).mean())
+        ok &= agree >= args.min_agreement
+
+        shape = "x".join(str(n) for n in reach_map.shape)
+        frac = 100.0 * len(reachable) / reach_map.grid.size
+        print(f"{model:<8} {shape:>12} {frac:>8.1f} {load_ms:>8.2f} {lookup_ns:>7.1f} {ik_ms:>9.3f} {agree:>7.3f}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
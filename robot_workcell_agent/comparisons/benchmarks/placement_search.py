@@ -0,0 +1,53 @@
+"""
+Benchmark of the placement solver layout modes (greedy / reach / pso).
+
+Reports per-layout latency, how often both targets end up inside the
+reach annulus, and the mean pick->place distance (cycle-time proxy).
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.placement_search --layouts 50
+"""
+
+import argparse
+import json
+import time
+
+from comparisons.benchmarks.common import load_skill_script, random_layout_inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Placement layout-mode benchmark")
+    parser.add_argument("--layouts", type=int, default=50, help="Random layouts to solve")
+    parser.add_argument("--time-budget", type=float, default=0.5, help="PSO time budget (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    solver = load_skill_script("placement_solver", "placement_core")
+    inputs = random_layout_inputs(args.layouts, seed=args.seed)
+
+    runners = {
+        "greedy": lambda cj: solver.calculate_layout(cj, verbose=False),
+        "reach": lambda cj: solver.optimize_layout(cj, verbose=False),
+        "pso": lambda cj: solver.pso_layout(cj, options={"time_budget_s": args.time_budget}, verbose=False),
+    }
+
+    print(f"{'Mode':<8} {'mean ms':>9} {'max ms':>9} {'reachable':>10} {'mean travel m':>14}")
+    print("-" * 54)
+    for mode, run in runners.items():
+        times, reachable, travel = [], 0, []
+        for layout_input in inputs:
+            cj = json.dumps(layout_input)
+            t0 = time.perf_counter()
+            layout = run(cj)
+            times.append(time.perf_counter() - t0)
+            check = layout.get("reach_check") or solver.reach_margins(
+                layout, layout_input["robot"]["reach_min"], layout_input["robot"]["reach_max"])
+            reachable += check["all_reachable"]
+            travel.append(check["pick_place_distance_m"])
+        print(f"{mode:<8} {1e3 * sum(times) / len(times):>9.2f} {1e3 * max(times):>9.2f} "
+              f"{reachable:>6}/{len(inputs):<3} {sum(travel) / len(travel):>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark of auxiliary component placement with the uniform-grid index.
+
+Places 4..500 random tables/bins/fences around the default layout, once
+with ``UniformGridIndex`` and once with an all-pairs index that sends
+every placed footprint to the narrow phase, and checks both produce the
+same positions.
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.placement_spatial --counts 4 50 100 250 500
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from comparisons.benchmarks.common import load_skill_script, random_layout_inputs
+
+
+def random_aux_dims(count, seed=0):
+    """Mix of table-, bin- and fence-panel-sized footprints."""
+    rng = np.random.default_rng(seed)
+    kinds = rng.integers(0, 3, count)
+    tables = np.stack([rng.uniform(0.8, 1.6, count), rng.uniform(0.6, 1.0, count)], axis=-1)
+    bins = np.stack([rng.uniform(0.3, 0.6, count), rng.uniform(0.3, 0.6, count)], axis=-1)
+    fences = np.stack([rng.uniform(1.0, 2.0, count), np.full(count, 0.05)], axis=-1)
+    xy = np.where((kinds == 0)[:, None], tables, np.where((kinds == 1)[:, None], bins, fences))
+    return [[round(x, 2), round(y, 2), 0.8] for x, y in xy.tolist()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auxiliary placement spatial-index benchmark")
+    parser.add_argument("--counts", type=int, nargs="+", default=[4, 16, 64, 128, 250, 500])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    solver = load_skill_script("placement_solver", "placement_core")
+
+    class AllPairsIndex(solver.UniformGridIndex):
+        """Broad phase disabled: every placed footprint is a candidate."""
+
+        def candidates(self, center, dim, yaw=0.0, clearance=0.0):
+            return list(range(len(self)))
+
+    layout_input = random_layout_inputs(1, seed=args.seed)[0]
+    layout = solver.calculate_layout(json.dumps(layout_input), verbose=False)
+
+    print(f"{'N':>5} {'grid ms':>9} {'grid tests':>11} {'all-pairs ms':>13} {'all-pairs tests':>16} "
+          f"{'speed-up':>9} {'same':>5}")
+    print("-" * 74)
+    ok = True
+    for count in args.counts:
+        aux_dims = random_aux_dims(count, seed=args.seed)
+        results = []
+        for index in (solver.UniformGridIndex(), AllPairsIndex()):
+            t0 = time.perf_counter()
+            positions, stats = solver.place_auxiliary_components(layout, layout_input, aux_dims,
+                                                                  index=index, verbose=False)
+            results.append((time.perf_counter() - t0, stats["narrow_tests"], positions))
+        (t_grid, n_grid, p_grid), (t_all, n_all, p_all) = results
+        same = p_grid == p_all
+        ok &= same
+        print(f"{count:>5} {1e3 * t_grid:>9.1f} {n_grid:>11} {1e3 * t_all:>13.1f} {n_all:>16} "
+              f"{t_all / t_grid:>8.1f}x {str(same):>5}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
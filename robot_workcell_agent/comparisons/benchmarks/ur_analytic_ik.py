@@ -0,0 +1,74 @@
+"""
+Benchmark of the closed-form UR IK (ur_ik.py) against iterative DLS IK.
+
+For each UR model: random downward-facing TCP targets inside the reach
+envelope are solved by ``ur_ik_down`` in one vectorized call and by the
+batched damped-least-squares solver the reachability maps are built with.
+Reports time per target, the forward-kinematics error of the analytic
+solutions, how often both methods agree on reachability, and the voxel
+map agreement.
+
+Usage:
+    cd robot_workcell_agent
+    python -m comparisons.benchmarks.ur_analytic_ik --targets 2000
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from comparisons.benchmarks.common import load_skill_script
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytic UR IK benchmark")
+    parser.add_argument("--targets", type=int, default=2000, help="Random targets per model")
+    parser.add_argument("--dls-targets", type=int, default=200, help="Targets also solved by DLS (slow)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ur_ik = load_skill_script("placement_solver", "ur_ik")
+    builder = load_skill_script("placement_solver", "build_reach_maps")
+    core = load_skill_script("placement_solver", "placement_core")
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'Model':<7} {'analytic us':>12} {'DLS us':>10} {'speedup':>8} {'max fk err':>11} "
+          f"{'reach %':>8} {'agree DLS':>10} {'agree map':>10}")
+    print("-" * 84)
+    ok_all = True
+    for model in ur_ik.UR_MODELS:
+        spec = ur_ik.ROBOT_KINEMATICS[model]
+        reach = spec["reach"]
+        radius = reach * np.sqrt(rng.uniform(0.0, 1.0, args.targets))
+        angle = rng.uniform(-np.pi, np.pi, args.targets)
+        points = np.stack([radius * np.cos(angle), radius * np.sin(angle),
+                           rng.uniform(-0.3, 0.6, args.targets) * reach], axis=1)
+
+        t0 = time.perf_counter()
+        solutions, valid = ur_ik.ur_ik_down(model, points)
+        analytic_us = 1e6 * (time.perf_counter() - t0) / len(points)
+        best = solutions[valid[:, 0], 0]
+        fk = ur_ik.tcp_pose(model, best)
+        fk_err = float(np.linalg.norm(fk[:, :3, 3] - points[valid[:, 0]], axis=1).max()) if len(best) else 0.0
+        reachable = ur_ik.ur_reachable(model, points)
+
+        sample = points[:args.dls_targets]
+        t0 = time.perf_counter()
+        dls = builder.solve_down_ik(spec, sample) > 0.0
+        dls_us = 1e6 * (time.perf_counter() - t0) / len(sample)
+        agree_dls = float(np.mean(dls == reachable[:len(sample)]))
+
+        reach_map = core.load_reach_map(model)
+        agree_map = float(np.mean(reach_map.reachable(points, [0.0, 0.0, 0.0]) == reachable)) if reach_map else float("nan")
+
+        print(f"{model:<7} {analytic_us:>12.2f} {dls_us:>10.0f} {dls_us / analytic_us:>7.0f}x {fk_err:>11.1e} "
+              f"{100 * reachable.mean():>7.1f}% {100 * agree_dls:>9.1f}% {100 * agree_map:>9.1f}%")
+        ok_all &= fk_err < 1e-6
+
+    sys.exit(0 if ok_all else 1)
+
+
+if __name__ == "__main__":
+    main()
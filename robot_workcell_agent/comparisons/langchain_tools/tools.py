@@ -62,6 +62,13 @@ def get_tool_definitions() -> list:
     def run_placement_solver(stage1_json: str) -> str:
         """Run the placement solver to calculate optimal positions for workcell
         components. Input: Stage 1 JSON as a string. Output: optimized layout JSON."""
+        from comparisons.shared.stage_scripts import placement_solver_entry_point
+        solve = placement_solver_entry_point()
+        if solve is not None:
+            try:
+                return json.dumps(solve(json.loads(stage1_json), verbose=False), indent=2)
+            except Exception as e:
+                return json.dumps({"error": str(e)})
         script = SKILLS_DIR / "placement_solver" / "scripts" / "solve_placement.py"
         if not script.exists():
             return json.dumps({"error": "Script not found"})
@@ -223,7 +223,8 @@ def run_iteration(
             logger.warning(f"Reference solver failed – cannot compare Stage 2: {e}")
             # If solver itself fails, we cannot grade the LLM — fall back to
             # structural validation only (does the LLM JSON at least look right?).
-            s2_ok, s2_msg, s2_details = validate_stage2(llm_stage2_data)
+            robot_model = ((stage1_data or {}).get("robot_selection") or {}).get("model")
+            s2_ok, s2_msg, s2_details = validate_stage2(llm_stage2_data, robot_model=robot_model)
             s2_details["reference_unavailable"] = True
             result["stage2_success"] = s2_ok
             evidence.end_stage(
@@ -18,19 +18,39 @@ logger = logging.getLogger(__name__)
 # Paths
 SKILLS_DIR = Path(__file__).parent.parent.parent / "skills"
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+AGENT_ROOT = Path(__file__).parent.parent.parent
+
+
+def placement_solver_entry_point():
+    """
+    In-process ``solve(stage1, verbose)`` of the placement solver, or None
+    when it must run as a script (same trust list and SKILLS_IN_PROCESS
+    switch as the agent runtime).
+    """
+    if str(AGENT_ROOT) not in sys.path:
+        sys.path.insert(0, str(AGENT_ROOT))
+    from src.runtime import skill_entry_point
+    return skill_entry_point("placement_solver", "solve_placement")
 
 
 def run_solve_placement(stage1_data: Dict[str, Any], timeout: int = 60) -> Dict[str, Any]:
     """
-    Run the placement solver script directly.
+    Run the placement solver directly (in-process when trusted, else the script).
 
     Args:
         stage1_data: Validated Stage 1 JSON.
-        timeout: Timeout in seconds.
+        timeout: Timeout in seconds (script mode only).
 
     Returns:
         Stage 2 result dict.
     """
+    solve = placement_solver_entry_point()
+    if solve is not None:
+        try:
+            return solve(stage1_data, verbose=False)
+        except Exception as e:
+            return {"error": str(e), "status": "error"}
+
     script_path = SKILLS_DIR / "placement_solver" / "scripts" / "solve_placement.py"
     if not script_path.exists():
         return {"error": f"Script not found: {script_path}", "status": "error"}
@@ -63,22 +83,33 @@ def run_solve_placement(stage1_data: Dict[str, Any], timeout: int = 60) -> Dict[
         return {"error": str(e), "status": "error"}
 
 
-def run_genesis_build_and_execute(genesis_input: Dict[str, Any], timeout: int = 300) -> Dict[str, Any]:
+def run_genesis_build_and_execute(genesis_input: Dict[str, Any], timeout: int = 300,
+                                  headless: bool = True) -> Dict[str, Any]:
     """
     Run the genesis build_and_execute script directly.
 
     Args:
         genesis_input: Prepared genesis input with fixed paths.
         timeout: Timeout in seconds (genesis is slow).
+        headless: CPU backend, no viewer, exit after the trajectory (batch mode).
 
     Returns:
         Stage 3 result dict.
     """
+    # GENESIS_SIM_SERVER=1: reuse the warm simulation server
+    if str(AGENT_ROOT) not in sys.path:
+        sys.path.insert(0, str(AGENT_ROOT))
+    from src.runtime import run_on_sim_server, sim_server_enabled
+    if sim_server_enabled():
+        result = run_on_sim_server(dict(genesis_input, headless=headless), timeout=timeout)
+        if result is not None:
+            return result
+
     script_path = SKILLS_DIR / "genesis_scene_builder" / "scripts" / "build_and_execute.py"
     if not script_path.exists():
         return {"error": f"Script not found: {script_path}", "status": "error"}
 
-    input_json = json.dumps(genesis_input)
+    input_json = json.dumps(dict(genesis_input, headless=headless))
 
     try:
         result = subprocess.run(
@@ -195,6 +226,7 @@ def prepare_genesis_input(
         "execute_trajectory": True,
         "motion_targets": stage2_data.get("motion_targets", {}),
         "z_lift": 0.4,
+        "throughput_requirement": stage1_data.get("throughput_requirement") or {},
     }
 
 
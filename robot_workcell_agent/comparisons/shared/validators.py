@@ -403,10 +403,68 @@ def validate_stage1_vs_prompt(
 # ── Stage 2 Validation ──────────────────────────────────────────────
 
 
-def validate_stage2(stage2_data: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any]]:
+def check_reachability(stage2_data: Dict[str, Any], robot_model: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Look up the pick/place targets in the robot's precomputed reachability
+    map (downward-facing TCP, see skills/placement_solver/reach_maps).
+
+    The model defaults to the one the solver recorded in ``reach_check``.
+    Returns None when no map applies.
+    """
+    if robot_model is None:
+        robot_model = (stage2_data.get("reach_check") or {}).get("reach_map", {}).get("model")
+    if not robot_model:
+        return None
+    try:
+        from src.runtime import load_skill_module
+        reach_map = load_skill_module("placement_solver", "placement_core").load_reach_map(robot_model)
+    except Exception as e:
+        logger.warning(f"reach_map_unavailable: model={robot_model}, error={e}")
+        return None
+    if reach_map is None:
+        return None
+
+    mt = stage2_data.get("motion_targets", {})
+    base = mt.get("robot_pos", [0.0, 0.0, 0.0])
+    targets = {}
+    for key in ("pick_target_xyz", "place_target_xyz"):
+        if mt.get(key) and len(mt[key]) == 3:
+            targets[key] = round(float(reach_map.manipulability(mt[key], base)[0]), 4)
+    place_targets = [t[:3] for t in mt.get("place_targets", []) if len(t) >= 3]
+    result = {
+        "model": reach_map.model,
+        "manipulability": targets,
+        "targets_reachable": bool(targets) and all(m > 0.0 for m in targets.values()),
+    }
+    if place_targets:
+        result["place_targets_reachable"] = int(reach_map.reachable(place_targets, base).sum())
+        result["place_targets_total"] = len(place_targets)
+
+    # UR arms: exact closed-form check on top of the voxel lookup
+    try:
+        ur_ik = load_skill_module("placement_solver", "ur_ik")
+    except Exception as e:
+        logger.warning(f"ur_ik_unavailable: error={e}")
+        return result
+    model = ur_ik.ur_model(robot_model)
+    if model is not None:
+        points = [mt[key] for key in targets] + place_targets
+        ok = ur_ik.ur_reachable(model, [[p - b for p, b in zip(point, base)] for point in points])
+        result["analytic_ik"] = {
+            "targets_reachable": bool(ok[:len(targets)].all()) if targets else False,
+            "place_targets_reachable": int(ok[len(targets):].sum()),
+        }
+    return result
+
+
+def validate_stage2(stage2_data: Dict[str, Any], robot_model: Optional[str] = None) -> Tuple[bool, str, Dict[str, Any]]:
     """
     Validate Stage 2 placement solver output.
 
+    When a reachability map exists for the robot, ``details["reachability"]``
+    reports whether the targets are reachable with a downward-facing TCP
+    (informational; it does not change ``success``).
+
     Returns:
         (success, message, details_dict)
     """
@@ -493,6 +551,11 @@ def validate_stage2(stage2_data: Dict[str, Any]) -> Tuple[bool, str, Dict[str, A
     if not layout_spread_ok and spread_error:
         details["errors"].append(spread_error)
 
+    # ── Reachability map lookup (instant IK feasibility estimate) ──────────
+    reachability = check_reachability(stage2_data, robot_model)
+    if reachability is not None:
+        details["reachability"] = reachability
+
     success = (
         details["status_success"]
         and details["has_components"]
@@ -32,7 +32,7 @@ from comparisons.shared.validators import (
 )
 from comparisons.shared.stage_scripts import (
     run_solve_placement, prepare_genesis_input, fix_genesis_paths,
-    run_genesis_build_and_execute
+    run_genesis_build_and_execute, placement_solver_entry_point
 )
 
 logger = logging.getLogger(__name__)
@@ -267,6 +267,12 @@ def _exec_validate_stage1_json(stage1_json: str) -> str:
 def _exec_run_placement_solver(stage1_json: str) -> str:
     import subprocess
     import sys as _sys
+    solve = placement_solver_entry_point()
+    if solve is not None:
+        try:
+            return json.dumps(solve(json.loads(stage1_json), verbose=False), indent=2)
+        except Exception as e:
+            return json.dumps({"error": str(e)})
     script = SKILLS_DIR / "placement_solver" / "scripts" / "solve_placement.py"
     if not script.exists():
         return json.dumps({"error": "Script not found"})
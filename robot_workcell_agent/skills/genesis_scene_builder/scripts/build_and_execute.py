@@ -7,13 +7,38 @@ Based on genesis_world_pnp_4.py complete workflow.
 
 Input: JSON with components and optional motion_targets
 Output: JSON with build result and optional trajectory result
+
+Headless batch mode (``--headless``, ``"headless": true`` in the input or
+GENESIS_HEADLESS=1) runs on the CPU backend without a viewer and exits
+after printing the result instead of keeping the scene alive.
+
+The steps are importable (init_genesis, build_scene, run_pick_and_place)
+so sim_server.py can keep Genesis warm across many requests.
+
+Scenes are templates: a layout that uses the same assets as an already
+built scene only moves its entities (set_pos/set_quat + home pose) instead
+of calling scene.build() again (see TemplateScenes). Pass ``"layouts":
+[{...}, ...]`` to sweep many layouts of one asset set in a single process;
+add ``"batched": true`` to simulate them all at once as parallel
+environments of one scene (scene.build(n_envs=N), lockstep IK, planning
+and cycle, per-environment pass/fail).
 """
 
+import hashlib
 import json
 import sys
 import os
+import time
+from pathlib import Path
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from motion_cache import open_ik_cache, open_plan_cache  # noqa: E402
+from trajectory_recorder import TrajectoryRecorder, recording_path, trajectory_summary  # noqa: E402
+
+# Analytic UR IK lives with the placement solver's kinematics (ur_ik.py)
+PLACEMENT_SCRIPTS = Path(__file__).resolve().parents[2] / "placement_solver" / "scripts"
+
 # Configure stderr logging
 def log_stderr(msg):
     """Log to stderr for debugging."""
@@ -32,27 +57,1099 @@ except ImportError as e:
     sys.exit(1)
 
 
+# Home pose (mirrors genesis_world_pnp_7.py)
+HOME_QPOS = np.array([0.0, -np.pi/2, np.pi/2, -np.pi/2, -np.pi/2, 0.0])
+
+# component_type values spawned as the carton the robot picks
+CARTON_TYPES = ("carton", "box", "cardboard_box", "carton_to_palletize", "object")
+
+# Backend chosen by the first init_genesis() call (gs.init may only run once per process)
+_genesis_backend = None
+
+# Built template scenes kept per process (one per asset set)
+MAX_TEMPLATE_SCENES = 4
+
+# Pick-and-place phases, in order
+PHASE_NAMES = ("APPROACH HOVER", "PLUNGE", "LIFT", "TRANSPORT", "LOWER", "RETRACT")
+
+# Batched IK: an environment whose TCP position error exceeds this fails the phase
+IK_POS_TOLERANCE = 0.01
+
+# Analytic IK backend ("ik_backend": "analytic"): the catalog UR MJCF models
+# (mujoco_menagerie layout) have their base rotated by pi about z relative
+# to the DH base frame; a closed-form goal is used directly when Genesis'
+# forward kinematics puts the TCP within these tolerances, otherwise it
+# only seeds the iterative solver (IK cache entries are checked against the
+# same tolerances before they are stored or used)
+MJCF_UR_BASE_YAW = np.pi
+ANALYTIC_IK_POS_TOL = 0.002       # metres
+ANALYTIC_IK_ROT_TOL = 0.02        # radians
+
+# Cached paths are collision-checked at every waypoint and at interpolated
+# poses wherever consecutive waypoints are more than PLAN_CHECK_STEP_RAD apart
+PLAN_CHECK_STEP_RAD = 0.01
+
+# Planning ladder: a straight joint-space line with one waypoint per
+# STRAIGHT_STEP_RAD of the largest joint move (at least STRAIGHT_MIN_WAYPOINTS),
+# collision-checked at every waypoint, is tried before RRT
+STRAIGHT_STEP_RAD = 0.01
+STRAIGHT_MIN_WAYPOINTS = 20
+
+# Settling after each motion: step until every joint is slower than vel_tol
+# (rad/s) and within pos_tol (rad) of its target, at least min_steps and at
+# most the fixed counts below (the previous unconditional step counts).
+# Override per request with "settle": {...}; "adaptive": false always runs
+# the full counts.
+SETTLE_TOLERANCES = {"vel_tol": 0.02, "pos_tol": 0.005, "min_steps": 5, "adaptive": True}
+SETTLE_MAX_STEPS = {"home": 100, "path": 60, "suction_on": 30, "suction_off": 60}
+
+# Multi-cycle runs ("cycles": N): the spare cartons of the pool wait on the
+# ground in a grid from CARTON_PARK_ORIGIN (x, y), CARTON_PARK_COLUMNS per
+# row, far outside the cell; their gap is added to the carton footprint
+CARTON_PARK_ORIGIN = (-10.0, -10.0)
+CARTON_PARK_COLUMNS = 10
+CARTON_PARK_GAP = 0.3
+
+# Phase retries: a motion phase that fails (no IK solution, no path, an
+# exception, or the TCP settling more than PHASE_POS_TOL metres from its
+# target) is restored to the checkpoint taken at its start and retried with
+# another IK seed and a doubled RRT node budget, at most PHASE_RETRY_BUDGET
+# times per cycle (override with "retries"; 0 disables)
+PHASE_RETRY_BUDGET = 3
+PHASE_POS_TOL = 0.03
+
+# Multi-seed IK ("ik_seeds": K > 1): each goal is solved from K seeds in one
+# batched DLS call on the robot's DH model and the converged solution with
+# the best joint distance / limit margin trade-off is kept (IK_LIMIT_WEIGHT
+# in kinematics.py); goals Genesis' forward kinematics disagrees with
+# only warm-start robot.inverse_kinematics
+DEFAULT_IK_SEEDS = 16
+
+# Simulation modes ("mode"): "physics" steps rigid-body dynamics through
+# every waypoint and settle (final sign-off); "kinematic" sets the joints
+# along each planned path, collision-checks every waypoint and carries the
+# suctioned carton at a fixed offset from the TCP, without dynamics, for a
+# fast IK / planning verdict
+SIM_MODES = ("physics", "kinematic")
+
+# Physics time step assumed when the scene does not expose one (Genesis SimOptions default)
+DEFAULT_SIM_DT = 0.01
+
+
+def headless_requested(input_data):
+    """True for headless batch runs: --headless, "headless": true or GENESIS_HEADLESS=1."""
+    if "--headless" in sys.argv[1:] or input_data.get("headless"):
+        return True
+    return os.environ.get("GENESIS_HEADLESS", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def shutdown(code=0):
+    """Release Genesis and exit (headless mode)."""
+    try:
+        gs.destroy()
+    except Exception as e:
+        log_stderr(f"⚠️  gs.destroy() failed: {e}")
+    sys.exit(code)
+
+
+def parse_request(input_data):
+    """
+    Normalise a Stage 3 input dict.
+
+    Returns a dict with ``components`` (robot first when given separately),
+    ``execute_trajectory``, ``motion_targets``, ``z_lift``, ``settle``
+    (settle tolerance overrides), ``ik_cache`` / ``plan_cache`` (False
+    disables that cache), ``ik_backend`` ("genesis" or "analytic"),
+    ``throughput`` (Stage 1 throughput_requirement, for the cycle-time
+    report), ``cycles`` (consecutive cycles over the pallet pattern, see
+    run_cycles()), ``record`` (true or an output path: per-step binary
+    recording, see trajectory_recorder.py), ``retries`` (phase retry budget
+    per cycle), ``ik_seeds`` (IK seeds per goal; true means DEFAULT_IK_SEEDS),
+    ``mode`` (one of SIM_MODES) and ``headless``.
+    """
+    headless = headless_requested(input_data)
+
+    # Unwrap if agent passed data nested under a wrapper key
+    # (agent sometimes wraps args when calling run_skill_script_tool)
+    for wrapper_key in ("genesis_input", "scene_data", "genesis_data", "data"):
+        if (wrapper_key in input_data
+                and "components" not in input_data
+                and "robot" not in input_data):
+            log_stderr(f"🔄 Unwrapping '{wrapper_key}' wrapper key...")
+            input_data = input_data[wrapper_key]
+            log_stderr(f"✅ Unwrapped, new keys: {list(input_data.keys())}")
+            headless = headless or headless_requested(input_data)
+            break
+
+    # Build complete components list (robot + other components)
+    components = []
+
+    # Add robot if provided
+    robot_data = input_data.get("robot")
+    if robot_data:
+        log_stderr(f"🤖 Robot data found: {robot_data.get('name')}")
+        # Support urdf / urdf_path / mjcf_path key names
+        robot_urdf = (robot_data.get("urdf")
+                      or robot_data.get("urdf_path")
+                      or robot_data.get("mjcf_path"))
+        robot_component = {
+            "name": robot_data.get("name", "robot"),
+            "component_type": "robot",  # CRITICAL: Mark as robot
+            "urdf": robot_urdf,
+            "position": robot_data.get("position"),
+            "orientation": robot_data.get("orientation", [0, 0, 0])
+        }
+        components.append(robot_component)
+        log_stderr(f"  ✅ Robot added to components list (urdf={robot_urdf})")
+
+    # Add other components — support both 'components' and 'workcell_components' keys
+    other_components = input_data.get("components") or input_data.get("workcell_components", [])
+    components.extend(other_components)
+
+    return {
+        "components": components,
+        "execute_trajectory": input_data.get("execute_trajectory", False),
+        "motion_targets": input_data.get("motion_targets", {}),
+        "z_lift": input_data.get("z_lift", 0.35),  # Z_HOVER from genesis_world_pnp_7.py
+        "settle": input_data.get("settle") or {},
+        "ik_cache": input_data.get("ik_cache", True),
+        "plan_cache": input_data.get("plan_cache", True),
+        "ik_backend": input_data.get("ik_backend", "genesis"),
+        "throughput": input_data.get("throughput_requirement") or {},
+        "cycles": max(1, int(input_data.get("cycles") or 1)),
+        "record": input_data.get("record", False),
+        "retries": int(input_data.get("retries", PHASE_RETRY_BUDGET)),
+        "mode": str(input_data.get("mode") or "physics").lower(),
+        "ik_seeds": DEFAULT_IK_SEEDS if input_data.get("ik_seeds") is True else int(input_data.get("ik_seeds") or 1),
+        "headless": headless,
+    }
+
+
+def init_genesis(headless):
+    """gs.init once per process: CPU backend when headless, else GPU."""
+    global _genesis_backend
+    if _genesis_backend is None:
+        log_stderr("🚀 Initializing Genesis...")
+        _genesis_backend = "cpu" if headless else "gpu"
+        gs.init(backend=gs.cpu if headless else gs.gpu)
+        log_stderr(f"✅ Genesis initialized ({_genesis_backend})")
+    return _genesis_backend
+
+
+def component_file(comp):
+    """MJCF path of a component (urdf / mjcf_path / urdf_path key names)."""
+    return comp.get("urdf") or comp.get("mjcf_path") or comp.get("urdf_path")
+
+
+def asset_signature(components, carton_pool=1):
+    """Components that can share one template scene: same files and types, any poses (and carton pool size)."""
+    signature = [[(c.get("component_type") or "unknown").lower(), component_file(c)] for c in components]
+    if carton_pool > 1:
+        signature.append(["carton_pool", int(carton_pool)])
+    return json.dumps(signature)
+
+
+def layout_signature(components):
+    """Components that produce an identical scene: same assets and poses."""
+    return json.dumps([[(c.get("component_type") or "unknown").lower(), component_file(c),
+                        c.get("position"), c.get("orientation")]
+                       for c in components], sort_keys=True)
+
+
+def robot_signature(components):
+    """Robot MJCF file and base pose: IK solutions are only valid for this exact robot placement."""
+    for c in components:
+        if (c.get("component_type") or "").lower() == "robot":
+            return json.dumps([component_file(c), c.get("position"), c.get("orientation") or [0, 0, 0],
+                               getattr(gs, "__version__", "")])
+    return None
+
+
+def euler_to_quat(euler_deg):
+    """[roll, pitch, yaw] degrees (extrinsic x-y-z, as MJCF morphs take them) -> quaternion [w, x, y, z]."""
+    r, p, y = (np.radians(float(a)) / 2.0 for a in euler_deg)
+    cr, sr, cp, sp, cy, sy = np.cos(r), np.sin(r), np.cos(p), np.sin(p), np.cos(y), np.sin(y)
+    return np.array([
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    ])
+
+
+def carton_park_pos(index, carton_comp):
+    """Parking spot of spare carton ``index`` (resting on the ground, outside the cell)."""
+    dims = carton_comp.get("dimensions") or [0.2, 0.2, 0.2]
+    pitch = max(dims[0], dims[1]) + CARTON_PARK_GAP
+    row, col = divmod(index, CARTON_PARK_COLUMNS)
+    return (CARTON_PARK_ORIGIN[0] + col * pitch, CARTON_PARK_ORIGIN[1] - row * pitch, dims[2] / 2 + 0.001)
+
+
+def build_scene(components, headless, n_envs=0, carton_pool=1):
+    """
+    Create a scene, spawn every component with an existing MJCF file and build it.
+
+    Returns a scene handle dict: ``scene``, ``robot`` and ``carton`` entities
+    (None when absent), ``entities`` aligned with ``components`` (None for
+    skipped ones), the ``spawned`` report list and the ``assets``/``layout``
+    signatures. ``n_envs > 0`` builds that many parallel environments, all
+    at the poses of ``components`` until place_environments() moves them.
+    ``carton_pool > 1`` adds spare copies of the carton parked off-scene
+    (carton_park_pos) for multi-cycle runs; ``cartons`` lists the whole pool,
+    the component's own carton first.
+    """
+    scene = gs.Scene(show_viewer=not headless)
+    scene.add_entity(gs.morphs.Plane())
+
+    # Spawn components
+    log_stderr(f"📦 Spawning {len(components)} components...")
+    log_stderr(f"")
+    log_stderr(f"Component List:")
+    for i, comp in enumerate(components):
+        log_stderr(f"  {i+1}. {comp.get('name')} - type: {comp.get('component_type', 'unknown')}")
+    log_stderr(f"")
+
+    spawned = []
+    entities = []
+    robot_entity = None
+    carton_entity = None
+    carton_comp = None
+
+    for comp in components:
+        # Support urdf / urdf_path / mjcf_path key names
+        urdf = component_file(comp)
+        pos = comp.get("position")
+        name = comp.get("name")
+        comp_type = comp.get("component_type", "unknown").lower()  # normalise case
+
+        if not urdf or not os.path.exists(urdf):
+            log_stderr(f"  ⚠️  {name}: File not found (path={urdf})")
+            spawned.append({"component_name": name, "status": "skipped"})
+            entities.append(None)
+            continue
+
+        log_stderr(f"  - {name} ({comp_type}) at {pos}")
+        morph_kwargs = {"file": urdf, "pos": pos}
+        orientation = comp.get("orientation") or [0, 0, 0]
+        if len(orientation) == 3 and any(orientation):
+            morph_kwargs["euler"] = tuple(orientation)  # [roll, pitch, yaw] degrees from placement_solver
+        entity = scene.add_entity(gs.morphs.MJCF(**morph_kwargs))
+        entities.append(entity)
+
+        if comp_type == "robot":
+            robot_entity = entity
+            log_stderr(f"    🤖 Stored as robot")
+        elif comp_type in CARTON_TYPES:
+            carton_entity = entity
+            carton_comp = comp
+            log_stderr(f"    📦 Stored as carton")
+
+        spawned.append({
+            "component_name": name,
+            "urdf": urdf,
+            "position": pos,
+            "status": "spawned"
+        })
+
+    # Spare cartons for multi-cycle runs: entities cannot be added after build()
+    cartons = [carton_entity] if carton_entity is not None else []
+    if carton_entity is not None and carton_pool > 1:
+        for i in range(carton_pool - 1):
+            cartons.append(scene.add_entity(gs.morphs.MJCF(file=component_file(carton_comp),
+                                                           pos=carton_park_pos(i, carton_comp))))
+        log_stderr(f"  📦 {carton_pool - 1} spare cartons parked off-scene")
+
+    # Build scene
+    if n_envs:
+        log_stderr(f"🔨 Building scene ({n_envs} parallel environments)...")
+        scene.build(n_envs=n_envs)
+    else:
+        log_stderr("🔨 Building scene...")
+        scene.build()
+    log_stderr("✅ Scene built")
+
+    handle = {
+        "scene": scene,
+        "robot": robot_entity,
+        "carton": carton_entity,
+        "carton_component": carton_comp,
+        "cartons": cartons,
+        "entities": entities,
+        "spawned": spawned,
+        "assets": asset_signature(components, carton_pool),
+        "layout": layout_signature(components),
+        "robot_key": robot_signature(components),
+        "components": components,
+        "weld": None,
+        "n_envs": n_envs,
+    }
+    go_home(handle)
+    return handle
+
+
+def release_weld(handle):
+    """Drop a suction weld left behind by an aborted cycle."""
+    if handle.get("weld") is not None:
+        # (carton link, TCP link[, envs_idx]) as passed to add_weld_constraint
+        handle["scene"].sim.rigid_solver.delete_weld_constraint(*handle["weld"])
+        handle["weld"] = None
+
+
+def apply_layout(handle, components):
+    """Set every component entity to its pose in ``components`` (same assets as the handle)."""
+    for entity, comp, report in zip(handle["entities"], components, handle["spawned"]):
+        if entity is None:
+            continue
+        entity.set_pos(np.asarray(comp.get("position"), dtype=float))
+        entity.set_quat(euler_to_quat(comp.get("orientation") or [0, 0, 0]))
+        report["position"] = comp.get("position")
+        report["component_name"] = comp.get("name")
+
+
+def reset_scene(handle):
+    """
+    Back to the start of the handle's current layout, robot at home.
+    scene.reset() restores the build-time poses, so a repositioned template
+    gets its current components' poses applied again.
+    """
+    release_weld(handle)
+    handle["scene"].reset()
+    apply_layout(handle, handle["components"])
+    go_home(handle)
+
+
+def reposition_scene(handle, components):
+    """
+    Move a template scene's entities to a new layout of the same assets -
+    no scene.build(). ``components`` must match ``handle["assets"]``.
+    """
+    release_weld(handle)
+    handle["scene"].reset()
+    apply_layout(handle, components)
+    handle["layout"] = layout_signature(components)
+    handle["robot_key"] = robot_signature(components)
+    handle["components"] = components
+    if handle["carton"] is not None:
+        handle["carton_component"] = components[[e is handle["carton"] for e in handle["entities"]].index(True)]
+    go_home(handle)
+    log_stderr(f"♻️  Template scene repositioned ({sum(e is not None for e in handle['entities'])} entities)")
+
+
+def place_environments(handle, env_components):
+    """
+    Per-environment poses in a batched scene: ``env_components`` holds one
+    components list (same assets as the handle) per environment.
+    """
+    for k, entity in enumerate(handle["entities"]):
+        if entity is None:
+            continue
+        entity.set_pos(np.array([comps[k].get("position") for comps in env_components], dtype=float))
+        entity.set_quat(np.stack([euler_to_quat(comps[k].get("orientation") or [0, 0, 0])
+                                  for comps in env_components]))
+    go_home(handle)
+    log_stderr(f"🗺️  {len(env_components)} environments placed")
+
+
+class TemplateScenes:
+    """
+    Built scenes reused across layouts: an identical layout is reset, a
+    layout of the same assets is repositioned, anything else is built (up
+    to MAX_TEMPLATE_SCENES templates, oldest dropped first). ``reuse=False``
+    rebuilds every time.
+    """
+
+    def __init__(self, headless=True, reuse=True, max_templates=MAX_TEMPLATE_SCENES):
+        self.headless = headless
+        self.reuse = reuse
+        self.max_templates = max_templates
+        self.templates = {}
+        self.last = None   # reuse=False: previous scene, destroyed on the next build
+        self.stats = {"built": 0, "reset": 0, "repositioned": 0}
+
+    def scene_for(self, components, carton_pool=1):
+        """(handle, how) with how in "built", "reset", "repositioned"."""
+        assets = asset_signature(components, carton_pool)
+        handle = self.templates.get(assets) if self.reuse else None
+        if handle is not None:
+            self.templates[assets] = self.templates.pop(assets)   # most recently used last
+            if handle["layout"] == layout_signature(components):
+                reset_scene(handle)
+                how = "reset"
+            else:
+                reposition_scene(handle, components)
+                how = "repositioned"
+        else:
+            if not self.reuse and self.last is not None:
+                self._destroy(self.last)
+            handle = self.last = build_scene(components, self.headless, carton_pool=carton_pool)
+            if self.reuse:
+                self.templates[assets] = handle
+                while len(self.templates) > self.max_templates:
+                    oldest = next(iter(self.templates))
+                    self._destroy(self.templates.pop(oldest))
+            how = "built"
+        self.stats[how] += 1
+        return handle, how
+
+    def clear(self):
+        """Destroy every scene held by the pool."""
+        for handle in {id(h): h for h in [*self.templates.values(), self.last] if h is not None}.values():
+            self._destroy(handle)
+        self.templates.clear()
+        self.last = None
+
+    @staticmethod
+    def _destroy(handle):
+        if hasattr(handle["scene"], "destroy"):
+            try:
+                handle["scene"].destroy()
+            except Exception as e:
+                log_stderr(f"⚠️  Scene not destroyed: {e}")
+
+
+def go_home(handle):
+    """Put the robot in the home pose (no-op without a robot)."""
+    robot_entity = handle["robot"]
+    if robot_entity is not None:
+        qpos = np.tile(HOME_QPOS, (handle["n_envs"], 1)) if handle.get("n_envs") else HOME_QPOS
+        robot_entity.set_dofs_position(qpos)
+        robot_entity.control_dofs_position(qpos)
+        log_stderr("🏠 Home pose set")
+
+
+def scene_result(handle):
+    """Base Stage 3 result for a built scene."""
+    return {
+        "success": True,
+        "spawned_components": handle["spawned"],
+        "robot_available": handle["robot"] is not None,
+        "carton_available": handle["carton"] is not None,
+        "message": "Genesis scene built successfully."
+    }
+
+
+def _to_numpy(x):
+    """Genesis returns torch tensors; plain numpy for masks and indexing."""
+    return x.detach().cpu().numpy() if hasattr(x, "detach") else np.asarray(x)
+
+
+def settle(scene, robot, qpos_target, max_steps, tolerances=None, envs_idx=None):
+    """
+    Step the scene until the arm has settled on ``qpos_target`` (see
+    SETTLE_TOLERANCES), at most ``max_steps`` steps. ``envs_idx`` limits the
+    check to those environments of a batched scene (``qpos_target`` then has
+    one row per listed environment). Returns the steps taken.
+    """
+    tol = dict(SETTLE_TOLERANCES, **(tolerances or {}))
+    if not tol["adaptive"]:
+        for _ in range(max_steps):
+            scene.step()
+        return max_steps
+    qpos_target = _to_numpy(qpos_target)
+    for step in range(1, max_steps + 1):
+        scene.step()
+        if step < tol["min_steps"]:
+            continue
+        vel = _to_numpy(robot.get_dofs_velocity())
+        qpos = _to_numpy(robot.get_dofs_position())
+        if envs_idx is not None:
+            vel, qpos = vel[envs_idx], qpos[envs_idx]
+        if np.abs(vel).max() < tol["vel_tol"] and np.abs(qpos - qpos_target).max() < tol["pos_tol"]:
+            return step
+    return max_steps
+
+
+def scene_dt(scene):
+    """Physics time step of a scene in seconds (DEFAULT_SIM_DT when it does not say)."""
+    dt = getattr(scene, "dt", None)
+    if dt is None:
+        dt = getattr(getattr(scene, "sim_options", None), "dt", None)
+    return float(dt) if dt else DEFAULT_SIM_DT
+
+
+def phase_timing(dt, wall_s, step_s, waypoints, settle_steps, ik_s=0.0, plan_s=0.0, tier=None):
+    """
+    One phase_log entry: wall-clock IK / planning / stepping time, physics
+    steps (waypoints plus settle steps), the simulated seconds they cover and
+    the stepping rate.
+    """
+    steps = waypoints + settle_steps
+    return {
+        "ik_s": round(ik_s, 4),
+        "plan_s": round(plan_s, 4),
+        "tier": tier,
+        "waypoints": waypoints,
+        "settle_steps": settle_steps,
+        "steps": steps,
+        "sim_s": round(steps * dt, 4),
+        "step_s": round(step_s, 4),
+        "wall_s": round(wall_s, 4),
+        "steps_per_s": round(steps / step_s, 1) if step_s > 0 else None,
+    }
+
+
+def required_cycle_time(throughput):
+    """Target cycle time in seconds from a Stage 1 throughput_requirement (None when absent)."""
+    throughput = throughput or {}
+    required = throughput.get("cycle_time_seconds")
+    if not required and throughput.get("items_per_hour"):
+        required = 3600.0 / float(throughput["items_per_hour"])
+    return float(required) if required else None
+
+
+def cycle_timing(phase_log, dt, throughput=None, complete=True):
+    """
+    Timing report for one pick-and-place run from its phase_log.
+
+    The simulated cycle time is the physics time of every phase after the
+    initial HOME settle (one waypoint per physics step, as executed). When
+    Stage 1's ``throughput_requirement`` gives ``cycle_time_seconds`` (or
+    ``items_per_hour``) and the cycle completed, the report says whether it
+    meets that target and by what margin.
+    """
+    cycle_steps = sum(e["steps"] for key, e in phase_log.items() if key != "HOME")
+    cycle_s = cycle_steps * dt
+    steps = sum(e["steps"] for e in phase_log.values())
+    wall_s = sum(e["wall_s"] for e in phase_log.values())
+    step_s = sum(e["step_s"] for e in phase_log.values())
+    report = {
+        "dt": dt,
+        "phases": phase_log,
+        "cycle_complete": complete,
+        "cycle_time_s": round(cycle_s, 3),
+        "items_per_hour": round(3600.0 / cycle_s, 1) if complete and cycle_s > 0 else None,
+        "steps": steps,
+        "sim_s": round(steps * dt, 3),
+        "wall_s": round(wall_s, 3),
+        "ik_s": round(sum(e["ik_s"] for e in phase_log.values()), 3),
+        "plan_s": round(sum(e["plan_s"] for e in phase_log.values()), 3),
+        "step_s": round(step_s, 3),
+        "retry_wall_s": round(sum(e.get("retry_wall_s", 0.0) for e in phase_log.values()), 3),
+        "steps_per_s": round(steps / step_s, 1) if step_s > 0 else None,
+        "realtime_factor": round(steps * dt / wall_s, 2) if wall_s > 0 else None,
+    }
+    required = required_cycle_time(throughput)
+    if required:
+        report["required_cycle_time_s"] = round(required, 3)
+        report["meets_target"] = bool(complete and cycle_s <= required)
+        report["margin_s"] = round(required - cycle_s, 3) if complete else None
+    return report
+
+
+def log_cycle_timing(timing):
+    """Per-phase timing table and the cycle-time verdict on stderr."""
+    log_stderr(f"{'phase':<15} {'ik s':>7} {'plan s':>7} {'tier':<15} {'wps':>5} {'steps':>6} "
+               f"{'sim s':>7} {'wall s':>7} {'steps/s':>8}")
+    for key, e in timing["phases"].items():
+        log_stderr(f"{key:<15} {e['ik_s']:>7.3f} {e['plan_s']:>7.3f} {str(e['tier'] or '-'):<15} "
+                   f"{e['waypoints']:>5} {e['steps']:>6} {e['sim_s']:>7.2f} {e['wall_s']:>7.3f} "
+                   f"{e['steps_per_s'] or 0:>8.0f}")
+    verdict = ""
+    if "meets_target" in timing:
+        verdict = (f" vs required {timing['required_cycle_time_s']}s → "
+                   f"{'✓ meets target' if timing['meets_target'] else '✗ too slow'}")
+    log_stderr(f"⏱️  Simulated cycle {timing['cycle_time_s']}s{verdict} "
+               f"(wall {timing['wall_s']}s, real-time factor {timing['realtime_factor']})")
+
+
+class RecordingScene:
+    """
+    Scene proxy for a recorded run: step() steps the real scene, then
+    appends the joint, TCP, carton and weld state to a TrajectoryRecorder
+    (record() appends without stepping, for kinematic execution). Every
+    other attribute is the scene's own.
+    """
+
+    def __init__(self, scene, recorder, handle, end_effector, carton_entity):
+        self._scene = scene
+        self._recorder = recorder
+        self._handle = handle
+        self._end_effector = end_effector
+        self._carton = carton_entity
+
+    def step(self, *args, **kwargs):
+        self._scene.step(*args, **kwargs)
+        self.record()
+
+    def record(self, attached=False):
+        robot = self._handle["robot"]
+        carton = self._carton
+        self._recorder.append(
+            _to_numpy(robot.get_dofs_position()), _to_numpy(robot.get_dofs_velocity()),
+            _to_numpy(self._end_effector.get_pos()), _to_numpy(self._end_effector.get_quat()),
+            _to_numpy(carton.get_pos()) if carton is not None else None,
+            _to_numpy(carton.get_quat()) if carton is not None else None,
+            attached or self._handle["weld"] is not None)
+
+    def __getattr__(self, name):
+        return getattr(self._scene, name)
+
+
+def open_recorder(handle, record, mode="physics"):
+    """TrajectoryRecorder for a scene's robot when the request asks for one, else None."""
+    if not record or handle["robot"] is None:
+        return None
+    return TrajectoryRecorder(handle["robot"].n_dofs, scene_dt(handle["scene"]),
+                              meta={"robot": handle["robot_key"], "layout": handle["layout"], "mode": mode})
+
+
+def save_recording(recorder, record):
+    """Flush a recording; returns the result entry (files, size, summary) without the arrays."""
+    stem = time.strftime("%Y%m%d_%H%M%S") + "_" + hashlib.sha256(recorder.meta["layout"].encode()).hexdigest()[:8]
+    try:
+        path = recorder.flush(recording_path(record, stem))
+    except OSError as e:
+        log_stderr(f"⚠️  Trajectory recording not written: {e}")
+        return {"error": str(e), "steps": recorder.size}
+    log_stderr(f"💾 Trajectory recorded: {recorder.size} steps → {path}")
+    return {
+        "path": str(path),
+        "steps": recorder.size,
+        "bytes": path.stat().st_size,
+        "summary": trajectory_summary(recorder.trajectory, recorder.metadata()),
+    }
+
+
+def kinematic_model(handle):
+    """
+    DH model of the scene's robot: (ROBOT_KINEMATICS name or None, robot
+    component, base position, base yaw). The catalog UR MJCF bases are
+    rotated by MJCF_UR_BASE_YAW relative to their DH frames.
+    """
+    if str(PLACEMENT_SCRIPTS) not in sys.path:
+        sys.path.insert(0, str(PLACEMENT_SCRIPTS))
+    import ur_ik
+    from placement_core import reach_map_name
+    robot_comp = next((c for c in handle["components"]
+                       if (c.get("component_type") or "").lower() == "robot"), None)
+    if robot_comp is None:
+        return None, None, np.zeros(3), 0.0
+    model_file = component_file(robot_comp)
+    name = ur_ik.ur_model(model_file)
+    yaw = np.radians(float((robot_comp.get("orientation") or [0, 0, 0])[2]))
+    if name is not None:
+        yaw += MJCF_UR_BASE_YAW
+    else:
+        name = reach_map_name(Path(str(model_file or "")).name)
+        name = name if name in ur_ik.ROBOT_KINEMATICS else None
+    return name, robot_comp, np.asarray(robot_comp.get("position") or [0, 0, 0], dtype=float), yaw
+
+
+def _quat_matrix(q):
+    """3x3 rotation matrix of a [w, x, y, z] quaternion."""
+    q = np.asarray(q, dtype=float)
+    return np.stack([_quat_rotate(q, axis) for axis in np.eye(3)], axis=1)
+
+
+def local_pose(backend, target_pos, quat):
+    """(4, 4) TCP pose in the robot's DH base frame for a world target."""
+    c, s = np.cos(-backend["base_yaw"]), np.sin(-backend["base_yaw"])
+    rz = np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+    pose = np.eye(4)
+    pose[:3, :3] = rz @ _quat_matrix(quat)
+    pose[:3, 3] = rz @ (np.asarray(target_pos, dtype=float) - backend["base_pos"])
+    return pose
+
+
+def verify_goal(robot, end_effector, qpos, target_pos, quat):
+    """
+    True when Genesis' forward kinematics puts the TCP of ``qpos`` within
+    ANALYTIC_IK_POS_TOL / ANALYTIC_IK_ROT_TOL of the target, False when it
+    does not, None when the robot has no forward_kinematics.
+    """
+    try:
+        links_pos, links_quat = robot.forward_kinematics(qpos)
+        tcp_pos = _to_numpy(links_pos)[end_effector.idx_local]
+        tcp_quat = _to_numpy(links_quat)[end_effector.idx_local]
+    except Exception as e:
+        log_stderr(f"   IK goal not verifiable ({type(e).__name__}) - refining")
+        return None
+    angle = 2 * np.arccos(min(1.0, abs(float(np.dot(tcp_quat, quat)))))
+    return bool(np.linalg.norm(tcp_pos - target_pos) < ANALYTIC_IK_POS_TOL and angle < ANALYTIC_IK_ROT_TOL)
+
+
+def analytic_ik_backend(handle):
+    """
+    Closed-form IK state for the scene's robot (ur_ik.py), or None when the
+    robot is not a catalog UR arm: model, DH base position and yaw, and
+    counters of goals used as solved / refined / left to the iterative IK.
+    """
+    model, _, base_pos, base_yaw = kinematic_model(handle)
+    import ur_ik
+    if model is None or ur_ik.ur_model(model) is None:
+        log_stderr("⚠️  Analytic IK only covers the UR arms - using Genesis IK")
+        return None
+    return {
+        "module": ur_ik,
+        "model": model,
+        "base_pos": base_pos,
+        "base_yaw": base_yaw,
+        "stats": {"analytic": 0, "refined": 0, "iterative": 0},
+    }
+
+
+def analytic_goal(backend, robot, end_effector, target_pos, quat, seed):
+    """
+    Closed-form joint goal for the TCP pose (``target_pos``, ``quat``),
+    the branch closest to ``seed``. Returns (qpos or None, verified): the
+    goal is verified when Genesis' forward kinematics agrees with the
+    target within ANALYTIC_IK_POS_TOL / ANALYTIC_IK_ROT_TOL.
+    """
+    pose = local_pose(backend, target_pos, quat)
+    solutions, valid = backend["module"].ur_ik(backend["model"], pose[None], _to_numpy(seed)[:6])
+    if not valid[0, 0]:
+        return None, False
+    qpos = solutions[0, 0]
+    return qpos, bool(verify_goal(robot, end_effector, qpos, target_pos, quat))
+
+
+def multi_seed_backend(handle, seeds, analytic=None):
+    """
+    Multi-seed IK state for the scene's robot (``"ik_seeds"`` > 1), or None
+    when it has no DH model: the seed count, the DH spec and base frame, the
+    analytic backend whose branches join the seeds, and counters of goals
+    used as solved / refined / failed.
+    """
+    model, _, base_pos, base_yaw = kinematic_model(handle)
+    import kinematics
+    if model is None:
+        log_stderr("⚠️  Multi-seed IK needs a DH model of the robot - using single-seed IK")
+        return None
+    return {
+        "module": kinematics,
+        "model": model,
+        "spec": kinematics.ROBOT_KINEMATICS[model],
+        "base_pos": base_pos,
+        "base_yaw": base_yaw,
+        "seeds": int(seeds),
+        "analytic": analytic,
+        "rng": np.random.default_rng(0),
+        "stats": {"solved": 0, "refined": 0, "failed": 0},
+    }
+
+
+def multi_seed_goal(backend, robot, end_effector, target_pos, quat, hint):
+    """
+    Joint goal for a TCP pose solved from K diverse seeds in one batched
+    DLS call (kinematics.solve_pose_ik): the hint, the current
+    joints, HOME_QPOS, the analytic UR branches and uniform samples within
+    the limits. The converged solution closest to the hint and farthest
+    from the joint limits wins (rank_ik_solutions).
+
+    Returns (qpos or None, verified, report): ``report`` holds the chosen
+    seed's kind, joint distance, limit margin and position error, and how
+    many seeds converged to how many distinct solutions.
+    """
+    solver, spec = backend["module"], backend["spec"]
+    lo, hi = np.array(spec["limits"]).T
+    n = len(lo)
+    hint = _to_numpy(hint)
+    pose = local_pose(backend, target_pos, quat)
+
+    seeds, kinds = [hint[:n]], ["hint"]
+    current = _to_numpy(robot.get_dofs_position())
+    seeds.append(current[:n])
+    kinds.append("current")
+    if n == len(HOME_QPOS):
+        seeds.append(HOME_QPOS)
+        kinds.append("home")
+    analytic = backend["analytic"]
+    if analytic is not None:
+        branches, valid = analytic["module"].ur_ik(analytic["model"], pose[None], hint[:6])
+        seeds.extend(branches[0, valid[0]])
+        kinds.extend(["analytic"] * int(valid[0].sum()))
+    seeds, kinds = seeds[:backend["seeds"]], kinds[:backend["seeds"]]
+    extra = backend["seeds"] - len(seeds)
+    if extra > 0:
+        seeds.extend(backend["rng"].uniform(np.maximum(lo, -np.pi), np.minimum(hi, np.pi), (extra, n)))
+        kinds.extend(["random"] * extra)
+
+    t0 = time.perf_counter()
+    q, converged, pos_err = solver.solve_pose_ik(spec, pose, np.array(seeds))
+    best, dist, margin = solver.rank_ik_solutions(spec, q, converged, hint[:n])
+    report = {
+        "seeds": len(seeds),
+        "converged": int(converged.sum()),
+        "distinct": len({tuple(np.round(s, 1)) for s in q[converged]}),
+        "solve_s": round(time.perf_counter() - t0, 4),
+    }
+    if best is None:
+        backend["stats"]["failed"] += 1
+        return None, False, report
+    qpos = hint.copy()
+    qpos[:n] = q[best]
+    verified = bool(verify_goal(robot, end_effector, qpos, target_pos, quat))
+    backend["stats"]["solved" if verified else "refined"] += 1
+    report.update(chosen=kinds[best], joint_dist=round(float(dist[best]), 4),
+                  limit_margin=round(float(margin[best]), 4), pos_err=round(float(pos_err[best]), 5),
+                  verified=verified)
+    return qpos, verified, report
+
+
+def solve_ik(robot, end_effector, target_pos, quat, seed, ik_cache=None, robot_key=None, analytic=None,
+             multi_seed=None):
+    """
+    Joint goal for a TCP pose. Order: the on-disk IK cache (motion_cache.py;
+    a hit is used once forward kinematics confirms it, else dropped; a
+    target cached under another seed bucket becomes the warm start), then the best of K seeds when a ``multi_seed`` backend
+    is given (its report is left in ``multi_seed["last"]``), or else the
+    closed-form UR solution when an ``analytic`` backend is given (either
+    used as is once verified, else as the warm start), then
+    robot.inverse_kinematics. Only solutions verify_goal() confirms are
+    stored in the cache, so a non-converged result never becomes a hit.
+    """
+    use_cache = ik_cache is not None and robot_key is not None
+    warm = None
+    if multi_seed is not None:
+        multi_seed["last"] = None
+    if use_cache:
+        cached, status = ik_cache.lookup(robot_key, target_pos, quat, _to_numpy(seed))
+        if status == "hit":
+            if verify_goal(robot, end_effector, cached, target_pos, quat):
+                log_stderr("   IK cache hit")
+                return cached
+            log_stderr("   IK cache entry misses the target - dropped, solving")
+            ik_cache.invalidate(robot_key, target_pos, quat)
+            cached = None
+        warm = cached
+    t0 = time.perf_counter()
+    qpos = None
+    verified = False
+    if multi_seed is not None:
+        goal, verified, multi_seed["last"] = multi_seed_goal(multi_seed, robot, end_effector, target_pos, quat, seed)
+        if verified:
+            qpos = goal
+            log_stderr(f"   Multi-seed IK: {multi_seed['last']['chosen']} seed "
+                       f"({multi_seed['last']['converged']}/{multi_seed['last']['seeds']} converged)")
+        elif goal is not None:
+            warm = goal
+    elif analytic is not None:
+        goal, verified = analytic_goal(analytic, robot, end_effector, target_pos, quat, seed)
+        if verified:
+            qpos = goal
+            analytic["stats"]["analytic"] += 1
+            log_stderr("   Analytic IK")
+        elif goal is not None:
+            warm = goal
+            analytic["stats"]["refined"] += 1
+        else:
+            analytic["stats"]["iterative"] += 1
+    if qpos is None:
+        qpos = robot.inverse_kinematics(link=end_effector, pos=target_pos, quat=quat,
+                                        rot_mask=[True, True, True],
+                                        init_qpos=warm if warm is not None else seed)
+    if use_cache and qpos is not None:
+        if verified or verify_goal(robot, end_effector, qpos, target_pos, quat):
+            ik_cache.store(robot_key, target_pos, quat, _to_numpy(seed), _to_numpy(qpos), time.perf_counter() - t0)
+        else:
+            log_stderr("   IK did not converge on the target - not cached")
+    return qpos
+
+
+def _quat_mul(a, b):
+    """Hamilton product of [w, x, y, z] quaternions."""
+    aw, ax, ay, az = a
+    bw, bx, by, bz = b
+    return np.array([aw * bw - ax * bx - ay * by - az * bz,
+                     aw * bx + ax * bw + ay * bz - az * by,
+                     aw * by - ax * bz + ay * bw + az * bx,
+                     aw * bz + ax * by - ay * bx + az * bw])
+
+
+def _quat_rotate(q, v):
+    """Rotate vector ``v`` by [w, x, y, z] quaternion ``q``."""
+    qv = _quat_mul(_quat_mul(q, np.r_[0.0, v]), q * np.array([1, -1, -1, -1]))
+    return qv[1:]
+
+
+def attach_offset(end_effector, entity):
+    """Pose of ``entity`` in the TCP frame: (relative position, relative quaternion)."""
+    ee_pos, ee_quat = _to_numpy(end_effector.get_pos()), _to_numpy(end_effector.get_quat())
+    ee_inv = ee_quat * np.array([1, -1, -1, -1])
+    return (_quat_rotate(ee_inv, _to_numpy(entity.get_pos()) - ee_pos),
+            _quat_mul(ee_inv, _to_numpy(entity.get_quat())))
+
+
+def carry(end_effector, entity, offset):
+    """Move ``entity`` to its attach_offset() ``offset`` from the current TCP pose."""
+    ee_pos, ee_quat = _to_numpy(end_effector.get_pos()), _to_numpy(end_effector.get_quat())
+    entity.set_pos(ee_pos + _quat_rotate(ee_quat, offset[0]))
+    entity.set_quat(_quat_mul(ee_quat, offset[1]))
+
+
+def contact_pairs(robot, carried_entity=None):
+    """
+    Geom index pairs of the robot's current contacts and, with a
+    ``carried_entity``, of the carried entity's contacts - except those
+    between the two (the suction cup holding the carton).
+    """
+    pairs = {tuple(pair) for pair in _to_numpy(robot.detect_collision()).reshape(-1, 2).tolist()}
+    if carried_entity is None:
+        return pairs
+    pairs |= {tuple(pair) for pair in _to_numpy(carried_entity.detect_collision()).reshape(-1, 2).tolist()}
+
+    def on(entity, geom):
+        return entity.geom_start <= geom < entity.geom_end
+
+    return {(a, b) for a, b in pairs
+            if not (on(robot, a) and on(carried_entity, b) or on(carried_entity, a) and on(robot, b))}
+
+
+def densify_path(path, max_step=PLAN_CHECK_STEP_RAD):
+    """``path`` with joint-space interpolated poses so no joint moves more than ``max_step`` between samples."""
+    path = _to_numpy(path)
+    samples = [path[:1]]
+    for a, b in zip(path[:-1], path[1:]):
+        n = max(1, int(np.ceil(np.abs(b - a).max() / max_step)))
+        samples.append(a + np.outer(np.arange(1, n + 1) / n, b - a))
+    return np.concatenate(samples)
+
+
+def path_is_collision_free(robot, end_effector, path, carried_entity=None, max_step=PLAN_CHECK_STEP_RAD):
+    """
+    Kinematic check of a joint path against the current scene: the robot
+    (and a welded carried entity, kept at its current offset from the TCP)
+    is posed at every waypoint and in between at ``max_step`` joint-space
+    spacing (densify_path), and both are checked for contacts
+    (contact_pairs). Contacts already present at the current state are
+    ignored, as the planner does. State is restored afterwards.
+    """
+    qpos0, vel0 = robot.get_qpos(), robot.get_dofs_velocity()
+    if carried_entity is not None:
+        ent_pos0, ent_quat0 = carried_entity.get_pos(), carried_entity.get_quat()
+        offset = attach_offset(end_effector, carried_entity)
+
+    allowed = contact_pairs(robot, carried_entity)
+    try:
+        for wp in densify_path(path, max_step):
+            robot.set_qpos(wp)
+            if carried_entity is not None:
+                carry(end_effector, carried_entity, offset)
+            if contact_pairs(robot, carried_entity) - allowed:
+                return False
+        return True
+    finally:
+        robot.set_qpos(qpos0)
+        robot.set_dofs_velocity(vel0)
+        if carried_entity is not None:
+            carried_entity.set_pos(ent_pos0)
+            carried_entity.set_quat(ent_quat0)
+
+
+def execute_kinematic(robot, end_effector, path, carried_entity=None, on_waypoint=None):
+    """
+    Kinematic execution of a joint path ("mode": "kinematic"): the robot is
+    set to every waypoint (no control, no scene.step()), a carried entity
+    follows the TCP rigidly at its current offset and each waypoint is
+    collision-checked - robot and carried entity (contact_pairs) - against
+    the contacts present at the start.
+    ``on_waypoint(attached)`` is called after each waypoint (recording).
+
+    Returns (index of the first colliding waypoint, its new contact pairs)
+    or (None, []) when the path is clear. The robot stays at the last
+    waypoint reached.
+    """
+    offset = attach_offset(end_effector, carried_entity) if carried_entity is not None else None
+    allowed = contact_pairs(robot, carried_entity)
+    for i, wp in enumerate(path):
+        robot.set_qpos(wp)
+        if offset is not None:
+            carry(end_effector, carried_entity, offset)
+        if on_waypoint is not None:
+            on_waypoint(offset is not None)
+        new = contact_pairs(robot, carried_entity) - allowed
+        if new:
+            return i, sorted(new)
+    robot.zero_all_dofs_velocity()
+    robot.control_dofs_position(path[-1])
+    return None, []
+
+
+def straight_path(start, goal):
+    """Joint-space line from ``start`` to ``goal`` (STRAIGHT_STEP_RAD per waypoint)."""
+    start, goal = _to_numpy(start), _to_numpy(goal)
+    n = max(STRAIGHT_MIN_WAYPOINTS, int(np.ceil(np.abs(goal - start).max() / STRAIGHT_STEP_RAD)) + 1)
+    return np.linspace(start, goal, n)
+
+
+def plan_motion(robot, end_effector, plan_kwargs, plan_cache=None, scene_key=None, phase_name=""):
+    """
+    Planning ladder, cheapest tier first. Returns (path or None, tier):
+
+    - "cache" / "cache_reversed": a stored path between the same joint
+      configurations (motion_cache.PlanCache), still collision-free;
+    - "straight": direct joint-space interpolation, collision-free at every
+      waypoint (short vertical moves in free space);
+    - "rrt": robot.plan_path, whose result is stored in the plan cache.
+    """
+    start = _to_numpy(robot.get_qpos())
+    goal = _to_numpy(plan_kwargs["qpos_goal"])
+    carried_entity = plan_kwargs.get("with_entity")
+    use_cache = plan_cache is not None and scene_key is not None
+
+    if use_cache:
+        cached, how, entry = plan_cache.lookup(scene_key, start, goal)
+        if cached is not None:
+            if path_is_collision_free(robot, end_effector, cached, carried_entity):
+                plan_cache.accept(how, entry)
+                log_stderr(f"[{phase_name}]   Plan cache {how} ({len(cached)} waypoints)")
+                return cached, "cache" if how == "hit" else "cache_reversed"
+            plan_cache.reject(entry)
+            log_stderr(f"[{phase_name}]   Cached path collides - dropped, replanning")
+
+    line = straight_path(start, goal)
+    if path_is_collision_free(robot, end_effector, line, carried_entity):
+        log_stderr(f"[{phase_name}]   Straight joint-space path ({len(line)} waypoints)")
+        return line, "straight"
+
+    t0 = time.perf_counter()
+    path = robot.plan_path(**plan_kwargs)
+    if path is not None and use_cache:
+        plan_cache.store(scene_key, start, goal, _to_numpy(path), time.perf_counter() - t0)
+    return path, "rrt"
+
+
 def move_to(robot, end_effector, down_quat, scene, target_pos, phase_name,
             reuse_qpos=None, init_hint=None, max_nodes=8000, carried_entity=None,
-            ee_link_name='vacuum_gripper/tcp_link'):
+            ee_link_name='vacuum_gripper/tcp_link', phase_log=None, log_key=None,
+            settle_tolerances=None, ik_cache=None, robot_key=None, plan_cache=None, scene_key=None,
+            analytic_ik=None, multi_seed=None, kinematic=False):
     """
     Execute trajectory to target position.
-    Mirrors genesis_world_pnp_7.py move_to() exactly.
+    Mirrors genesis_world_pnp_7.py move_to(), except that IK goes through
+    the IK cache and the analytic / multi-seed backend when given (solve_ik), planning goes through the ladder
+    cache -> straight line -> RRT (plan_motion) and the idle steps after the
+    path stop once the arm has settled. IK / planning / stepping time,
+    planning tier, waypoints and physics steps are stored in
+    ``phase_log[log_key]`` (phase_timing()), also when the phase fails,
+    with the chosen seed's statistics under ``ik_seeds`` for multi-seed IK.
+    ``kinematic`` sets the joints along the path instead of stepping physics
+    (execute_kinematic; no settling) and fails the phase at the first
+    colliding waypoint, logged under ``collision``.
     """
     log_stderr(f"\n[{phase_name}] → {np.round(target_pos, 3)}")
+    t_phase = time.perf_counter()
+
+    def record(ik_s, plan_s=0.0, tier=None, waypoints=0, settle_steps=0, step_s=0.0, **extra):
+        if phase_log is not None:
+            entry = phase_timing(
+                scene_dt(scene), time.perf_counter() - t_phase, step_s, waypoints, settle_steps, ik_s, plan_s, tier)
+            entry.update(extra)
+            if multi_seed is not None and multi_seed.get("last"):
+                entry["ik_seeds"] = multi_seed["last"]
+            phase_log[log_key or phase_name] = entry
 
     seed = init_hint if init_hint is not None else robot.get_dofs_position()
+    if multi_seed is not None:
+        multi_seed["last"] = None
 
-    qpos_goal = reuse_qpos if reuse_qpos is not None else robot.inverse_kinematics(
-        link=end_effector,
-        pos=target_pos,
-        quat=down_quat,
-        rot_mask=[True, True, True],
-        init_qpos=seed,
-    )
+    qpos_goal = reuse_qpos if reuse_qpos is not None else solve_ik(
+        robot, end_effector, target_pos, down_quat, seed, ik_cache, robot_key, analytic_ik, multi_seed)
+    ik_s = time.perf_counter() - t_phase
 
     if qpos_goal is None:
         log_stderr(f"[{phase_name}] ✗ IK failed.")
+        record(ik_s)
         return None
 
     plan_kwargs = {
@@ -67,309 +1164,804 @@ def move_to(robot, end_effector, down_quat, scene, target_pos, phase_name,
         plan_kwargs["ee_link_name"] = ee_link_name
         log_stderr(f"[{phase_name}]   (Planning with attached payload)")
 
-    path = robot.plan_path(**plan_kwargs)
+    t_plan = time.perf_counter()
+    path, tier = plan_motion(robot, end_effector, plan_kwargs, plan_cache, scene_key, phase_name)
+    plan_s = time.perf_counter() - t_plan
 
     if path is None:
         log_stderr(f"[{phase_name}] ✗ Path planning failed.")
+        record(ik_s, plan_s, tier)
         return None
 
-    log_stderr(f"[{phase_name}] ✓ Executing {len(path)} waypoints.")
+    log_stderr(f"[{phase_name}] ✓ Executing {len(path)} waypoints{' (kinematic)' if kinematic else ''}.")
+    t_step = time.perf_counter()
+    if kinematic:
+        hit, pairs = execute_kinematic(robot, end_effector, path, carried_entity,
+                                       scene.record if isinstance(scene, RecordingScene) else None)
+        if hit is not None:
+            log_stderr(f"[{phase_name}] ✗ Collision at waypoint {hit + 1}/{len(path)}: link pairs {pairs}")
+            record(ik_s, plan_s, tier, hit + 1, 0, time.perf_counter() - t_step,
+                   collision={"waypoint": hit, "pairs": pairs})
+            return None
+        record(ik_s, plan_s, tier, len(path), 0, time.perf_counter() - t_step)
+        return qpos_goal
     for wp in path:
         robot.control_dofs_position(wp)
         scene.step()
-    for _ in range(60):
-        scene.step()
+    steps = settle(scene, robot, qpos_goal, SETTLE_MAX_STEPS["path"], settle_tolerances)
+    log_stderr(f"[{phase_name}]   settled in {steps} steps")
+    record(ik_s, plan_s, tier, len(path), steps, time.perf_counter() - t_step)
     return qpos_goal
 
 
+def run_pick_and_place(handle, motion_targets, z_lift, on_phase=None, settle_tolerances=None, ik_cache=None,
+                       plan_cache=None, ik_backend="genesis", throughput=None, carton_entity=None, home=True,
+                       recorder=None, retries=PHASE_RETRY_BUDGET, ik_seeds=1, mode="physics"):
+    """
+    Run the six-phase suction pick-and-place cycle in a built scene.
+
+    ``carton_entity`` overrides the handle's carton (multi-cycle runs pick
+    pool cartons) and ``home=False`` skips settling at home, so the approach
+    starts wherever the previous cycle retracted. ``place_yaw_deg`` in
+    ``motion_targets`` turns the TCP about the vertical for TRANSPORT and
+    LOWER (pallet pattern cartons). With a ``recorder`` every physics step
+    is appended to it (RecordingScene) and labelled with its phase.
+    A failed motion phase is restored to its start (capture_state /
+    restore_state) and retried up to ``retries`` times per cycle; see
+    PHASE_RETRY_BUDGET. With ``ik_seeds`` > 1 every IK goal is the best of
+    that many seeds solved in one batch (multi_seed_goal). ``mode``
+    "kinematic" validates the cycle without dynamics (see SIM_MODES): paths
+    are set waypoint by waypoint and collision-checked, suction attaches the
+    carton rigidly instead of welding it, and nothing settles, so the timing
+    only counts commanded waypoints (no throughput verdict).
+
+    ``on_phase(name, index)`` is called after each completed phase (the
+    simulation server streams these). Returns the trajectory result keys:
+    ``trajectory_executed``, ``trajectory_status``, ``trajectory_log``,
+    ``phases_completed``, ``trajectory_error`` on failure, ``settle_steps`` (idle
+    steps actually used per phase, see settle()), ``ik_cache`` /
+    ``plan_cache`` (hit rates and solver/planner time saved, when the caches
+    are given), ``planning`` (ladder tier and planning time per phase),
+    ``ik`` (backend and, for "analytic" and multi-seed IK, how each goal
+    was obtained; the chosen seed per phase is under ``timing``),
+    ``mode``, ``timing`` (per-phase wall-clock and simulated time and the cycle time
+    against ``throughput``, Stage 1's throughput_requirement; see
+    cycle_timing()), ``retries`` (budget, retries used, per phase) plus a
+    ``message`` suffix.
+    """
+    scene = handle["scene"]
+    robot_entity = handle["robot"]
+    carton_entity = carton_entity if carton_entity is not None else handle["carton"]
+    home_qpos = HOME_QPOS
+
+    log_stderr("")
+    log_stderr("="*80)
+    log_stderr("🎯 TRAJECTORY EXECUTION STARTING (genesis_world_pnp_7 approach)")
+    log_stderr("="*80)
+
+    trajectory_log = []
+    phase_log = {}
+    dt = scene_dt(scene)
+    kinematic = mode == "kinematic"
+    analytic_ik = analytic_ik_backend(handle) if ik_backend == "analytic" else None
+    multi_seed = multi_seed_backend(handle, ik_seeds, analytic_ik) if ik_seeds > 1 else None
+    ik_report = {"backend": "analytic" if analytic_ik is not None else "genesis",
+                 "seeds": multi_seed["seeds"] if multi_seed is not None else 1}
+    retry_report = {"budget": max(0, int(retries)), "used": 0, "phases": {}}
+
+    def phase_done(name):
+        trajectory_log.append(name)
+        if on_phase is not None:
+            on_phase(name, len(trajectory_log))
+
+    def hold(key, qpos_target, max_steps):
+        # Settle-only phases (home, suction on/off) are timed like motions
+        t0 = time.perf_counter()
+        steps = 0 if kinematic else settle(scene, robot_entity, qpos_target, max_steps, settle_tolerances)
+        wall_s = time.perf_counter() - t0
+        phase_log[key] = phase_timing(dt, wall_s, wall_s, 0, steps)
+
+    def logs(complete):
+        if recorder is not None:
+            recorder.mark_phases(phase_log)
+        # Kinematic cycle times skip settling: no throughput verdict from them
+        timing = cycle_timing(phase_log, dt, None if kinematic else throughput, complete)
+        log_cycle_timing(timing)
+        return {
+            "mode": "kinematic" if kinematic else "physics",
+            "settle_steps": {key: e["settle_steps"] for key, e in phase_log.items()},
+            "planning": {key: {"tier": e["tier"], "s": e["plan_s"]}
+                         for key, e in phase_log.items() if e["tier"] is not None},
+            "timing": timing,
+            "retries": retry_report,
+            "ik": dict(ik_report, **(analytic_ik["stats"] if analytic_ik else {}),
+                       **({"multi_seed": multi_seed["stats"]} if multi_seed else {})),
+            **({"ik_cache": ik_cache.report()} if ik_cache is not None else {}),
+            **({"plan_cache": plan_cache.report()} if plan_cache is not None else {}),
+        }
+
+    try:
+        # Defaults from genesis_world_pnp_7.py: BOX_SIZE=0.20
+        #   PICK_Z  = 0.82 + 0.20 + 0.002 = 1.022
+        #   PLACE_Z = 0.15 + 0.20 + 0.025 = 0.375
+        pick_pos  = np.array(motion_targets.get("pick_target_xyz",  [0.65, 0.0, 1.022]))
+        place_pos = np.array(motion_targets.get("place_target_xyz", [0.0, 0.75, 0.375]))
+        Z_HOVER   = z_lift  # default 0.35 from pnp_7
+
+        log_stderr(f"Pick: {pick_pos}, Place: {place_pos}, Z_HOVER: {Z_HOVER}m")
+
+        end_effector   = robot_entity.get_link('vacuum_gripper/tcp_link')
+        down_quat      = np.array([0, 1, 0, 0])   # 180° around X → suction face toward -Z
+        # Cartons are symmetric under 180°: turn the wrist by at most ±90°
+        place_yaw      = np.radians((float(motion_targets.get("place_yaw_deg") or 0.0) + 90.0) % 180.0 - 90.0)
+        place_quat     = _quat_mul(np.array([np.cos(place_yaw / 2), 0.0, 0.0, np.sin(place_yaw / 2)]), down_quat)
+        ee_link_name   = 'vacuum_gripper/tcp_link'
+        if recorder is not None:
+            scene = RecordingScene(scene, recorder, handle, end_effector, carton_entity)
+
+        # Suction (weld constraint) setup
+        rigid          = scene.sim.rigid_solver
+        ee_idx         = np.array([end_effector.idx], dtype=gs.np_int)
+
+        def suction_on():
+            if handle["weld"] is not None or carton_entity is None:
+                return
+            box_half = 0.10  # BOX_SIZE / 2
+            tcp_z  = float(end_effector.get_pos()[2])
+            box_z  = float(carton_entity.get_pos()[2])
+            box_top = box_z + box_half
+            gap    = tcp_z - box_top
+            status = "✓ GOOD" if abs(gap) < 0.015 else "⚠ MISALIGNED"
+            log_stderr(f"[SUCTION CHECK] TCP z={tcp_z:.4f}  box_top z={box_top:.4f}  gap={gap:+.4f}  {status}")
+            if kinematic:
+                # Carried phases move the carton with the TCP (execute_kinematic)
+                log_stderr("[SUCTION ON]  Carton attached to TCP (kinematic).")
+                return
+            c_idx = np.array([carton_entity.base_link.idx], dtype=gs.np_int)
+            rigid.add_weld_constraint(c_idx, ee_idx)
+            handle["weld"] = (c_idx, ee_idx)
+            log_stderr("[SUCTION ON]  Carton welded to TCP.")
+
+        def suction_off():
+            if kinematic and carton_entity is not None:
+                log_stderr("[SUCTION OFF] Carton released (kinematic).")
+                return
+            if handle["weld"] is None or carton_entity is None:
+                return
+            c_idx = np.array([carton_entity.base_link.idx], dtype=gs.np_int)
+            rigid.delete_weld_constraint(c_idx, ee_idx)
+            handle["weld"] = None
+            log_stderr("[SUCTION OFF] Carton released.")
+
+        def run_phase(key, label, target, quat, init_hint=None, reuse_qpos=None, carried=None, max_nodes=8000):
+            # One motion phase; a failure is restored to the phase's checkpoint
+            # and retried (retry_seed, doubled node budget, no IK cache) while
+            # the cycle's retry budget lasts
+            snapshot = capture_state(handle)
+            spent = {"retry_wall_s": 0.0, "retry_steps": 0}
+            attempt = 0
+            while True:
+                error = None
+                try:
+                    qpos = move_to(robot_entity, end_effector, quat, scene, target, label,
+                                   reuse_qpos=reuse_qpos,
+                                   init_hint=init_hint if attempt == 0 else retry_seed(robot_entity, attempt),
+                                   max_nodes=max_nodes * 2 ** attempt,
+                                   carried_entity=carried,
+                                   ee_link_name=ee_link_name,
+                                   phase_log=phase_log, log_key=key,
+                                   settle_tolerances=settle_tolerances,
+                                   ik_cache=ik_cache if attempt == 0 else None, robot_key=handle["robot_key"],
+                                   plan_cache=plan_cache, scene_key=handle["layout"],
+                                   analytic_ik=analytic_ik, multi_seed=multi_seed, kinematic=kinematic)
+                    if qpos is not None:
+                        error = float(np.linalg.norm(_to_numpy(end_effector.get_pos()) - target))
+                except Exception as e:
+                    if retry_report["used"] >= retry_report["budget"]:
+                        raise
+                    log_stderr(f"[{label}] ✗ {type(e).__name__}: {e}")
+                    qpos = None
+                tracked = error is None or error <= PHASE_POS_TOL
+                if qpos is not None and tracked:
+                    break
+                if retry_report["used"] >= retry_report["budget"]:
+                    if qpos is None:
+                        raise RuntimeError(f"{key} failed")
+                    log_stderr(f"[{label}] ⚠ TCP {error:.3f} m from target, retry budget spent - continuing")
+                    break
+                entry = phase_log.pop(key, {})
+                if plan_cache is not None and entry.get("tier") in ("cache", "cache_reversed"):
+                    # The cached path failed in execution: drop it so the retry plans afresh
+                    plan_cache.reject()
+                spent["retry_wall_s"] += entry.get("wall_s", 0.0)
+                spent["retry_steps"] += entry.get("steps", 0)
+                retry_report["used"] += 1
+                attempt += 1
+                reason = "TCP %.3f m from target" % error if qpos is not None else "failed"
+                log_stderr(f"[{label}] ↺ {reason} - restoring checkpoint, retry {attempt}")
+                restore_state(handle, snapshot)
+            if attempt:
+                retry_report["phases"][key] = attempt
+                phase_log[key].update(retries=attempt, retry_wall_s=round(spent["retry_wall_s"], 4),
+                                      retry_steps=spent["retry_steps"])
+            phase_done(key)
+            return qpos
+
+        # Settle at home
+        if home:
+            if kinematic:
+                go_home(handle)
+            else:
+                log_stderr(f"[INIT] Settling at home (up to {SETTLE_MAX_STEPS['home']} steps)...")
+                robot_entity.control_dofs_position(home_qpos)
+            hold("HOME", home_qpos, SETTLE_MAX_STEPS["home"])
+
+        # Phase 1: APPROACH HOVER above pick
+        hover_pick = run_phase("APPROACH HOVER", "1  APPROACH HOVER", pick_pos + np.array([0, 0, Z_HOVER]),
+                               down_quat, init_hint=home_qpos)
+
+        # Phase 2: PLUNGE to box top surface
+        qpos = run_phase("PLUNGE", "2  PLUNGE to box top", pick_pos, down_quat, init_hint=hover_pick)
+
+        # Engage suction
+        suction_on()
+        hold("SUCTION ON", qpos, SETTLE_MAX_STEPS["suction_on"])
+
+        # Phase 3: LIFT straight up (reuse hover joints)
+        run_phase("LIFT", "3  LIFT", pick_pos + np.array([0, 0, Z_HOVER]), down_quat,
+                  reuse_qpos=hover_pick, carried=carton_entity)
+
+        # Phase 4: TRANSPORT to hover above pallet
+        hover_place = run_phase("TRANSPORT", "4  TRANSPORT", place_pos + np.array([0, 0, Z_HOVER]), place_quat,
+                                init_hint=hover_pick, carried=carton_entity, max_nodes=15000)
+
+        # Phase 5: LOWER box onto pallet
+        qpos = run_phase("LOWER", "5  LOWER to pallet", place_pos, place_quat,
+                         init_hint=hover_place, carried=carton_entity, max_nodes=15000)
+
+        # Release suction
+        suction_off()
+        hold("SUCTION OFF", qpos, SETTLE_MAX_STEPS["suction_off"])
+
+        # Phase 6: RETRACT above pallet
+        run_phase("RETRACT", "6  RETRACT", place_pos + np.array([0, 0, Z_HOVER]), down_quat,
+                  reuse_qpos=hover_place)
+
+        log_stderr("="*80)
+        log_stderr("✅ PICK-AND-PLACE CYCLE COMPLETE")
+        log_stderr("="*80)
+
+        return {
+            "trajectory_executed": True,
+            "trajectory_status": "success",
+            "trajectory_log": trajectory_log,
+            "phases_completed": len(trajectory_log),
+            **logs(True),
+            "message": " Trajectory executed successfully.",
+        }
+
+    except Exception as traj_error:
+        log_stderr(f"❌ Trajectory failed: {traj_error}")
+        return {
+            "trajectory_executed": True,
+            "trajectory_status": "failed",
+            "trajectory_error": str(traj_error),
+            "phases_completed": len(trajectory_log),
+            **logs(False),
+            "message": f" Trajectory failed: {traj_error}",
+        }
+
+
+def capture_state(handle):
+    """
+    Checkpoint for a phase retry: robot joint positions and velocities, the
+    pose of every carton (the only free bodies; fixtures never move) and the
+    active suction weld.
+    """
+    robot = handle["robot"]
+    cartons = handle.get("cartons") or ([handle["carton"]] if handle["carton"] is not None else [])
+    return {
+        "qpos": _to_numpy(robot.get_dofs_position()).copy(),
+        "qvel": _to_numpy(robot.get_dofs_velocity()).copy(),
+        "cartons": [(c, _to_numpy(c.get_pos()).copy(), _to_numpy(c.get_quat()).copy()) for c in cartons],
+        "weld": handle["weld"],
+    }
+
+
+def restore_state(handle, snapshot):
+    """Put the scene back to a capture_state() checkpoint (no scene.reset(), no rebuild)."""
+    if handle["weld"] is not None and handle["weld"] is not snapshot["weld"]:
+        release_weld(handle)
+    robot = handle["robot"]
+    robot.set_dofs_position(snapshot["qpos"])
+    robot.set_dofs_velocity(snapshot["qvel"])
+    robot.control_dofs_position(snapshot["qpos"])
+    for carton, pos, quat in snapshot["cartons"]:
+        carton.set_pos(pos)
+        carton.set_quat(quat)
+        carton.zero_all_dofs_velocity()
+    if snapshot["weld"] is not None and handle["weld"] is None:
+        handle["scene"].sim.rigid_solver.add_weld_constraint(*snapshot["weld"])
+        handle["weld"] = snapshot["weld"]
+
+
+def retry_seed(robot, attempt):
+    """IK seed for retry ``attempt``: the arm's current joints, then home, then random joints within the limits."""
+    if attempt == 1:
+        return robot.get_dofs_position()
+    if attempt == 2:
+        return HOME_QPOS
+    lo, hi = (np.clip(_to_numpy(limit), -np.pi, np.pi) for limit in robot.get_dofs_limit())
+    return np.random.default_rng(attempt).uniform(lo, hi)
+
+
+def feed_carton(handle, carton_entity, motion_targets):
+    """Put a pool carton at the pick position on the conveyor, at rest."""
+    comp = handle["carton_component"] or {}
+    pos = comp.get("position") or motion_targets.get("box_spawn_pos")
+    carton_entity.set_pos(np.asarray(pos, dtype=float))
+    carton_entity.set_quat(euler_to_quat(comp.get("orientation") or [0, 0, 0]))
+    carton_entity.zero_all_dofs_velocity()
+
+
+def reachable_place_targets(handle, place_targets, z_lift):
+    """
+    Place targets the scene's robot can serve, kept in their Stage 2 order
+    (pallet_place_targets fills each layer farthest-first, so the arm never
+    reaches over a carton it has already placed). A target is served when
+    the TCP pointing down reaches it and its hover point ``z_lift`` above -
+    closed-form IK for the UR arms, the reach map otherwise; with neither
+    every target is kept.
+
+    Returns (list of (pattern index, target), list of skipped entries with
+    the pattern index, target and reason).
+    """
+    if not place_targets:
+        return [], []
+    model, _, base_pos, base_yaw = kinematic_model(handle)
+    import ur_ik
+    from placement_core import load_reach_map
+    xyz = np.array([t[:3] for t in place_targets], dtype=float)
+    c, s = np.cos(-base_yaw), np.sin(-base_yaw)
+    rz = np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+    points = np.vstack([xyz, xyz + [0.0, 0.0, z_lift]]) - base_pos
+    local = points @ rz.T
+    reach_map = None if model is None or ur_ik.ur_model(model) else load_reach_map(model)
+    if model is not None and ur_ik.ur_model(model):
+        ok, check = ur_ik.ur_reachable(model, local), "analytic IK"
+    elif reach_map is not None:
+        ok, check = reach_map.reachable(local), "reach map"
+    else:
+        ok, check = np.ones(len(points), dtype=bool), None
+    ok = ok[:len(xyz)] & ok[len(xyz):]
+    served = [(int(i), place_targets[i]) for i in np.flatnonzero(ok)]
+    skipped = [{"index": int(i), "place_target": place_targets[i], "reason": f"unreachable ({check})"}
+               for i in np.flatnonzero(~ok)]
+    return served, skipped
+
+
+def run_cycles(handle, motion_targets, z_lift, cycles, on_phase=None, settle_tolerances=None, ik_cache=None,
+               plan_cache=None, ik_backend="genesis", throughput=None, recorder=None,
+               retries=PHASE_RETRY_BUDGET, ik_seeds=1, mode="physics"):
+    """
+    Consecutive pick-and-place cycles into the pallet pattern.
+
+    Cycle k picks pool carton k (build_scene(carton_pool=...)), fed onto the
+    conveyor at the pick position once the previous carton is on the pallet,
+    and places it at the k-th place target the robot can serve
+    (reachable_place_targets: pattern order, unreachable slots skipped and
+    reported instead of failing the run); only the first
+    cycle starts from home, later ones approach straight from the previous
+    retract, which is the reversed TRANSPORT path and comes from the plan
+    cache. Stops at the first failed cycle. ``cycles`` is clipped to the pool
+    and the served targets.
+
+    Returns the trajectory result keys (``trajectory_status`` "success" only
+    when every cycle completed; ``phases_completed`` of the last cycle run),
+    ``cycles`` (per-cycle place target, status, simulated and wall time,
+    planning tiers, phase retries used) and ``sustained``: completed cycles, the failed cycle
+    index, mean / std / variance / min / max simulated cycle time over the
+    steady-state cycles (all but the first, which starts from home, when
+    more than one completed), cycles per hour, the skipped place targets and,
+    with ``throughput`` in physics mode, whether that meets the Stage 1
+    target.
+    """
+    pattern = motion_targets.get("place_targets") or []
+    served, skipped = reachable_place_targets(handle, pattern, z_lift)
+    if skipped:
+        log_stderr(f"⚠️  Skipping {len(skipped)}/{len(pattern)} place targets out of reach: "
+                   f"{[entry['index'] for entry in skipped]}")
+    place_targets = [target for _, target in served]
+    cartons = handle["cartons"]
+    count = min(int(cycles), len(cartons), len(place_targets))
+    if count < cycles:
+        log_stderr(f"⚠️  {cycles} cycles requested, running {count} "
+                   f"({len(cartons)} cartons in the pool, {len(place_targets)} reachable place targets)")
+
+    per_cycle = []
+    trajectory = {}
+    failed_cycle = None
+    t0 = time.perf_counter()
+    for k in range(count):
+        log_stderr(f"\n🔁 Cycle {k + 1}/{count} → place target {place_targets[k]}")
+        carton = cartons[k]
+        if k:
+            feed_carton(handle, carton, motion_targets)
+        targets = dict(motion_targets, place_target_xyz=list(place_targets[k][:3]),
+                       place_yaw_deg=place_targets[k][3] if len(place_targets[k]) > 3 else 0.0)
+
+        def cycle_phase(name, index, k=k):
+            if on_phase is not None:
+                on_phase(f"{name} #{k + 1}", k * len(PHASE_NAMES) + index)
+
+        trajectory = run_pick_and_place(handle, targets, z_lift, cycle_phase, settle_tolerances, ik_cache,
+                                        plan_cache, ik_backend, throughput, carton_entity=carton, home=k == 0,
+                                        recorder=recorder, retries=retries, ik_seeds=ik_seeds,
+                                        mode=mode)
+        timing = trajectory["timing"]
+        per_cycle.append({
+            "cycle": k,
+            "place_target": place_targets[k],
+            "pattern_index": served[k][0],
+            "status": trajectory["trajectory_status"],
+            "cycle_time_s": timing["cycle_time_s"],
+            "wall_s": timing["wall_s"],
+            "planning": {key: e["tier"] for key, e in trajectory["planning"].items()},
+            "retries": trajectory["retries"]["used"],
+            **({"error": trajectory["trajectory_error"]} if "trajectory_error" in trajectory else {}),
+        })
+        if trajectory["trajectory_status"] != "success":
+            failed_cycle = k
+            release_weld(handle)
+            break
+
+    completed = [c["cycle_time_s"] for c in per_cycle if c["status"] == "success"]
+    steady = np.array(completed[1:] if len(completed) > 1 else completed, dtype=float)
+    sustained = {
+        "cycles_requested": int(cycles),
+        "cycles_run": len(per_cycle),
+        "cycles_completed": len(completed),
+        "failed_cycle": failed_cycle,
+        "place_targets_served": len(place_targets),
+        "skipped_targets": skipped,
+        "wall_s": round(time.perf_counter() - t0, 3),
+    }
+    if len(steady):
+        mean = float(steady.mean())
+        sustained.update({
+            "mean_cycle_time_s": round(mean, 3),
+            "std_cycle_time_s": round(float(steady.std()), 4),
+            "variance_cycle_time_s2": round(float(steady.var()), 6),
+            "min_cycle_time_s": round(float(steady.min()), 3),
+            "max_cycle_time_s": round(float(steady.max()), 3),
+            "cycles_per_hour": round(3600.0 / mean, 1) if mean > 0 else None,
+        })
+        required = required_cycle_time(throughput) if mode != "kinematic" else None
+        if required and mean > 0:
+            sustained["required_cycle_time_s"] = round(required, 3)
+            sustained["meets_target"] = failed_cycle is None and mean <= required
+    log_stderr(f"🔁 {len(completed)}/{count} cycles completed"
+               + (f", {sustained['cycles_per_hour']} cycles/h sustained" if sustained.get("cycles_per_hour") else "")
+               + (f", failed at cycle {failed_cycle}" if failed_cycle is not None else ""))
+
+    all_done = failed_cycle is None and count > 0
+    result = {key: trajectory[key] for key in ("mode", "ik", "ik_cache", "plan_cache") if key in trajectory}
+    result.update({
+        "trajectory_executed": True,
+        "trajectory_status": "success" if all_done else "failed",
+        "phases_completed": trajectory.get("phases_completed", 0),
+        "cycles": per_cycle,
+        "sustained": sustained,
+        "message": f" {len(completed)}/{count} cycles completed"
+                   + (f" ({sustained['cycles_per_hour']} cycles/h)." if sustained.get("cycles_per_hour") else "."),
+    })
+    if not all_done:
+        result["trajectory_error"] = (trajectory.get("trajectory_error")
+                                      or f"no cycles could run ({len(place_targets)} of {len(pattern)} "
+                                         f"place targets reachable)")
+    return result
+
+
+def run_pick_and_place_batched(handle, env_targets, z_lift, settle_tolerances=None):
+    """
+    Six-phase cycle for every environment of a batched scene in lockstep:
+    one batched IK call and one batched plan per phase, waypoints stepped
+    together. An environment whose IK misses by more than IK_POS_TOLERANCE
+    or whose plan is invalid drops out (it stops receiving commands); the
+    others carry on.
+
+    ``env_targets`` holds one motion_targets dict per environment. Returns
+    ``environments`` (per-env passed / phases_completed / failed_phase),
+    ``phase_timings`` (wall seconds, active environments, waypoints, physics
+    steps and simulated seconds per phase) and ``settle_steps`` (idle steps
+    until every active environment settled).
+    """
+    scene = handle["scene"]
+    robot_entity = handle["robot"]
+    carton_entity = handle["carton"]
+    n_envs = handle["n_envs"]
+
+    pick_pos = np.array([t.get("pick_target_xyz", [0.65, 0.0, 1.022]) for t in env_targets], dtype=float)
+    place_pos = np.array([t.get("place_target_xyz", [0.0, 0.75, 0.375]) for t in env_targets], dtype=float)
+    hover = np.array([0, 0, z_lift])
+
+    ee_link_name = 'vacuum_gripper/tcp_link'
+    end_effector = robot_entity.get_link(ee_link_name)
+    down_quat = np.tile([0, 1, 0, 0], (n_envs, 1))   # suction face toward -Z
+    rigid = scene.sim.rigid_solver
+    ee_idx = np.array([end_effector.idx], dtype=gs.np_int)
+
+    active = np.ones(n_envs, dtype=bool)
+    failed_phase = [None] * n_envs
+    phase_timings = []
+    settle_log = {}
+    dt = scene_dt(scene)
+
+    def settle_active(key, qpos_target, max_steps):
+        envs_idx = np.flatnonzero(active)
+        if not len(envs_idx):
+            settle_log[key] = 0
+            return
+        settle_log[key] = settle(scene, robot_entity, _to_numpy(qpos_target)[envs_idx], max_steps,
+                                 settle_tolerances, envs_idx=envs_idx)
+
+    def fail(mask, name):
+        for i in np.flatnonzero(mask & active):
+            failed_phase[i] = name
+            log_stderr(f"[{name}] ✗ env {i} dropped out")
+        active[mask] = False
+
+    def move(target, name, init_hint=None, reuse_qpos=None, carried_entity=None, max_nodes=8000):
+        t0 = time.perf_counter()
+        n_active = int(active.sum())
+        log_stderr(f"\n[{name}] {n_active}/{n_envs} environments")
+        if reuse_qpos is not None:
+            qpos_goal = reuse_qpos
+        else:
+            qpos_goal, error = robot_entity.inverse_kinematics(
+                link=end_effector,
+                pos=target,
+                quat=down_quat,
+                rot_mask=[True, True, True],
+                init_qpos=init_hint,
+                return_error=True,
+            )
+            qpos_goal = _to_numpy(qpos_goal)
+            error = _to_numpy(error).reshape(n_envs, -1)
+            fail(np.linalg.norm(error[:, :3], axis=1) > IK_POS_TOLERANCE, name)
+
+        envs_idx = np.flatnonzero(active)
+        waypoints = 0
+        if len(envs_idx):
+            plan_kwargs = {
+                "qpos_goal": qpos_goal[envs_idx],
+                "num_waypoints": 200,
+                "smooth_path": False,
+                "max_nodes": max_nodes,
+                "envs_idx": envs_idx,
+                "return_valid_mask": True,
+            }
+            if carried_entity is not None:
+                plan_kwargs["with_entity"] = carried_entity
+                plan_kwargs["ee_link_name"] = ee_link_name
+            path, valid = robot_entity.plan_path(**plan_kwargs)
+            invalid = np.zeros(n_envs, dtype=bool)
+            invalid[envs_idx[~_to_numpy(valid).astype(bool)]] = True
+            fail(invalid, name)
+            # Only environments with a valid plan are driven; path rows follow envs_idx
+            rows = np.flatnonzero(active[envs_idx]).tolist()
+            envs_idx = np.flatnonzero(active)
+            if len(envs_idx):
+                log_stderr(f"[{name}] ✓ Executing {len(path)} waypoints in {len(envs_idx)} environments.")
+                waypoints = len(path)
+                for wp in path:
+                    robot_entity.control_dofs_position(wp[rows], envs_idx=envs_idx)
+                    scene.step()
+        settle_active(name, qpos_goal, SETTLE_MAX_STEPS["path"])
+        steps = waypoints + settle_log[name]
+        phase_timings.append({"phase": name, "s": round(time.perf_counter() - t0, 3),
+                              "active_envs": n_active, "waypoints": waypoints, "steps": steps,
+                              "sim_s": round(steps * dt, 3)})
+        return qpos_goal
+
+    def suction(on):
+        envs_idx = np.flatnonzero(active)
+        if carton_entity is None or not len(envs_idx):
+            return
+        c_idx = np.array([carton_entity.base_link.idx], dtype=gs.np_int)
+        if on:
+            rigid.add_weld_constraint(c_idx, ee_idx, envs_idx=envs_idx)
+            handle["weld"] = (c_idx, ee_idx, envs_idx)
+        else:
+            rigid.delete_weld_constraint(*handle["weld"])
+            handle["weld"] = None
+        log_stderr(f"[SUCTION {'ON' if on else 'OFF'}] {len(envs_idx)} environments.")
+
+    log_stderr("")
+    log_stderr("=" * 80)
+    log_stderr(f"🎯 BATCHED TRAJECTORY EXECUTION ({n_envs} environments)")
+    log_stderr("=" * 80)
+
+    home_qpos = np.tile(HOME_QPOS, (n_envs, 1))
+    robot_entity.control_dofs_position(home_qpos)
+    settle_active("HOME", home_qpos, SETTLE_MAX_STEPS["home"])
+
+    hover_pick = move(pick_pos + hover, "APPROACH HOVER", init_hint=home_qpos)
+    plunge = move(pick_pos, "PLUNGE", init_hint=hover_pick)
+    suction(True)
+    settle_active("SUCTION ON", plunge, SETTLE_MAX_STEPS["suction_on"])
+    move(pick_pos + hover, "LIFT", reuse_qpos=hover_pick, carried_entity=carton_entity)
+    hover_place = move(place_pos + hover, "TRANSPORT", init_hint=hover_pick,
+                       carried_entity=carton_entity, max_nodes=15000)
+    lower = move(place_pos, "LOWER", init_hint=hover_place, carried_entity=carton_entity, max_nodes=15000)
+    suction(False)
+    settle_active("SUCTION OFF", lower, SETTLE_MAX_STEPS["suction_off"])
+    move(place_pos + hover, "RETRACT", reuse_qpos=hover_place)
+
+    environments = [{
+        "env": i,
+        "passed": failed_phase[i] is None,
+        "phases_completed": len(PHASE_NAMES) if failed_phase[i] is None else PHASE_NAMES.index(failed_phase[i]),
+        "failed_phase": failed_phase[i],
+    } for i in range(n_envs)]
+    log_stderr(f"✅ Batched cycle done: {int(active.sum())}/{n_envs} environments passed")
+    return {"environments": environments, "phase_timings": phase_timings, "settle_steps": settle_log}
+
+
+def execute_request(handle, request, on_phase=None):
+    """Stage 3 result for a parsed request in a built scene (runs the cycle if requested)."""
+    result = scene_result(handle)
+    if request["execute_trajectory"] and handle["robot"] is not None and request["motion_targets"]:
+        ik_cache = open_ik_cache(request["ik_cache"])
+        plan_cache = open_plan_cache(request["plan_cache"])
+        recorder = open_recorder(handle, request["record"], request["mode"])
+        try:
+            if request["cycles"] > 1:
+                trajectory = run_cycles(handle, request["motion_targets"], request["z_lift"], request["cycles"],
+                                        on_phase, request["settle"], ik_cache, plan_cache, request["ik_backend"],
+                                        request["throughput"], recorder, request["retries"], request["ik_seeds"],
+                                        request["mode"])
+            else:
+                trajectory = run_pick_and_place(handle, request["motion_targets"], request["z_lift"], on_phase,
+                                                request["settle"], ik_cache, plan_cache, request["ik_backend"],
+                                                request["throughput"], recorder=recorder,
+                                                retries=request["retries"], ik_seeds=request["ik_seeds"],
+                                                mode=request["mode"])
+        finally:
+            for cache in (ik_cache, plan_cache):
+                if cache is not None:
+                    cache.close()
+        if recorder is not None:
+            trajectory["recording"] = save_recording(recorder, request["record"])
+        message = trajectory.pop("message")
+        result.update(trajectory)
+        result["message"] += message
+    return result
+
+
+def sweep_layouts(input_data, templates):
+    """
+    Run every entry of ``input_data["layouts"]`` (each overrides keys of the
+    base input, e.g. ``components`` and ``motion_targets``) through one
+    TemplateScenes pool. Returns the sweep result: per-layout results with
+    how their scene was obtained and its set-up time, plus pool counters.
+    """
+    base = {k: v for k, v in input_data.items() if k != "layouts"}
+    results = []
+    t0 = time.perf_counter()
+    for i, layout in enumerate(input_data["layouts"]):
+        log_stderr(f"🧭 Layout {i + 1}/{len(input_data['layouts'])}")
+        request = parse_request(dict(base, **layout))
+        t_layout = time.perf_counter()
+        if not request["components"]:
+            results.append({"success": False, "error": "No components"})
+            continue
+        handle, how = templates.scene_for(request["components"], request["cycles"])
+        setup_s = time.perf_counter() - t_layout
+        result = execute_request(handle, request)
+        result["scene"] = {"how": how, "setup_s": round(setup_s, 3),
+                           "total_s": round(time.perf_counter() - t_layout, 3)}
+        results.append(result)
+    total_s = time.perf_counter() - t0
+    return {
+        "success": all(r.get("success") for r in results),
+        "layouts": results,
+        "sweep": {"count": len(results), **templates.stats, "total_s": round(total_s, 3)},
+        "message": f"Swept {len(results)} layouts ({templates.stats['built']} scene builds).",
+    }
+
+
+def run_layouts_batched(input_data):
+    """
+    Simulate every entry of ``input_data["layouts"]`` as one environment of
+    a single batched scene. All layouts must use the same assets; otherwise
+    they are swept one by one (sweep_layouts). Returns per-environment
+    pass/fail with the shared phase timings.
+    """
+    headless = headless_requested(input_data)
+    base = {k: v for k, v in input_data.items() if k not in ("layouts", "batched")}
+    requests = [parse_request(dict(base, **layout)) for layout in input_data["layouts"]]
+    if (any(not r["components"] for r in requests)
+            or len({asset_signature(r["components"]) for r in requests}) > 1):
+        log_stderr("⚠️  Layouts do not share one asset set - sweeping them one by one")
+        return dict(sweep_layouts(input_data, TemplateScenes(headless)), batched=False)
+
+    t0 = time.perf_counter()
+    handle = build_scene(requests[0]["components"], headless, n_envs=len(requests))
+    place_environments(handle, [r["components"] for r in requests])
+    build_s = time.perf_counter() - t0
+
+    result = scene_result(handle)
+    result.update({"batched": True, "n_envs": len(requests), "build_s": round(build_s, 3)})
+    if handle["robot"] is not None and requests[0]["execute_trajectory"]:
+        t_run = time.perf_counter()
+        batch = run_pick_and_place_batched(handle, [r["motion_targets"] for r in requests], requests[0]["z_lift"],
+                                           requests[0]["settle"])
+        result.update(batch)
+        result["run_s"] = round(time.perf_counter() - t_run, 3)
+        passed = sum(env["passed"] for env in batch["environments"])
+        result["passed"] = passed
+        result["message"] += f" Batched cycle: {passed}/{len(requests)} environments passed."
+    return result
+
+
 def main():
     try:
         log_stderr("📥 Reading JSON input...")
         input_data = json.load(sys.stdin)
         log_stderr(f"✅ Parsed, keys: {list(input_data.keys())}")
-        
-        # Unwrap if agent passed data nested under a wrapper key
-        # (agent sometimes wraps args when calling run_skill_script_tool)
-        for wrapper_key in ("genesis_input", "scene_data", "genesis_data", "data"):
-            if (wrapper_key in input_data
-                    and "components" not in input_data
-                    and "robot" not in input_data):
-                log_stderr(f"🔄 Unwrapping '{wrapper_key}' wrapper key...")
-                input_data = input_data[wrapper_key]
-                log_stderr(f"✅ Unwrapped, new keys: {list(input_data.keys())}")
-                break
-        
-        # Build complete components list (robot + other components)
-        components = []
-        
-        # Add robot if provided
-        robot_data = input_data.get("robot")
-        if robot_data:
-            log_stderr(f"🤖 Robot data found: {robot_data.get('name')}")
-            # Support urdf / urdf_path / mjcf_path key names
-            robot_urdf = (robot_data.get("urdf")
-                          or robot_data.get("urdf_path")
-                          or robot_data.get("mjcf_path"))
-            robot_component = {
-                "name": robot_data.get("name", "robot"),
-                "component_type": "robot",  # CRITICAL: Mark as robot
-                "urdf": robot_urdf,
-                "position": robot_data.get("position"),
-                "orientation": robot_data.get("orientation", [0, 0, 0])
-            }
-            components.append(robot_component)
-            log_stderr(f"  ✅ Robot added to components list (urdf={robot_urdf})")
-        
-        # Add other components — support both 'components' and 'workcell_components' keys
-        other_components = input_data.get("components") or input_data.get("workcell_components", [])
-        components.extend(other_components)
-        
-        execute_motion = input_data.get("execute_trajectory", False)
-        motion_targets = input_data.get("motion_targets", {})
-        z_lift = input_data.get("z_lift", 0.35)  # Z_HOVER from genesis_world_pnp_7.py
-        
+
+        # Layout sweep (one template scene per asset set) or batched
+        # environments (one scene for all); always exits when done
+        if input_data.get("layouts"):
+            headless = headless_requested(input_data)
+            init_genesis(headless)
+            if input_data.get("batched"):
+                result = run_layouts_batched(input_data)
+            else:
+                templates = TemplateScenes(headless, reuse=input_data.get("reuse_template", True))
+                result = sweep_layouts(input_data, templates)
+            print(json.dumps(result, indent=2), flush=True)
+            shutdown(0)
+
+        request = parse_request(input_data)
+        components = request["components"]
+        headless = request["headless"]
+
         log_stderr(f"📦 Total components: {len(components)}")
-        log_stderr(f"🎯 Execute trajectory: {execute_motion}")
-        
+        log_stderr(f"🎯 Execute trajectory: {request['execute_trajectory']}")
+        log_stderr(f"🖥️  Mode: {'headless (cpu, no viewer)' if headless else 'viewer (gpu)'}")
+
         if not components:
             print(json.dumps({"error": "No components", "success": False}))
             sys.exit(1)
 
-        # Initialize Genesis
-        log_stderr("🚀 Initializing Genesis...")
-        gs.init(backend=gs.gpu)
-        scene = gs.Scene(show_viewer=True)
-        scene.add_entity(gs.morphs.Plane())
-        log_stderr("✅ Genesis initialized")
-
-        # Spawn components
-        log_stderr(f"📦 Spawning {len(components)} components...")
-        log_stderr(f"")
-        log_stderr(f"Component List:")
-        for i, comp in enumerate(components):
-            log_stderr(f"  {i+1}. {comp.get('name')} - type: {comp.get('component_type', 'unknown')}")
-        log_stderr(f"")
-        
-        spawned = []
-        robot_entity = None
-        carton_entity = None
-        
-        for comp in components:
-            # Support urdf / urdf_path / mjcf_path key names
-            urdf = (comp.get("urdf")
-                    or comp.get("mjcf_path")
-                    or comp.get("urdf_path"))
-            pos = comp.get("position")
-            name = comp.get("name")
-            comp_type = comp.get("component_type", "unknown").lower()  # normalise case
-            
-            if not urdf or not os.path.exists(urdf):
-                log_stderr(f"  ⚠️  {name}: File not found (path={urdf})")
-                spawned.append({"component_name": name, "status": "skipped"})
-                continue
-            
-            log_stderr(f"  - {name} ({comp_type}) at {pos}")
-            entity = scene.add_entity(gs.morphs.MJCF(file=urdf, pos=pos))
-            
-            if comp_type == "robot":
-                robot_entity = entity
-                log_stderr(f"    🤖 Stored as robot")
-            elif comp_type in ("carton", "box", "cardboard_box", "carton_to_palletize", "object"):
-                carton_entity = entity
-                log_stderr(f"    📦 Stored as carton")
-            
-            spawned.append({
-                "component_name": name,
-                "urdf": urdf,
-                "position": pos,
-                "status": "spawned"
-            })
-
-        # Build scene
-        log_stderr("🔨 Building scene...")
-        scene.build()
-        log_stderr("✅ Scene built")
-        
-        # Set home pose (mirrors genesis_world_pnp_7.py)
-        home_qpos = np.array([0.0, -np.pi/2, np.pi/2, -np.pi/2, -np.pi/2, 0.0])
-        if robot_entity is not None:
-            robot_entity.set_dofs_position(home_qpos)
-            robot_entity.control_dofs_position(home_qpos)
-            log_stderr("🏠 Home pose set")
-        
-        log_stderr("👁️  Genesis viewer is now open")
-        
-        # Prepare base result
-        result = {
-            "success": True,
-            "spawned_components": spawned,
-            "robot_available": robot_entity is not None,
-            "carton_available": carton_entity is not None,
-            "message": "Genesis scene built successfully."
-        }
-        
-        # Execute trajectory if requested
-        if execute_motion and robot_entity is not None and motion_targets:
-            log_stderr("")
-            log_stderr("="*80)
-            log_stderr("🎯 TRAJECTORY EXECUTION STARTING (genesis_world_pnp_7 approach)")
-            log_stderr("="*80)
-            
-            try:
-                # Defaults from genesis_world_pnp_7.py: BOX_SIZE=0.20
-                #   PICK_Z  = 0.82 + 0.20 + 0.002 = 1.022
-                #   PLACE_Z = 0.15 + 0.20 + 0.025 = 0.375
-                pick_pos  = np.array(motion_targets.get("pick_target_xyz",  [0.65, 0.0, 1.022]))
-                place_pos = np.array(motion_targets.get("place_target_xyz", [0.0, 0.75, 0.375]))
-                Z_HOVER   = z_lift  # default 0.35 from pnp_7
-
-                log_stderr(f"Pick: {pick_pos}, Place: {place_pos}, Z_HOVER: {Z_HOVER}m")
-
-                end_effector   = robot_entity.get_link('vacuum_gripper/tcp_link')
-                down_quat      = np.array([0, 1, 0, 0])   # 180° around X → suction face toward -Z
-                ee_link_name   = 'vacuum_gripper/tcp_link'
-
-                # Suction (weld constraint) setup
-                rigid          = scene.sim.rigid_solver
-                ee_idx         = np.array([end_effector.idx], dtype=gs.np_int)
-                weld_active    = False
-
-                def suction_on():
-                    nonlocal weld_active
-                    if weld_active or carton_entity is None:
-                        return
-                    box_half = 0.10  # BOX_SIZE / 2
-                    tcp_z  = float(end_effector.get_pos()[2])
-                    box_z  = float(carton_entity.get_pos()[2])
-                    box_top = box_z + box_half
-                    gap    = tcp_z - box_top
-                    status = "✓ GOOD" if abs(gap) < 0.015 else "⚠ MISALIGNED"
-                    log_stderr(f"[SUCTION CHECK] TCP z={tcp_z:.4f}  box_top z={box_top:.4f}  gap={gap:+.4f}  {status}")
-                    c_idx = np.array([carton_entity.base_link.idx], dtype=gs.np_int)
-                    rigid.add_weld_constraint(c_idx, ee_idx)
-                    weld_active = True
-                    log_stderr("[SUCTION ON]  Carton welded to TCP.")
-
-                def suction_off():
-                    nonlocal weld_active
-                    if not weld_active or carton_entity is None:
-                        return
-                    c_idx = np.array([carton_entity.base_link.idx], dtype=gs.np_int)
-                    rigid.delete_weld_constraint(c_idx, ee_idx)
-                    weld_active = False
-                    log_stderr("[SUCTION OFF] Carton released.")
-
-                trajectory_log = []
-
-                # Settle at home
-                log_stderr("[INIT] Settling at home (100 steps)...")
-                for _ in range(100):
-                    robot_entity.control_dofs_position(home_qpos)
-                    scene.step()
+        # Initialize Genesis, spawn components and build the scene
+        init_genesis(headless)
+        handle = build_scene(components, headless, carton_pool=request["cycles"])
+        scene = handle["scene"]
 
-                # Phase 1: APPROACH HOVER above pick
-                hover_pick = move_to(robot_entity, end_effector, down_quat, scene,
-                                     pick_pos + np.array([0, 0, Z_HOVER]),
-                                     "1  APPROACH HOVER",
-                                     init_hint=home_qpos,
-                                     ee_link_name=ee_link_name)
-                if hover_pick is None:
-                    raise RuntimeError("APPROACH HOVER failed")
-                trajectory_log.append("APPROACH HOVER")
-
-                # Phase 2: PLUNGE to box top surface
-                qpos = move_to(robot_entity, end_effector, down_quat, scene,
-                               pick_pos,
-                               "2  PLUNGE to box top",
-                               init_hint=hover_pick,
-                               ee_link_name=ee_link_name)
-                if qpos is None:
-                    raise RuntimeError("PLUNGE failed")
-                trajectory_log.append("PLUNGE")
-
-                # Engage suction
-                suction_on()
-                for _ in range(30):
-                    scene.step()
+        if not headless:
+            log_stderr("👁️  Genesis viewer is now open")
 
-                # Phase 3: LIFT straight up (reuse hover joints)
-                qpos = move_to(robot_entity, end_effector, down_quat, scene,
-                               pick_pos + np.array([0, 0, Z_HOVER]),
-                               "3  LIFT",
-                               reuse_qpos=hover_pick,
-                               carried_entity=carton_entity,
-                               ee_link_name=ee_link_name)
-                if qpos is None:
-                    raise RuntimeError("LIFT failed")
-                trajectory_log.append("LIFT")
-
-                # Phase 4: TRANSPORT to hover above pallet
-                hover_place = move_to(robot_entity, end_effector, down_quat, scene,
-                                      place_pos + np.array([0, 0, Z_HOVER]),
-                                      "4  TRANSPORT",
-                                      init_hint=hover_pick,
-                                      carried_entity=carton_entity,
-                                      max_nodes=15000,
-                                      ee_link_name=ee_link_name)
-                if hover_place is None:
-                    raise RuntimeError("TRANSPORT failed")
-                trajectory_log.append("TRANSPORT")
-
-                # Phase 5: LOWER box onto pallet
-                qpos = move_to(robot_entity, end_effector, down_quat, scene,
-                               place_pos,
-                               "5  LOWER to pallet",
-                               init_hint=hover_place,
-                               carried_entity=carton_entity,
-                               max_nodes=15000,
-                               ee_link_name=ee_link_name)
-                if qpos is None:
-                    raise RuntimeError("LOWER failed")
-                trajectory_log.append("LOWER")
-
-                # Release suction
-                suction_off()
-                for _ in range(60):
-                    scene.step()
+        # Build result, plus the trajectory if requested
+        result = execute_request(handle, request)
 
-                # Phase 6: RETRACT above pallet
-                qpos = move_to(robot_entity, end_effector, down_quat, scene,
-                               place_pos + np.array([0, 0, Z_HOVER]),
-                               "6  RETRACT",
-                               reuse_qpos=hover_place,
-                               ee_link_name=ee_link_name)
-                if qpos is None:
-                    raise RuntimeError("RETRACT failed")
-                trajectory_log.append("RETRACT")
-
-                log_stderr("="*80)
-                log_stderr("✅ PICK-AND-PLACE CYCLE COMPLETE")
-                log_stderr("="*80)
-
-                result["trajectory_executed"] = True
-                result["trajectory_status"] = "success"
-                result["trajectory_log"] = trajectory_log
-                result["phases_completed"] = len(trajectory_log)
-                result["message"] += " Trajectory executed successfully."
-
-            except Exception as traj_error:
-                log_stderr(f"❌ Trajectory failed: {traj_error}")
-                result["trajectory_executed"] = True
-                result["trajectory_status"] = "failed"
-                result["trajectory_error"] = str(traj_error)
-                result["message"] += f" Trajectory failed: {traj_error}"
-        
         # Output result
         log_stderr("📤 Sending result JSON...")
         print(json.dumps(result, indent=2), flush=True)
         log_stderr("✅ JSON sent")
-        
+
+        # Batch runs are done once the result is out
+        if headless:
+            log_stderr("⏹️  Headless run complete, exiting")
+            shutdown(0)
+
         # Keep scene alive
         log_stderr("")
         log_stderr("🔄 Entering simulation loop to keep viewer open...")
         log_stderr("   (Close viewer window or press Ctrl+C to exit)")
-        
-        import time
+
         try:
             step_count = 0
             while True:
@@ -381,7 +1973,7 @@ def main():
         except KeyboardInterrupt:
             log_stderr("⏹️  Stopped")
             sys.exit(0)
-        
+
     except Exception as e:
         import traceback
         log_stderr(f"❌ FATAL ERROR: {type(e).__name__}: {e}")
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Motion caches for the Genesis pick-and-place cycle (no Genesis import)
+
+IK solutions are stored in a local SQLite file shared by every run and
+process. A solution is keyed by the robot (MJCF file and base pose), the
+target position/quaternion quantized to IK_POS_QUANTUM/IK_QUAT_QUANTUM and
+the seed configuration quantized to IK_SEED_BUCKET, so the same target
+reached from a similar seed returns the same joint solution without
+running the solver. A target cached only under another seed bucket is
+returned as a warm start instead.
+
+Planned joint paths are stored the same way (PlanCache), per scene
+fingerprint. A stored path whose start and goal match a new query within
+PLAN_MATCH_TOL serves it directly, or reversed when the query runs the
+other way (LIFT retraces PLUNGE, RETRACT retraces LOWER). The caller
+collision-checks a cached path before using it and plans only on a miss.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Override with GENESIS_IK_CACHE_PATH; "off" disables the cache
+DEFAULT_IK_CACHE_PATH = Path(__file__).resolve().parents[3] / "output" / "ik_cache.sqlite3"
+
+# Least-recently-used entries beyond this count are evicted (GENESIS_IK_CACHE_MAX_ENTRIES)
+DEFAULT_IK_CACHE_MAX_ENTRIES = 20000
+
+# Quantization of the cache key: 1 mm target position, 0.01 quaternion
+# component, 0.25 rad seed joints (seeds in one bucket converge to one branch)
+IK_POS_QUANTUM = 0.001
+IK_QUAT_QUANTUM = 0.01
+IK_SEED_BUCKET = 0.25
+
+# Override with GENESIS_PLAN_CACHE_PATH; "off" disables the cache
+DEFAULT_PLAN_CACHE_PATH = Path(__file__).resolve().parents[3] / "output" / "plan_cache.sqlite3"
+
+# Least-recently-used paths beyond this count are evicted (GENESIS_PLAN_CACHE_MAX_ENTRIES)
+DEFAULT_PLAN_CACHE_MAX_ENTRIES = 5000
+
+# A stored path serves a query whose start and goal joints are all within this of its own (rad)
+PLAN_MATCH_TOL = 0.02
+
+
+def _digest(payload):
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _quantize(values, quantum):
+    return [int(round(float(v) / quantum)) for v in np.ravel(values)]
+
+
+def ik_cache_keys(robot_key, pos, quat, seed):
+    """
+    (target key, full key) for one IK query: the target key ignores the
+    seed (warm-start lookups), the full key adds the seed bucket.
+    """
+    target = {"robot": robot_key, "pos": _quantize(pos, IK_POS_QUANTUM),
+              "quat": _quantize(quat, IK_QUAT_QUANTUM)}
+    target_key = _digest(target)
+    return target_key, _digest({"target": target_key, "seed": _quantize(seed, IK_SEED_BUCKET)})
+
+
+class IKCache:
+    """
+    Size-bounded LRU store of IK solutions in a local SQLite file.
+
+    ``lookup`` returns ``(qpos, "hit")`` for the same target and seed
+    bucket, ``(qpos, "warm")`` for the same target under another seed
+    bucket, or ``(None, "miss")``. ``invalidate`` drops a target whose
+    cached solution failed verification. ``stats`` holds this session's
+    counters and the solver time saved (the stored solve time of each hit).
+    """
+
+    def __init__(self, path=DEFAULT_IK_CACHE_PATH, max_entries=DEFAULT_IK_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = int(max_entries)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=5.0)
+        # A cache may lose its last writes on power loss; never wait on fsync
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS ik (key TEXT PRIMARY KEY, target TEXT NOT NULL, "
+                              "qpos TEXT NOT NULL, solve_s REAL NOT NULL, last_used REAL NOT NULL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS ik_target ON ik (target)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS ik_last_used ON ik (last_used)")
+        self.stats = {"hits": 0, "warm_starts": 0, "misses": 0, "invalidated": 0, "saved_s": 0.0}
+        self._last_hit_s = 0.0
+
+    def lookup(self, robot_key, pos, quat, seed):
+        target_key, key = ik_cache_keys(robot_key, pos, quat, seed)
+        with self.conn:
+            row = self.conn.execute("SELECT qpos, solve_s FROM ik WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.conn.execute("UPDATE ik SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.stats["hits"] += 1
+                self.stats["saved_s"] += row[1]
+                self._last_hit_s = row[1]
+                return np.array(json.loads(row[0])), "hit"
+            row = self.conn.execute("SELECT qpos FROM ik WHERE target = ? ORDER BY last_used DESC LIMIT 1",
+                                    (target_key,)).fetchone()
+        if row is not None:
+            self.stats["warm_starts"] += 1
+            return np.array(json.loads(row[0])), "warm"
+        self.stats["misses"] += 1
+        return None, "miss"
+
+    def store(self, robot_key, pos, quat, seed, qpos, solve_s):
+        target_key, key = ik_cache_keys(robot_key, pos, quat, seed)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO ik (key, target, qpos, solve_s, last_used) "
+                              "VALUES (?, ?, ?, ?, ?)",
+                              (key, target_key, json.dumps(np.ravel(qpos).tolist()), solve_s, time.time()))
+            excess = self.conn.execute("SELECT COUNT(*) FROM ik").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute("DELETE FROM ik WHERE key IN "
+                                  "(SELECT key FROM ik ORDER BY last_used ASC LIMIT ?)", (excess,))
+
+    def invalidate(self, robot_key, pos, quat):
+        """Drop every entry of the target of the last hit (rejected by the caller) and un-count that hit."""
+        target_key, _ = ik_cache_keys(robot_key, pos, quat, np.zeros(1))
+        with self.conn:
+            self.conn.execute("DELETE FROM ik WHERE target = ?", (target_key,))
+        self.stats["hits"] -= 1
+        self.stats["saved_s"] -= self._last_hit_s
+        self.stats["invalidated"] += 1
+
+    def report(self):
+        """This session's counters plus the entry count, for the result JSON."""
+        lookups = self.stats["hits"] + self.stats["warm_starts"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "saved_s": round(self.stats["saved_s"], 4),
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": self.conn.execute("SELECT COUNT(*) FROM ik").fetchone()[0],
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+def open_ik_cache(enabled=True):
+    """
+    IKCache configured from the environment, or None when disabled (request
+    ``"ik_cache": false`` or GENESIS_IK_CACHE_PATH=off). A cache that
+    cannot be opened is reported on stderr and skipped.
+    """
+    path = os.environ.get("GENESIS_IK_CACHE_PATH", str(DEFAULT_IK_CACHE_PATH))
+    if not enabled or path.lower() in ("", "off", "0", "false"):
+        return None
+    try:
+        return IKCache(path, int(os.environ.get("GENESIS_IK_CACHE_MAX_ENTRIES", DEFAULT_IK_CACHE_MAX_ENTRIES)))
+    except (sqlite3.Error, OSError) as e:
+        print(f"[genesis] ⚠️  IK cache unavailable ({e}); solving without it", file=sys.stderr)
+        return None
+
+
+def fit_path(path, start, goal):
+    """
+    Shift a cached path so it begins exactly at ``start`` and ends at
+    ``goal``: the endpoint offsets (within PLAN_MATCH_TOL) are blended in
+    linearly along the path.
+    """
+    path = np.asarray(path, dtype=float)
+    w = np.linspace(0.0, 1.0, len(path))[:, None]
+    return path + (1.0 - w) * (np.ravel(start) - path[0]) + w * (np.ravel(goal) - path[-1])
+
+
+class PlanCache:
+    """
+    Size-bounded LRU store of planned joint paths in a local SQLite file,
+    grouped by scene fingerprint.
+
+    ``lookup`` returns the closest stored path for (start, goal), forward
+    or reversed, with ``how`` in "hit"/"reversed"/"miss" and the planning
+    time it saves. The caller reports the outcome: ``accept`` after the
+    collision check passes, ``reject`` when it fails or when the accepted
+    path later fails in execution; a rejected path is deleted, so the
+    caller's replan (or retry) never gets it back.
+    """
+
+    def __init__(self, path=DEFAULT_PLAN_CACHE_PATH, max_entries=DEFAULT_PLAN_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = int(max_entries)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=5.0)
+        # A cache may lose its last writes on power loss; never wait on fsync
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS plans (id INTEGER PRIMARY KEY, scene TEXT NOT NULL, "
+                              "start TEXT NOT NULL, goal TEXT NOT NULL, path TEXT NOT NULL, "
+                              "plan_s REAL NOT NULL, last_used REAL NOT NULL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS plans_scene ON plans (scene)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS plans_last_used ON plans (last_used)")
+        self.stats = {"hits": 0, "reversed": 0, "misses": 0, "invalidated": 0, "saved_s": 0.0}
+        self._accepted = None
+
+    def lookup(self, scene_key, start, goal):
+        """(path, how, entry) for the best stored match, or (None, "miss", None)."""
+        start, goal = np.ravel(start), np.ravel(goal)
+        best = None
+        for row_id, s, g, plan_s in self.conn.execute(
+                "SELECT id, start, goal, plan_s FROM plans WHERE scene = ?", (_digest(scene_key),)):
+            s, g = np.array(json.loads(s)), np.array(json.loads(g))
+            if s.shape != start.shape:
+                continue
+            for how, a, b in (("hit", s, g), ("reversed", g, s)):
+                err = max(np.abs(a - start).max(), np.abs(b - goal).max())
+                if err <= PLAN_MATCH_TOL and (best is None or err < best[0]):
+                    best = (err, row_id, how, plan_s)
+        if best is None:
+            self.stats["misses"] += 1
+            return None, "miss", None
+        _, row_id, how, plan_s = best
+        path = np.array(json.loads(self.conn.execute("SELECT path FROM plans WHERE id = ?",
+                                                     (row_id,)).fetchone()[0]))
+        if how == "reversed":
+            path = path[::-1]
+        return fit_path(path, start, goal), how, (row_id, plan_s)
+
+    def accept(self, how, entry):
+        """A cached path passed the collision check and is used."""
+        row_id, plan_s = entry
+        self.stats["hits" if how == "hit" else "reversed"] += 1
+        self.stats["saved_s"] += plan_s
+        with self.conn:
+            self.conn.execute("UPDATE plans SET last_used = ? WHERE id = ?", (time.time(), row_id))
+        self._accepted = (how, entry)
+
+    def reject(self, entry=None):
+        """
+        Delete a cached path that collides in the current scene state; the
+        caller plans instead. Without ``entry`` the last accepted path is
+        rejected (it failed in execution) and its hit is un-counted.
+        """
+        if entry is None:
+            if self._accepted is None:
+                return
+            how, entry = self._accepted
+            self.stats["hits" if how == "hit" else "reversed"] -= 1
+            self.stats["saved_s"] -= entry[1]
+        self._accepted = None
+        with self.conn:
+            self.conn.execute("DELETE FROM plans WHERE id = ?", (entry[0],))
+        self.stats["invalidated"] += 1
+
+    def store(self, scene_key, start, goal, path, plan_s):
+        with self.conn:
+            self.conn.execute("INSERT INTO plans (scene, start, goal, path, plan_s, last_used) "
+                              "VALUES (?, ?, ?, ?, ?, ?)",
+                              (_digest(scene_key), json.dumps(np.ravel(start).tolist()),
+                               json.dumps(np.ravel(goal).tolist()),
+                               json.dumps(np.round(np.asarray(path, dtype=float), 6).tolist()),
+                               plan_s, time.time()))
+            excess = self.conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute("DELETE FROM plans WHERE id IN "
+                                  "(SELECT id FROM plans ORDER BY last_used ASC LIMIT ?)", (excess,))
+
+    def report(self):
+        """This session's counters plus the entry count, for the result JSON."""
+        served = self.stats["hits"] + self.stats["reversed"]
+        queries = served + self.stats["misses"] + self.stats["invalidated"]
+        return {
+            **self.stats,
+            "saved_s": round(self.stats["saved_s"], 4),
+            "hit_rate": round(served / queries, 3) if queries else 0.0,
+            "entries": self.conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0],
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+def open_plan_cache(enabled=True):
+    """
+    PlanCache configured from the environment, or None when disabled
+    (request ``"plan_cache": false`` or GENESIS_PLAN_CACHE_PATH=off).
+    """
+    path = os.environ.get("GENESIS_PLAN_CACHE_PATH", str(DEFAULT_PLAN_CACHE_PATH))
+    if not enabled or path.lower() in ("", "off", "0", "false"):
+        return None
+    try:
+        return PlanCache(path, int(os.environ.get("GENESIS_PLAN_CACHE_MAX_ENTRIES",
+                                                  DEFAULT_PLAN_CACHE_MAX_ENTRIES)))
+    except (sqlite3.Error, OSError) as e:
+        print(f"[genesis] ⚠️  Plan cache unavailable ({e}); planning without it", file=sys.stderr)
+        return None
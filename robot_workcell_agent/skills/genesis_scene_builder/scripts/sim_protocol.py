@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Genesis Simulation Server Protocol - client side (no Genesis import)
+
+sim_server.py keeps Genesis initialised and serves Stage 3 requests as
+newline-delimited JSON over a local socket: a Unix socket where the
+platform has one, else TCP on 127.0.0.1.
+
+Requests (one JSON object per line):
+    {"op": "ping"}                              -> {"event": "pong", ...}
+    {"op": "simulate", "id": 1, "input": {...}} -> {"event": "phase", ...} per phase,
+                                                   then {"event": "result", "result": {...}, "timing": {...}}
+    {"op": "shutdown"}                          -> {"event": "bye"}
+Failures come back as {"event": "error", "error": "..."}.
+
+The server address is GENESIS_SIM_ADDRESS ("unix:/path.sock" or
+"host:port") or the per-user default below.
+"""
+
+import getpass
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# TCP fallback port where AF_UNIX is unavailable (Windows)
+DEFAULT_PORT = 47631
+
+# Genesis import + gs.init can take a while on a cold machine
+SERVER_STARTUP_TIMEOUT = 180
+
+SERVER_SCRIPT = Path(__file__).resolve().parent / "sim_server.py"
+SERVER_LOG = Path(__file__).resolve().parents[3] / "logs" / "sim_server.log"
+
+
+def default_address():
+    """GENESIS_SIM_ADDRESS, else a per-user Unix socket in the temp dir (TCP on Windows)."""
+    address = os.environ.get("GENESIS_SIM_ADDRESS", "").strip()
+    if address:
+        return address
+    if hasattr(socket, "AF_UNIX"):
+        return "unix:" + str(Path(tempfile.gettempdir()) / f"genesis_sim_{getpass.getuser()}.sock")
+    return f"127.0.0.1:{DEFAULT_PORT}"
+
+
+def parse_address(address):
+    """(socket family, sockaddr) for "unix:/path" or "host:port"."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def send_message(sock, message):
+    sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+
+def read_messages(stream):
+    """Yield decoded JSON lines from a socket file until EOF."""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+class SimClient:
+    """One connection to a running sim_server.py."""
+
+    def __init__(self, address=None, timeout=900):
+        self.address = address or default_address()
+        family, sockaddr = parse_address(self.address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(sockaddr)
+        except OSError:
+            self.sock.close()
+            raise
+        self.stream = self.sock.makefile("rb")
+
+    def request(self, message, on_event=None):
+        """
+        Send one request and return its final message (result, pong, bye or
+        error). Intermediate events (phases) go to ``on_event``.
+        """
+        send_message(self.sock, message)
+        for reply in read_messages(self.stream):
+            if reply.get("event") == "phase":
+                if on_event is not None:
+                    on_event(reply)
+                continue
+            return reply
+        raise ConnectionError("simulation server closed the connection")
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def ping(address=None, timeout=2.0):
+    """Server status dict, or None when nothing is listening."""
+    try:
+        with SimClient(address, timeout=timeout) as client:
+            return client.request({"op": "ping"})
+    except (OSError, ValueError):
+        return None
+
+
+def start_server(address=None, timeout=SERVER_STARTUP_TIMEOUT, viewer=False):
+    """
+    Launch sim_server.py in the background (detached, logging to
+    logs/sim_server.log) and wait until it answers a ping.
+    """
+    address = address or default_address()
+    SERVER_LOG.parent.mkdir(parents=True, exist_ok=True)
+    cmd = [sys.executable, "-u", str(SERVER_SCRIPT), "--address", address]
+    if viewer:
+        cmd.append("--viewer")
+    env = os.environ.copy()
+    env["PYTHONIOENCODING"] = "utf-8"
+    with open(SERVER_LOG, "a", encoding="utf-8") as log:
+        kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt" else {"start_new_session": True}
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log, stderr=log, env=env, **kwargs)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if ping(address) is not None:
+            return process.pid
+        if process.poll() is not None:
+            raise RuntimeError(f"simulation server exited with code {process.returncode} (see {SERVER_LOG})")
+        time.sleep(0.5)
+    process.kill()
+    raise TimeoutError(f"simulation server did not come up within {timeout}s (see {SERVER_LOG})")
+
+
+def simulate(input_data, address=None, timeout=900, on_event=None, autostart=True):
+    """
+    Run one Stage 3 request on the warm server (started on demand) and
+    return the build_and_execute result dict with a ``server`` entry.
+    """
+    address = address or default_address()
+    if autostart and ping(address) is None:
+        start_server(address)
+    with SimClient(address, timeout=timeout) as client:
+        reply = client.request({"op": "simulate", "input": input_data}, on_event=on_event)
+    if reply.get("event") != "result":
+        return {"error": reply.get("error", f"unexpected reply: {reply}"), "success": False}
+    result = reply["result"]
+    result["server"] = reply.get("timing", {})
+    return result
+
+
+def shutdown(address=None):
+    """Ask a running server to exit; False when none was running."""
+    try:
+        with SimClient(address, timeout=10) as client:
+            client.request({"op": "shutdown"})
+        return True
+    except OSError:
+        return False
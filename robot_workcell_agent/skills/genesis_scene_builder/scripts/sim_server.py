@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Genesis Simulation Server - keeps Genesis warm across Stage 3 requests
+
+Initialises Genesis once (CPU backend, no viewer unless --viewer), then
+serves newline-delimited JSON requests on a local socket (protocol in
+sim_protocol.py). Each "simulate" request carries the usual
+build_and_execute input; the server builds the scene, or resets the
+previous one when the components are identical, runs the pick-and-place
+cycle, streams one "phase" event per completed phase and ends with the
+result. Scenes come from a TemplateScenes pool: an identical layout is
+reset, a new layout of the same assets is repositioned without
+scene.build(). Requests are handled one at a time.
+
+Usage:
+    python skills/genesis_scene_builder/scripts/sim_server.py
+    python skills/genesis_scene_builder/scripts/sim_server.py --address 127.0.0.1:47631
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from build_and_execute import TemplateScenes, execute_request, init_genesis, log_stderr, parse_request  # noqa: E402
+from sim_protocol import default_address, parse_address, read_messages, send_message  # noqa: E402
+
+
+class SimServer:
+    """Genesis state shared by every request of one server process."""
+
+    def __init__(self, headless=True):
+        self.requests = 0
+        t0 = time.perf_counter()
+        init_genesis(headless)
+        self.init_s = round(time.perf_counter() - t0, 3)
+        self.templates = TemplateScenes(headless)
+
+    def simulate(self, message, emit):
+        request = parse_request(message.get("input") or {})
+        if not request["components"]:
+            return {"event": "error", "id": message.get("id"), "error": "No components"}
+        self.requests += 1
+
+        t0 = time.perf_counter()
+        handle, how = self.templates.scene_for(request["components"], request["cycles"])
+        t_build = time.perf_counter() - t0
+
+        def on_phase(name, index):
+            emit({"event": "phase", "id": message.get("id"), "phase": name, "index": index,
+                  "elapsed_s": round(time.perf_counter() - t0, 3)})
+
+        result = execute_request(handle, request, on_phase)
+        return {
+            "event": "result",
+            "id": message.get("id"),
+            "result": result,
+            "timing": {
+                "scene_reused": how != "built",
+                "scene": how,
+                "build_s": round(t_build, 3),
+                "run_s": round(time.perf_counter() - t0 - t_build, 3),
+                "request": self.requests,
+            },
+        }
+
+    def handle_message(self, message, emit):
+        op = message.get("op")
+        if op == "ping":
+            return {"event": "pong", "pid": os.getpid(), "init_s": self.init_s, "requests": self.requests,
+                    "templates": len(self.templates.templates), **self.templates.stats}
+        if op == "simulate":
+            return self.simulate(message, emit)
+        if op == "shutdown":
+            return {"event": "bye"}
+        return {"event": "error", "id": message.get("id"), "error": f"unknown op '{op}'"}
+
+
+def address_in_use(family, sockaddr, timeout=2.0):
+    """True when something accepts connections on ``sockaddr`` (a live server, busy or not)."""
+    probe = socket.socket(family, socket.SOCK_STREAM)
+    probe.settimeout(timeout)
+    try:
+        probe.connect(sockaddr)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def serve(address, headless=True):
+    """
+    Accept connections until a shutdown request arrives. Raises
+    RuntimeError when another server already listens on ``address``.
+    """
+    family, sockaddr = parse_address(address)
+    if address_in_use(family, sockaddr):
+        raise RuntimeError(f"a simulation server is already running on {address}")
+    if family == getattr(socket, "AF_UNIX", None) and os.path.exists(sockaddr):
+        os.unlink(sockaddr)   # stale socket from a crashed server
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    if family != getattr(socket, "AF_UNIX", None):
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(sockaddr)
+    listener.listen(8)
+
+    server = SimServer(headless=headless)
+    log_stderr(f"🛰️  Simulation server ready on {address} (pid {os.getpid()}, init {server.init_s}s)")
+    running = True
+    try:
+        while running:
+            conn, _ = listener.accept()
+            with conn, conn.makefile("rb") as stream:
+                def emit(reply):
+                    send_message(conn, reply)
+                try:
+                    for message in read_messages(stream):
+                        try:
+                            reply = server.handle_message(message, emit)
+                        except Exception as e:
+                            import traceback
+                            log_stderr(f"❌ Request failed: {type(e).__name__}: {e}")
+                            traceback.print_exc(file=sys.stderr)
+                            reply = {"event": "error", "id": message.get("id"), "error": str(e)}
+                        emit(reply)
+                        if reply["event"] == "bye":
+                            running = False
+                            break
+                except (OSError, ValueError) as e:
+                    log_stderr(f"⚠️  Connection dropped: {e}")
+    finally:
+        listener.close()
+        if family == getattr(socket, "AF_UNIX", None) and os.path.exists(sockaddr):
+            os.unlink(sockaddr)
+        log_stderr("⏹️  Simulation server stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm Genesis simulation server (JSON lines over a local socket)")
+    parser.add_argument("--address", default=default_address(), help='"unix:/path.sock" or "host:port"')
+    parser.add_argument("--viewer", action="store_true", help="GPU backend with a viewer per scene")
+    args = parser.parse_args()
+    try:
+        serve(args.address, headless=not args.viewer)
+    except RuntimeError as e:
+        log_stderr(f"❌ {e} - not starting")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Binary trajectory recording for the Genesis pick-and-place cycle (no Genesis import)
+
+Every physics step of a recorded run appends one row to a preallocated
+NumPy structured array (trajectory_dtype): step, simulated time, joint
+positions and velocities, TCP pose, carton pose and whether the suction
+weld is active. Cycle and phase labels are filled in from the run's phase
+log once a cycle ends (every step belongs to exactly one phase).
+
+The array is flushed to an ``.npy`` file with a ``.json`` sidecar (phase
+names, time step, run metadata). np.load(mmap_mode="r") maps it without
+reading it, so post-hoc analysis (trajectory_summary) takes milliseconds,
+needs no re-simulation and keeps large arrays out of the JSON result. A
+``.npz`` path writes a compressed archive instead (loaded fully).
+
+Usage:
+    python skills/genesis_scene_builder/scripts/trajectory_recorder.py output/trajectories/<run>.npy
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Override with GENESIS_TRAJECTORY_DIR; recordings named after the run time and layout
+DEFAULT_TRAJECTORY_DIR = Path(__file__).resolve().parents[3] / "output" / "trajectories"
+
+# Rows preallocated per recording (about one cycle); the buffer doubles when full
+DEFAULT_CAPACITY = 4096
+
+# Phase / cycle label of rows not yet assigned to a phase
+UNLABELLED = -1
+
+
+def trajectory_dtype(n_dofs):
+    """Structured row type of a recording for a robot with ``n_dofs`` joints."""
+    return np.dtype([
+        ("step", "<i4"),
+        ("sim_t", "<f8"),
+        ("cycle", "<i2"),
+        ("phase", "<i2"),
+        ("qpos", "<f4", (n_dofs,)),
+        ("qvel", "<f4", (n_dofs,)),
+        ("tcp_pos", "<f4", (3,)),
+        ("tcp_quat", "<f4", (4,)),       # w, x, y, z
+        ("carton_pos", "<f4", (3,)),     # NaN without a carton
+        ("carton_quat", "<f4", (4,)),
+        ("weld", "?"),
+    ])
+
+
+class TrajectoryRecorder:
+    """
+    Per-step state of one run in a growable structured array.
+
+    ``append`` adds a row (called after every scene.step()), ``mark_phases``
+    labels the rows of one finished cycle from its phase log, ``flush``
+    writes the recording.
+    """
+
+    def __init__(self, n_dofs, dt, capacity=DEFAULT_CAPACITY, meta=None):
+        self.n_dofs = int(n_dofs)
+        self.dt = float(dt)
+        self.data = np.zeros(max(1, int(capacity)), dtype=trajectory_dtype(self.n_dofs))
+        self.data["cycle"] = UNLABELLED
+        self.data["phase"] = UNLABELLED
+        self.size = 0
+        self.labelled = 0
+        self.cycle = 0
+        self.phases = []
+        self.meta = dict(meta or {})
+
+    @property
+    def trajectory(self):
+        """The recorded rows (a view, no copy)."""
+        return self.data[:self.size]
+
+    def append(self, qpos, qvel, tcp_pos, tcp_quat, carton_pos=None, carton_quat=None, weld=False):
+        if self.size == len(self.data):
+            grown = np.zeros(2 * len(self.data), dtype=self.data.dtype)
+            grown["cycle"] = UNLABELLED
+            grown["phase"] = UNLABELLED
+            grown[:self.size] = self.data
+            self.data = grown
+        row = self.data[self.size]   # structured scalar: a view into the buffer
+        row["step"] = self.size
+        row["sim_t"] = (self.size + 1) * self.dt
+        row["qpos"] = np.ravel(qpos)
+        row["qvel"] = np.ravel(qvel)
+        row["tcp_pos"] = np.ravel(tcp_pos)
+        row["tcp_quat"] = np.ravel(tcp_quat)
+        row["carton_pos"] = np.nan if carton_pos is None else np.ravel(carton_pos)
+        row["carton_quat"] = np.nan if carton_quat is None else np.ravel(carton_quat)
+        row["weld"] = bool(weld)
+        self.size += 1
+
+    def mark_phases(self, phase_log):
+        """
+        Label the rows of one cycle: ``phase_log`` (phase name -> entry with
+        ``steps``, plus ``retry_steps`` rewound by phase retries, in
+        execution order) covers every step since the previous call. Advances
+        the cycle counter.
+        """
+        for name, entry in phase_log.items():
+            if name not in self.phases:
+                self.phases.append(name)
+            end = min(self.size, self.labelled + int(entry["steps"]) + int(entry.get("retry_steps", 0)))
+            self.data["phase"][self.labelled:end] = self.phases.index(name)
+            self.data["cycle"][self.labelled:end] = self.cycle
+            self.labelled = end
+        self.cycle += 1
+
+    def metadata(self):
+        return dict(self.meta, dt=self.dt, n_dofs=self.n_dofs, steps=self.size, cycles=self.cycle,
+                    phases=self.phases, dtype=str(self.data.dtype.descr))
+
+    def flush(self, path):
+        """
+        Write the recording to ``path`` (``.npy`` plus a ``.json`` sidecar,
+        or one compressed ``.npz``). Returns the data file path.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = self.metadata()
+        if path.suffix == ".npz":
+            np.savez_compressed(path, trajectory=self.trajectory, meta=np.array(json.dumps(meta)))
+            return path
+        path = path.with_suffix(".npy")
+        np.save(path, self.trajectory)
+        path.with_suffix(".json").write_text(json.dumps(meta, indent=2))
+        return path
+
+
+def recording_path(record, stem):
+    """
+    Output file for a request's ``"record"`` value: a string is used as the
+    path, ``true`` names the file ``<stem>.npy`` in GENESIS_TRAJECTORY_DIR.
+    """
+    if isinstance(record, str):
+        return Path(record)
+    return Path(os.environ.get("GENESIS_TRAJECTORY_DIR", str(DEFAULT_TRAJECTORY_DIR))) / f"{stem}.npy"
+
+
+def load_trajectory(path):
+    """(trajectory, meta) of a recording; ``.npy`` files are memory-mapped read-only."""
+    path = Path(path)
+    if path.suffix == ".npz":
+        with np.load(path) as archive:
+            return archive["trajectory"], json.loads(str(archive["meta"]))
+    return np.load(path, mmap_mode="r"), json.loads(path.with_suffix(".json").read_text())
+
+
+def trajectory_summary(trajectory, meta):
+    """
+    Post-hoc analysis of a recording: simulated time per phase and per
+    cycle, joint speed, acceleration and jerk peaks (finite differences of
+    qpos), TCP path length, weld time and carton slip relative to the TCP
+    while welded, and where the last carton ended up.
+    """
+    dt = float(meta["dt"])
+    phases = meta.get("phases", [])
+    n = len(trajectory)
+    summary = {"steps": n, "sim_s": round(n * dt, 3)}
+    if not n:
+        return summary
+
+    phase = np.asarray(trajectory["phase"])
+    cycle = np.asarray(trajectory["cycle"])
+    summary["phases"] = {name: round(float((phase == i).sum()) * dt, 3) for i, name in enumerate(phases)}
+    cycle_ids = np.unique(cycle[cycle >= 0])
+    summary["cycles"] = [round(float((cycle == c).sum()) * dt, 3) for c in cycle_ids]
+
+    qpos = np.asarray(trajectory["qpos"], dtype=float)
+    summary["max_joint_speed"] = round(float(np.abs(np.asarray(trajectory["qvel"])).max()), 4)
+    if n > 3:
+        acc = np.diff(qpos, 2, axis=0) / dt ** 2
+        jerk = np.diff(qpos, 3, axis=0) / dt ** 3
+        summary["max_joint_acc"] = round(float(np.abs(acc).max()), 3)
+        summary["max_joint_jerk"] = round(float(np.abs(jerk).max()), 3)
+        summary["rms_joint_jerk"] = round(float(np.sqrt((jerk ** 2).mean())), 3)
+
+    tcp = np.asarray(trajectory["tcp_pos"], dtype=float)
+    summary["tcp_path_m"] = round(float(np.linalg.norm(np.diff(tcp, axis=0), axis=1).sum()), 4)
+
+    weld = np.asarray(trajectory["weld"])
+    carton = np.asarray(trajectory["carton_pos"], dtype=float)
+    summary["weld_s"] = round(float(weld.sum()) * dt, 3)
+    held = weld & np.isfinite(carton).all(axis=1)
+    if held.any():
+        offset = carton[held] - tcp[held]
+        summary["weld_slip_m"] = round(float(np.linalg.norm(offset - offset[0], axis=1).max()), 5)
+    if np.isfinite(carton[-1]).all():
+        summary["carton_final_pos"] = [round(float(v), 4) for v in carton[-1]]
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a recorded Genesis trajectory")
+    parser.add_argument("path", help=".npy (with .json sidecar) or .npz recording")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    trajectory, meta = load_trajectory(args.path)
+    summary = trajectory_summary(trajectory, meta)
+    summary["analysis_ms"] = round(1000 * (time.perf_counter() - t0), 2)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
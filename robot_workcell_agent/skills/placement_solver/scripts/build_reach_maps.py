@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Reachability Map Builder - offline voxel maps for the placement solver
+
+Samples each catalog robot's kinematics into a 3D voxel grid (robot base
+frame, z up). A voxel stores the best manipulability of an IK solution
+that puts the TCP at the voxel centre with the tool pointing straight
+down (suction face toward -Z, yaw about the tool axis free); 0 means no
+such solution within the joint limits.
+
+IK is damped least squares, batched in NumPy over every voxel and several
+seeds at once. Output goes to skills/placement_solver/reach_maps/ as
+<model>.npy (float32 grid, memory-mapped by placement_core) plus
+<model>_grid.npy (origin, voxel size, tool length).
+
+Usage:
+    python skills/placement_solver/scripts/build_reach_maps.py              # all robots
+    python skills/placement_solver/scripts/build_reach_maps.py ur5e --voxel 0.05
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from kinematics import (ORIENTATION_TOLERANCE, PI, POSITION_TOLERANCE, ROBOT_KINEMATICS,  # noqa: E402
+                        forward_kinematics)
+from placement_core import REACH_MAP_DIR, REACH_MAP_TOOL_LENGTH, save_reach_map  # noqa: E402
+
+
+def _task_jacobian(tcp, axes, origins):
+    """Position rows plus tool-axis rows with the free yaw about the tool axis projected out."""
+    jv = np.cross(axes, tcp[:, None, :3, 3] - origins)          # (B, n, 3)
+    z = tcp[:, :3, 2]
+    jw = axes - (axes * z[:, None, :]).sum(-1, keepdims=True) * z[:, None, :]
+    return np.concatenate([jv, jw], axis=-1).transpose(0, 2, 1)  # (B, 6, n)
+
+
+def solve_down_ik(spec, targets, seeds=6, iters=120, damping=0.05, rng=None,
+                  tool_length=REACH_MAP_TOOL_LENGTH):
+    """
+    Damped-least-squares IK for a downward-facing TCP at every target.
+
+    Returns:
+        (M,) best position manipulability sqrt(det(Jv Jv^T)) over converged
+        seeds, 0 where no seed converged inside the joint limits.
+    """
+    rng = np.random.default_rng(0) if rng is None else rng
+    lo, hi = np.array(spec["limits"]).T
+    m, n = len(targets), len(lo)
+    tgt = np.repeat(targets, seeds, axis=0)
+    q = rng.uniform(np.maximum(lo, -PI), np.minimum(hi, PI), (m * seeds, n))
+    down = np.array([0.0, 0.0, -1.0])
+    active = np.arange(m * seeds)
+    done = np.zeros(m * seeds, dtype=bool)
+    for _ in range(iters):
+        tcp, axes, origins = forward_kinematics(spec, q[active], tool_length)
+        err_p = tgt[active] - tcp[:, :3, 3]
+        err_o = np.cross(tcp[:, :3, 2], down)
+        ok = ((np.linalg.norm(err_p, axis=-1) < POSITION_TOLERANCE)
+              & (tcp[:, 2, 2] < -math.cos(ORIENTATION_TOLERANCE)))
+        done[active[ok]] = True
+        keep = ~ok
+        active = active[keep]
+        if active.size == 0:
+            break
+        jac = _task_jacobian(tcp[keep], axes[keep], origins[keep])
+        err = np.concatenate([err_p[keep], err_o[keep]], axis=-1)
+        jjt = jac @ jac.transpose(0, 2, 1) + damping ** 2 * np.eye(6)
+        dq = (jac.transpose(0, 2, 1) @ np.linalg.solve(jjt, err[..., None]))[..., 0]
+        # Cap the step so far-away seeds do not fling through the limits
+        norm = np.linalg.norm(dq, axis=-1, keepdims=True)
+        dq *= np.minimum(1.0, 0.5 / np.maximum(norm, 1e-12))
+        q[active] = np.clip(q[active] + dq, lo, hi)
+
+    manip = np.zeros(m * seeds)
+    if done.any():
+        tcp, axes, origins = forward_kinematics(spec, q[done], tool_length)
+        jv = _task_jacobian(tcp, axes, origins)[:, :3]
+        manip[done] = np.sqrt(np.maximum(np.linalg.det(jv @ jv.transpose(0, 2, 1)), 0.0))
+    return manip.reshape(m, seeds).max(axis=1)
+
+
+def build_reach_map(model, voxel=0.05, seeds=6, iters=120, chunk=20000, tool_length=REACH_MAP_TOOL_LENGTH,
+                    verbose=True):
+    """Voxel grid for one robot: (grid (nx, ny, nz) float32, origin (3,), stats)."""
+    spec = ROBOT_KINEMATICS[model]
+    t0 = time.perf_counter()
+    extent = spec["reach"] + tool_length + 2 * voxel
+    lo = np.array([-extent, -extent, -extent + spec["d"][0]])
+    counts = np.ceil(2 * extent / voxel).astype(int) * np.ones(3, dtype=int)
+    origin = np.round(lo / voxel) * voxel
+    axes = [origin[i] + (np.arange(counts[i]) + 0.5) * voxel for i in range(3)]
+    centres = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+
+    # Points farther from the shoulder than the stretched arm can never be reached
+    shoulder = np.array([0.0, 0.0, spec["d"][0]])
+    span = sum(abs(a) for a in spec["a"]) + sum(abs(d) for d in spec["d"][1:]) + spec["flange"] + tool_length
+    candidates = np.flatnonzero(np.linalg.norm(centres - shoulder, axis=-1) <= span + voxel)
+
+    manip = np.zeros(len(centres))
+    rng = np.random.default_rng(0)
+    for start in range(0, len(candidates), chunk):
+        idx = candidates[start:start + chunk]
+        manip[idx] = solve_down_ik(spec, centres[idx], seeds, iters, rng=rng, tool_length=tool_length)
+        if verbose:
+            print(f"  {model}: {min(start + chunk, len(candidates))}/{len(candidates)} voxels "
+                  f"({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+    grid = manip.reshape(tuple(counts)).astype(np.float32)
+    stats = {"voxels": int(grid.size), "solved": int(len(candidates)), "reachable": int((grid > 0).sum()),
+             "elapsed_s": round(time.perf_counter() - t0, 1)}
+    return grid, origin, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build reachability voxel maps for the placement solver")
+    parser.add_argument("models", nargs="*", default=list(ROBOT_KINEMATICS), help="Robot models to build")
+    parser.add_argument("--voxel", type=float, default=0.05, help="Voxel edge length (m)")
+    parser.add_argument("--seeds", type=int, default=6, help="IK seeds per voxel")
+    parser.add_argument("--iters", type=int, default=120, help="IK iterations")
+    parser.add_argument("--tool-length", type=float, default=REACH_MAP_TOOL_LENGTH,
+                        help="Flange-to-TCP distance of the suction tool (m)")
+    parser.add_argument("--out", type=Path, default=REACH_MAP_DIR, help="Output directory")
+    args = parser.parse_args()
+
+    for model in args.models:
+        if model not in ROBOT_KINEMATICS:
+            parser.error(f"unknown model '{model}' (expected one of {sorted(ROBOT_KINEMATICS)})")
+        grid, origin, stats = build_reach_map(model, args.voxel, args.seeds, args.iters,
+                                              tool_length=args.tool_length)
+        path = save_reach_map(model, grid, origin, args.voxel, args.tool_length, args.out)
+        print(f"{model}: {grid.shape} voxels of {args.voxel} m, {stats['reachable']} reachable "
+              f"({stats['elapsed_s']}s) -> {path}")
+
+
+if __name__ == "__main__":
+    main()
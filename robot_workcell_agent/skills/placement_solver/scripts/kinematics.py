@@ -0,0 +1,202 @@
+"""
+Robot kinematics shared by the placement solver and the Stage 3 executor
+
+DH models of the catalog robots (ROBOT_KINEMATICS), batched forward
+kinematics and the multi-seed damped-least-squares pose IK with its
+solution ranking. Used offline by build_reach_maps.py and ur_ik.py and at
+run time by genesis_scene_builder/scripts/build_and_execute.py.
+"""
+
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from placement_core import REACH_MAP_TOOL_LENGTH  # noqa: E402
+
+PI = math.pi
+
+# Published kinematics. "dh" is "standard" (Rz(q) Tz(d) Tx(a) Rx(alpha)) or
+# "modified" (Rx(alpha) Tx(a) Rz(q) Tz(d)); "flange" is the extra offset
+# along the last z axis to the tool flange; "reach" is the nominal reach
+# used to size the grid.
+ROBOT_KINEMATICS = {
+    "ur3e": {
+        "dh": "standard",
+        "a": [0.0, -0.24355, -0.2132, 0.0, 0.0, 0.0],
+        "d": [0.15185, 0.0, 0.0, 0.13105, 0.08535, 0.0921],
+        "alpha": [PI / 2, 0.0, 0.0, PI / 2, -PI / 2, 0.0],
+        "limits": [(-2 * PI, 2 * PI), (-2 * PI, 2 * PI), (-PI, PI), (-2 * PI, 2 * PI), (-2 * PI, 2 * PI),
+                   (-2 * PI, 2 * PI)],
+        "flange": 0.0,
+        "reach": 0.5,
+    },
+    "ur5e": {
+        "dh": "standard",
+        "a": [0.0, -0.425, -0.3922, 0.0, 0.0, 0.0],
+        "d": [0.1625, 0.0, 0.0, 0.1333, 0.0997, 0.0996],
+        "alpha": [PI / 2, 0.0, 0.0, PI / 2, -PI / 2, 0.0],
+        "limits": [(-2 * PI, 2 * PI), (-2 * PI, 2 * PI), (-PI, PI), (-2 * PI, 2 * PI), (-2 * PI, 2 * PI),
+                   (-2 * PI, 2 * PI)],
+        "flange": 0.0,
+        "reach": 0.85,
+    },
+    "ur10e": {
+        "dh": "standard",
+        "a": [0.0, -0.6127, -0.57155, 0.0, 0.0, 0.0],
+        "d": [0.1807, 0.0, 0.0, 0.17415, 0.11985, 0.11655],
+        "alpha": [PI / 2, 0.0, 0.0, PI / 2, -PI / 2, 0.0],
+        "limits": [(-2 * PI, 2 * PI), (-2 * PI, 2 * PI), (-PI, PI), (-2 * PI, 2 * PI), (-2 * PI, 2 * PI),
+                   (-2 * PI, 2 * PI)],
+        "flange": 0.0,
+        "reach": 1.3,
+    },
+    "panda": {
+        "dh": "modified",
+        "a": [0.0, 0.0, 0.0, 0.0825, -0.0825, 0.0, 0.088],
+        "d": [0.333, 0.0, 0.316, 0.0, 0.384, 0.0, 0.0],
+        "alpha": [0.0, -PI / 2, PI / 2, PI / 2, -PI / 2, PI / 2, PI / 2],
+        "limits": [(-2.8973, 2.8973), (-1.7628, 1.7628), (-2.8973, 2.8973), (-3.0718, -0.0698),
+                   (-2.8973, 2.8973), (-0.0175, 3.7525), (-2.8973, 2.8973)],
+        "flange": 0.107,
+        "reach": 0.855,
+    },
+    "iiwa14": {
+        "dh": "standard",
+        "a": [0.0] * 7,
+        "d": [0.36, 0.0, 0.42, 0.0, 0.4, 0.0, 0.126],
+        "alpha": [-PI / 2, PI / 2, PI / 2, -PI / 2, -PI / 2, PI / 2, 0.0],
+        "limits": [(-math.radians(170), math.radians(170)), (-math.radians(120), math.radians(120)),
+                   (-math.radians(170), math.radians(170)), (-math.radians(120), math.radians(120)),
+                   (-math.radians(170), math.radians(170)), (-math.radians(120), math.radians(120)),
+                   (-math.radians(175), math.radians(175))],
+        "flange": 0.0,
+        "reach": 0.82,
+    },
+}
+
+# A voxel counts as reachable when IK lands within these tolerances
+POSITION_TOLERANCE = 0.002      # metres
+ORIENTATION_TOLERANCE = 0.02    # radians between tool axis and -Z
+
+# Multi-seed IK ranking: joint distance to the reference (rad) plus this
+# weight times (1 - normalized margin of the joint closest to a limit)
+IK_LIMIT_WEIGHT = 0.5
+
+
+def _rot_z(q):
+    c, s = np.cos(q), np.sin(q)
+    t = np.zeros(q.shape + (4, 4))
+    t[..., 0, 0], t[..., 0, 1], t[..., 1, 0], t[..., 1, 1] = c, -s, s, c
+    t[..., 2, 2] = t[..., 3, 3] = 1.0
+    return t
+
+
+def _const(a, d, alpha, order):
+    """Constant part of a DH link: Tz(d) Tx(a) Rx(alpha) (standard) or Rx(alpha) Tx(a) (modified)."""
+    ca, sa = math.cos(alpha), math.sin(alpha)
+    rx = np.array([[1, 0, 0, 0], [0, ca, -sa, 0], [0, sa, ca, 0], [0, 0, 0, 1]], dtype=float)
+    tx = np.eye(4)
+    tx[0, 3] = a
+    tz = np.eye(4)
+    tz[2, 3] = d
+    return tz @ tx @ rx if order == "standard" else rx @ tx
+
+
+def forward_kinematics(spec, q, tool_length=REACH_MAP_TOOL_LENGTH):
+    """
+    Batched forward kinematics.
+
+    Args:
+        spec: ROBOT_KINEMATICS entry.
+        q: (B, n) joint angles.
+
+    Returns:
+        (tcp (B, 4, 4), axes (B, n, 3), origins (B, n, 3)) - TCP pose and
+        each joint's rotation axis and a point on it, in the base frame.
+    """
+    b, n = q.shape
+    t = np.broadcast_to(np.eye(4), (b, 4, 4)).copy()
+    axes, origins = np.empty((b, n, 3)), np.empty((b, n, 3))
+    for i in range(n):
+        const = _const(spec["a"][i], spec["d"][i], spec["alpha"][i], spec["dh"])
+        if spec["dh"] == "modified":
+            t = t @ const
+        axes[:, i], origins[:, i] = t[:, :3, 2], t[:, :3, 3]
+        t = t @ _rot_z(q[:, i])
+        if spec["dh"] == "standard":
+            t = t @ const
+        else:
+            t[:, :3, 3] += t[:, :3, 2] * spec["d"][i]
+    # Flange offset plus the suction tool along the last z axis
+    t[:, :3, 3] += t[:, :3, 2] * (spec["flange"] + tool_length)
+    return t, axes, origins
+
+
+def solve_pose_ik(spec, pose, seeds, iters=150, damping=0.05, tool_length=REACH_MAP_TOOL_LENGTH,
+                  pos_tol=POSITION_TOLERANCE / 4, rot_tol=ORIENTATION_TOLERANCE / 4):
+    """
+    Damped-least-squares IK for one full TCP pose from many seeds at once.
+
+    Args:
+        spec: ROBOT_KINEMATICS entry.
+        pose: (4, 4) target TCP pose in the base frame.
+        seeds: (K, n) start configurations, all iterated in one batch.
+
+    Returns:
+        (q (K, n), converged (K,), position error (K,)): a seed converged
+        when it is within ``pos_tol`` and ``rot_tol`` of the pose (tighter
+        than the reach-map tolerances, so the goal survives verification in
+        the simulator; limits are enforced by clipping every step).
+    """
+    lo, hi = np.array(spec["limits"]).T
+    q = np.clip(np.array(seeds, dtype=float), lo, hi)
+    target_p, target_r = pose[:3, 3], pose[:3, :3]
+    active = np.arange(len(q))
+    done = np.zeros(len(q), dtype=bool)
+    for _ in range(iters):
+        tcp, axes, origins = forward_kinematics(spec, q[active], tool_length)
+        err_p = target_p - tcp[:, :3, 3]
+        # Rotation error: half the sum of column cross products (small-angle axis * angle)
+        err_o = 0.5 * np.cross(tcp[:, :3, :3].transpose(0, 2, 1), target_r.T).sum(axis=1)
+        cos_angle = (np.einsum("bij,ij->b", tcp[:, :3, :3], target_r) - 1.0) / 2.0
+        ok = (np.linalg.norm(err_p, axis=-1) < pos_tol) & (cos_angle > math.cos(rot_tol))
+        done[active[ok]] = True
+        keep = ~ok
+        active = active[keep]
+        if active.size == 0:
+            break
+        jac = np.concatenate([np.cross(axes[keep], tcp[keep, None, :3, 3] - origins[keep]), axes[keep]],
+                             axis=-1).transpose(0, 2, 1)
+        err = np.concatenate([err_p[keep], err_o[keep]], axis=-1)
+        jjt = jac @ jac.transpose(0, 2, 1) + damping ** 2 * np.eye(6)
+        dq = (jac.transpose(0, 2, 1) @ np.linalg.solve(jjt, err[..., None]))[..., 0]
+        norm = np.linalg.norm(dq, axis=-1, keepdims=True)
+        dq *= np.minimum(1.0, 0.5 / np.maximum(norm, 1e-12))
+        q[active] = np.clip(q[active] + dq, lo, hi)
+
+    tcp = forward_kinematics(spec, q, tool_length)[0]
+    return q, done, np.linalg.norm(tcp[:, :3, 3] - target_p, axis=-1)
+
+
+def rank_ik_solutions(spec, q, converged, reference, limit_weight=IK_LIMIT_WEIGHT):
+    """
+    Best of several IK solutions: the converged one with the smallest max
+    joint distance to ``reference`` plus ``limit_weight`` times how close
+    its tightest joint is to a limit.
+
+    Returns:
+        (index or None, joint distance (K,), limit margin (K,)); the margin
+        is 1 with every joint mid-range and 0 at a limit.
+    """
+    lo, hi = np.array(spec["limits"]).T
+    q = np.asarray(q, dtype=float)
+    dist = np.abs(q - np.asarray(reference, dtype=float)[:q.shape[1]]).max(axis=1)
+    margin = (2.0 * np.minimum(q - lo, hi - q) / (hi - lo)).min(axis=1)
+    if not np.any(converged):
+        return None, dist, margin
+    cost = np.where(converged, dist + limit_weight * (1.0 - margin), np.inf)
+    return int(np.argmin(cost)), dist, margin
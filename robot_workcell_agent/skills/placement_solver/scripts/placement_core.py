@@ -0,0 +1,1905 @@
+"""
+Placement Solver core - Layout-based Component Positioning
+
+Importable library behind the placement_solver skill: computes the layout
+using the logic from layout_generator.py (with closed-form clearance
+offsets) and returns the Stage 2 result. ``solve(stage1)`` is the entry
+point; solve_placement.py is the stdin/stdout CLI wrapper around it.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+
+# ============================================================================
+# LOGIC FROM layout_generator.py
+# ============================================================================
+
+# Step size of the original layout_generator.py search loops (metres)
+GRID_STEP = 0.05
+
+# Clearances used against the pedestal (metres, applied to both boxes)
+CONVEYOR_CLEARANCE = 0.1
+PALLET_CLEARANCE = 0.025
+
+# Clearance between two non-pedestal components (metres, applied to both boxes)
+COMPONENT_CLEARANCE = 0.01
+
+# Offset solver modes:
+#   "grid"      - closed-form, snapped to the 5 cm grid (identical to "reference")
+#   "tight"     - closed-form, tightest legal offset rounded up to the millimetre
+#   "reference" - original stepping loop, kept for equivalence checks
+OFFSET_MODES = ("grid", "tight", "reference")
+
+
+def check_2d_overlap(pos1, dim1, pos2, dim2, clearance):
+    """Checks if two objects overlap on the XY floor plane, rounded to avoid float bugs."""
+    for i in range(2): 
+        min1 = round(pos1[i] - (dim1[i] / 2) - clearance, 4)
+        max1 = round(pos1[i] + (dim1[i] / 2) + clearance, 4)
+        min2 = round(pos2[i] - (dim2[i] / 2) - clearance, 4)
+        max2 = round(pos2[i] + (dim2[i] / 2) + clearance, 4)
+        
+        if max1 <= min2 or max2 <= min1:
+            return False 
+    return True
+
+
+def _axis_pos(axis, offset):
+    """Floor position at ``offset`` along ``axis`` (0 = X, 1 = Y)."""
+    pos = [0.0, 0.0, 0.0]
+    pos[axis] = offset
+    return pos
+
+
+def _step_offset_reference(dim, anchor_pos, anchor_dim, clearance, axis):
+    """Original layout_generator.py loop: step by GRID_STEP until clear of the anchor."""
+    radius = 0.0
+    while True:
+        pos = _axis_pos(axis, round(radius, 3))
+        if not check_2d_overlap(pos, dim, anchor_pos, anchor_dim, clearance=clearance):
+            return pos
+        radius += GRID_STEP
+
+
+def separating_offset(dim, anchor_dim, clearance, axis):
+    """
+    Minimum offset along ``axis`` that separates a box from an anchor at the origin.
+
+    Both boxes are inflated by ``clearance``, so along the sliding axis they
+    stop touching once ``offset >= (dim + anchor_dim) / 2 + 2 * clearance``.
+    On the other floor axis both boxes are centred on zero and always overlap,
+    so the sliding axis alone decides separation.
+    """
+    return (dim[axis] + anchor_dim[axis]) / 2.0 + 2.0 * clearance
+
+
+def solve_offset(dim, anchor_pos, anchor_dim, clearance, axis, mode="grid"):
+    """
+    Position a box along ``axis`` so it clears the anchor box.
+
+    ``grid`` returns exactly what the reference stepping loop returns, but
+    jumps straight to the analytic grid index and only re-checks its
+    neighbours to honour the rounding inside ``check_2d_overlap``.
+    ``tight`` returns the analytic offset rounded up to the millimetre.
+    """
+    if mode == "reference":
+        return _step_offset_reference(dim, anchor_pos, anchor_dim, clearance, axis)
+
+    def overlaps(offset):
+        return check_2d_overlap(_axis_pos(axis, offset), dim, anchor_pos, anchor_dim,
+                                clearance=clearance)
+
+    exact = max(separating_offset(dim, anchor_dim, clearance, axis), 0.0)
+
+    if mode == "tight":
+        offset = round(math.ceil(round(exact * 1000.0, 6)) / 1000.0, 3)
+        while overlaps(offset):
+            offset = round(offset + 0.001, 3)
+        return _axis_pos(axis, offset)
+
+    if mode != "grid":
+        raise ValueError(f"Unknown offset mode '{mode}' (expected one of {OFFSET_MODES})")
+
+    k = max(int(math.ceil(exact / GRID_STEP - 1e-9)), 0)
+    while k > 0 and not overlaps(round(k * GRID_STEP - GRID_STEP, 3)):
+        k -= 1
+    while overlaps(round(k * GRID_STEP, 3)):
+        k += 1
+    return _axis_pos(axis, round(k * GRID_STEP, 3))
+
+
+def calculate_layout(config_json, offset_mode="grid", verbose=True):
+    config = json.loads(config_json)
+    
+    pedestal_dim = config["pedestal"]["dimensions"]
+    conveyor_dim = config["conveyor"]["dimensions"]
+    pallet_dim = config["pallet"]["dimensions"]
+    box_dim = config["box"]["dimensions"]
+
+    pedestal_pos = [0.0, 0.0, 0.0]
+    robot_pos = [0.0, 0.0, pedestal_dim[2]]
+
+    # 1. Position Conveyor along X-axis
+    conv_pos = solve_offset(conveyor_dim, pedestal_pos, pedestal_dim,
+                            CONVEYOR_CLEARANCE, axis=0, mode=offset_mode)
+
+    # 2. Position Pallet along Y-axis
+    pal_pos = solve_offset(pallet_dim, pedestal_pos, pedestal_dim,
+                           PALLET_CLEARANCE, axis=1, mode=offset_mode)
+
+    # 3. Calculate Targets to match the validated physics coordinates
+    margin_x = box_dim[0] / 2.0
+    min_x = conv_pos[0] - (conveyor_dim[0] / 2) + margin_x
+    pick_x = max(min_x, min(robot_pos[0], conv_pos[0] + (conveyor_dim[0]/2) - margin_x))
+    
+    place_x = pal_pos[0]
+    place_y = pal_pos[1]
+    
+    # Z Heights: Surface + Full Box Height + 0.01m air gap
+    pick_z = conveyor_dim[2] + box_dim[2] + 0.01
+    place_z = pallet_dim[2] + box_dim[2] + 0.01
+    box_spawn_z = conveyor_dim[2] + box_dim[2] / 2.0
+    
+    if verbose:
+        print(f"\n=== OFFSET SOLVER DEBUG (mode={offset_mode}) ===", file=sys.stderr)
+        print(f"Pedestal: pos={pedestal_pos}, dim={pedestal_dim}", file=sys.stderr)
+        print(f"Conveyor: dim={conveyor_dim}, clearance={CONVEYOR_CLEARANCE} -> conv_pos={conv_pos}", file=sys.stderr)
+        print(f"Pallet: dim={pallet_dim}, clearance={PALLET_CLEARANCE} -> pal_pos={pal_pos}", file=sys.stderr)
+        print(f"\n=== HEIGHT CALCULATION DEBUG ===", file=sys.stderr)
+        print(f"Conveyor height: {conveyor_dim[2]}", file=sys.stderr)
+        print(f"Pallet height: {pallet_dim[2]}", file=sys.stderr)
+        print(f"Box height: {box_dim[2]}", file=sys.stderr)
+        print(f"pick_z = {conveyor_dim[2]} + {box_dim[2]} + 0.01 = {pick_z}", file=sys.stderr)
+        print(f"place_z = {pallet_dim[2]} + {box_dim[2]} + 0.01 = {place_z}", file=sys.stderr)
+        print(f"box_spawn_z = {conveyor_dim[2]} + {box_dim[2]}/2 = {box_spawn_z}", file=sys.stderr)
+        print(f"================================\n", file=sys.stderr)
+
+    return {
+        "pedestal_pos": pedestal_pos,
+        "robot_pos": robot_pos,
+        "conveyor_pos": conv_pos,
+        "pallet_pos": pal_pos,
+        "box_spawn_pos": [round(pick_x, 3), 0.0, round(box_spawn_z, 3)],
+        "pick_target_xyz": [round(pick_x, 3), 0.0, round(pick_z, 3)],
+        "place_target_xyz": [round(place_x, 3), round(place_y, 3), round(place_z, 3)]
+    }
+
+# ============================================================================
+# END OF layout_generator.py LOGIC
+# ============================================================================
+
+
+# ============================================================================
+# BATCH LAYOUT API (vectorized calculate_layout)
+# ============================================================================
+
+LAYOUT_PARTS = ("pedestal", "conveyor", "pallet", "box")
+LAYOUT_KEYS = ("pedestal_pos", "robot_pos", "conveyor_pos", "pallet_pos",
+               "box_spawn_pos", "pick_target_xyz", "place_target_xyz")
+
+
+def _two_product(a, b):
+    """Dekker's error-free product: returns (p, e) with p + e == a * b exactly."""
+    def split(x):
+        c = 134217729.0 * x  # 2**27 + 1
+        hi = c - (c - x)
+        return hi, x - hi
+
+    p = a * b
+    a_hi, a_lo = split(a)
+    b_hi, b_lo = split(b)
+    e = ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return p, e
+
+
+def _round_like_python(values, ndigits):
+    """
+    Element-wise equivalent of Python's ``round(x, ndigits)``.
+
+    ``np.round`` scales, rounds and unscales, which can disagree with
+    Python's correctly-rounded ``round`` only when the scaled value sits on
+    a .5 tie (e.g. 0.82 + 0.115 / 2 rounded to 3 places). For those entries
+    the exact binary value is compared against the decimal midpoint with an
+    error-free product, and exact ties go to the even digit like ``round``.
+    """
+    values = np.asarray(values, dtype=float)
+    scale = 10.0 ** ndigits
+    rounded = np.round(values, ndigits)
+    scaled = values * scale
+    lower = np.floor(scaled)
+    near_tie = np.abs(scaled - lower - 0.5) < 1e-6
+    if near_tie.any():
+        j = lower[near_tie]
+        p, e = _two_product(values[near_tie], 2.0 * scale)
+        above_mid = (p - (2.0 * j + 1.0)) + e
+        round_up = (above_mid > 0) | ((above_mid == 0) & (j % 2 == 1))
+        rounded[near_tie] = (j + round_up) / scale
+    return rounded
+
+
+def _overlaps_on_axis(offset, dim, anchor_dim, clearance, axis):
+    """Vectorized ``check_2d_overlap`` for boxes slid along ``axis`` from an anchor at the origin."""
+    overlap = np.ones(offset.shape, dtype=bool)
+    for i in range(2):
+        pos = offset if i == axis else 0.0
+        min1 = _round_like_python(pos - (dim[:, i] / 2) - clearance, 4)
+        max1 = _round_like_python(pos + (dim[:, i] / 2) + clearance, 4)
+        min2 = _round_like_python(0.0 - (anchor_dim[:, i] / 2) - clearance, 4)
+        max2 = _round_like_python(0.0 + (anchor_dim[:, i] / 2) + clearance, 4)
+        overlap &= ~((max1 <= min2) | (max2 <= min1))
+    return overlap
+
+
+def solve_offsets(dim, anchor_dim, clearance, axis, mode="grid"):
+    """Vectorized ``solve_offset`` for an anchor at the origin; returns offsets of shape (N,)."""
+    exact = np.maximum((dim[:, axis] + anchor_dim[:, axis]) / 2.0 + 2.0 * clearance, 0.0)
+
+    def overlaps(offset):
+        return _overlaps_on_axis(offset, dim, anchor_dim, clearance, axis)
+
+    if mode == "tight":
+        offset = _round_like_python(np.ceil(_round_like_python(exact * 1000.0, 6)) / 1000.0, 3)
+        bump = overlaps(offset)
+        while bump.any():
+            offset[bump] = _round_like_python(offset[bump] + 0.001, 3)
+            bump = overlaps(offset)
+        return offset
+
+    if mode != "grid":
+        raise ValueError(f"Batch offsets support 'grid' and 'tight' modes, not '{mode}'")
+
+    k = np.maximum(np.ceil(exact / GRID_STEP - 1e-9), 0.0)
+    step_down = (k > 0) & ~overlaps(_round_like_python(k * GRID_STEP - GRID_STEP, 3))
+    while step_down.any():
+        k[step_down] -= 1
+        step_down = (k > 0) & ~overlaps(_round_like_python(k * GRID_STEP - GRID_STEP, 3))
+    step_up = overlaps(_round_like_python(k * GRID_STEP, 3))
+    while step_up.any():
+        k[step_up] += 1
+        step_up = overlaps(_round_like_python(k * GRID_STEP, 3))
+    return _round_like_python(k * GRID_STEP, 3)
+
+
+def stack_layout_inputs(layout_inputs):
+    """Stack layout_generator input dicts into a batch of (N, 3) dimension arrays."""
+    return {
+        part: np.array([li[part]["dimensions"] for li in layout_inputs], dtype=float).reshape(-1, 3)
+        for part in LAYOUT_PARTS
+    }
+
+
+def calculate_layouts(batch, offset_mode="grid"):
+    """
+    Solve N layouts in one vectorized pass.
+
+    Args:
+        batch: Mapping of "pedestal", "conveyor", "pallet" and "box" to
+            (N, 3) array-likes of [length, width, height] dimensions.
+        offset_mode: "grid" or "tight" (see ``solve_offset``).
+
+    Returns:
+        Mapping of each ``calculate_layout`` key to an (N, 3) float array.
+        Row i equals ``calculate_layout`` for entry i with float dimensions;
+        use ``layouts_to_dicts`` to get the same JSON-ready dicts back.
+    """
+    pedestal_dim, conveyor_dim, pallet_dim, box_dim = (
+        np.asarray(batch[part], dtype=float).reshape(-1, 3) for part in LAYOUT_PARTS
+    )
+    n = len(pedestal_dim)
+    zeros = np.zeros(n)
+
+    conv_x = solve_offsets(conveyor_dim, pedestal_dim, CONVEYOR_CLEARANCE, axis=0, mode=offset_mode)
+    pal_y = solve_offsets(pallet_dim, pedestal_dim, PALLET_CLEARANCE, axis=1, mode=offset_mode)
+
+    # Same operation order as calculate_layout so every float matches bit for bit.
+    # np.where mirrors Python's min()/max() tie-breaking (first argument wins).
+    margin_x = box_dim[:, 0] / 2.0
+    min_x = conv_x - (conveyor_dim[:, 0] / 2) + margin_x
+    upper_x = conv_x + (conveyor_dim[:, 0] / 2) - margin_x
+    inner = np.where(upper_x < zeros, upper_x, zeros)
+    pick_x = np.where(inner > min_x, inner, min_x)
+
+    pick_z = conveyor_dim[:, 2] + box_dim[:, 2] + 0.01
+    place_z = pallet_dim[:, 2] + box_dim[:, 2] + 0.01
+    box_spawn_z = conveyor_dim[:, 2] + box_dim[:, 2] / 2.0
+
+    pick_x_r = _round_like_python(pick_x, 3)
+    return {
+        "pedestal_pos": np.zeros((n, 3)),
+        "robot_pos": np.stack([zeros, zeros, pedestal_dim[:, 2]], axis=1),
+        "conveyor_pos": np.stack([conv_x, zeros, zeros], axis=1),
+        "pallet_pos": np.stack([zeros, pal_y, zeros], axis=1),
+        "box_spawn_pos": np.stack([pick_x_r, zeros, _round_like_python(box_spawn_z, 3)], axis=1),
+        "pick_target_xyz": np.stack([pick_x_r, zeros, _round_like_python(pick_z, 3)], axis=1),
+        "place_target_xyz": np.stack([zeros, _round_like_python(pal_y, 3),
+                                      _round_like_python(place_z, 3)], axis=1),
+    }
+
+
+def layouts_to_dicts(layouts):
+    """Split a ``calculate_layouts`` result into per-entry ``calculate_layout``-style dicts."""
+    columns = {key: layouts[key].tolist() for key in LAYOUT_KEYS}
+    n = len(columns["pedestal_pos"])
+    return [{key: columns[key][i] for key in LAYOUT_KEYS} for i in range(n)]
+
+# ============================================================================
+# END OF BATCH LAYOUT API
+# ============================================================================
+
+
+# ============================================================================
+# ORIENTED BOUNDING BOXES (yaw-rotated footprints)
+# ============================================================================
+
+# Penetration depths at or below this count as touching, not overlapping (metres)
+OBB_TOLERANCE = 1e-9
+
+
+def _obb_axes(yaw):
+    """Local X and Y unit axes of footprints rotated by ``yaw`` (radians): (..., 2, 2)."""
+    c, s = np.cos(yaw), np.sin(yaw)
+    return np.stack([np.stack([c, s], axis=-1), np.stack([-s, c], axis=-1)], axis=-2)
+
+
+def obb_penetration(c1, e1, yaw1, c2, e2, yaw2):
+    """
+    Separating-axis test for pairs of yaw-rotated rectangles.
+
+    Args:
+        c1, c2: (..., 2) centres.
+        e1, e2: (..., 2) half extents (already inflated by any clearance).
+        yaw1, yaw2: (...) yaw angles in radians.
+
+    Returns:
+        (...) penetration depth along the best separating axis: > 0 means
+        overlap, <= 0 means separated (or touching) with that much gap.
+    """
+    c1, e1, yaw1, c2, e2, yaw2 = (np.asarray(a, dtype=float) for a in (c1, e1, yaw1, c2, e2, yaw2))
+    ax1, ax2 = _obb_axes(yaw1), _obb_axes(yaw2)
+    ax1, ax2 = np.broadcast_arrays(ax1, ax2)
+    axes = np.concatenate([ax1, ax2], axis=-2)                          # (..., 4, 2)
+    dist = np.abs(((c2 - c1)[..., None, :] * axes).sum(axis=-1))        # (..., 4)
+    r1 = (e1[..., None, :] * np.abs((axes[..., :, None, :] * ax1[..., None, :, :]).sum(axis=-1))).sum(axis=-1)
+    r2 = (e2[..., None, :] * np.abs((axes[..., :, None, :] * ax2[..., None, :, :]).sum(axis=-1))).sum(axis=-1)
+    return (r1 + r2 - dist).min(axis=-1)
+
+
+def obb_overlap(c1, dim1, yaw1, c2, dim2, yaw2, clearance=0.0):
+    """
+    Oriented counterpart of ``check_2d_overlap``: both footprints are
+    inflated by ``clearance`` and touching does not count as overlap.
+    Broadcasts over any leading dimensions.
+    """
+    e1 = np.asarray(dim1, dtype=float)[..., :2] / 2.0 + clearance
+    e2 = np.asarray(dim2, dtype=float)[..., :2] / 2.0 + clearance
+    return obb_penetration(c1, e1, yaw1, c2, e2, yaw2) > OBB_TOLERANCE
+
+
+def layout_pair_overlaps(centers, dims, yaws, clearance=0.0):
+    """
+    Overlap matrix for every component pair of one or many layouts.
+
+    Args:
+        centers: (..., K, 2+) component floor positions.
+        dims: (..., K, 2+) component [length, width, ...].
+        yaws: (..., K) yaw angles in radians.
+        clearance: scalar or (K, K) per-pair clearance applied to both boxes.
+
+    Returns:
+        (..., K, K) boolean matrix, symmetric with a False diagonal. With a
+        leading batch axis a whole population of candidate layouts is
+        checked in one call.
+    """
+    centers = np.asarray(centers, dtype=float)[..., :2]
+    half = np.asarray(dims, dtype=float)[..., :2] / 2.0
+    yaws = np.asarray(yaws, dtype=float)
+    k = centers.shape[-2]
+    clearance = np.broadcast_to(np.asarray(clearance, dtype=float), (k, k))[..., None]
+    pen = obb_penetration(centers[..., :, None, :], half[..., :, None, :] + clearance, yaws[..., :, None],
+                          centers[..., None, :, :], half[..., None, :, :] + clearance, yaws[..., None, :])
+    overlap = pen > OBB_TOLERANCE
+    overlap &= ~np.eye(k, dtype=bool)
+    return overlap
+
+
+def rotated_half_extents(dim, yaw):
+    """Half extents of the axis-aligned box enclosing a footprint rotated by ``yaw`` (radians)."""
+    c, s = np.abs(np.cos(yaw)), np.abs(np.sin(yaw))
+    hx, hy = dim[0] / 2.0, dim[1] / 2.0
+    return np.stack([c * hx + s * hy, s * hx + c * hy], axis=-1)
+
+
+def _belt_pick_points(conv_xy, yaw, conveyor_dim, box_dim, base_xy):
+    """Pick point on a (possibly rotated) belt centreline closest to the robot base."""
+    axis = np.stack([np.cos(yaw), np.sin(yaw)], axis=-1)
+    half = conveyor_dim[0] / 2.0 - box_dim[0] / 2.0
+    t = ((base_xy - conv_xy) * axis).sum(axis=-1)
+    t = np.maximum(-half, np.minimum(t, half))
+    return conv_xy + t[..., None] * axis
+
+# ============================================================================
+# END OF ORIENTED BOUNDING BOXES
+# ============================================================================
+
+
+# ============================================================================
+# REACHABILITY MAPS (precomputed voxel grids, memory-mapped)
+# ============================================================================
+
+# <model>.npy holds an (nx, ny, nz) float32 grid in the robot base frame: the
+# manipulability of a downward-facing TCP at each voxel centre, 0 where IK
+# has no solution. <model>_grid.npy holds [x0, y0, z0, voxel, tool_length].
+# Built offline by build_reach_maps.py.
+REACH_MAP_DIR = Path(__file__).resolve().parents[1] / "reach_maps"
+
+# Flange-to-TCP distance the maps are built for (the catalog suction gripper)
+REACH_MAP_TOOL_LENGTH = 0.12
+
+# Stage 1 robot model -> map name (first matching substring wins)
+REACH_MAP_ALIASES = (
+    ("ur10", "ur10e"),
+    ("ur5", "ur5e"),
+    ("ur3", "ur3e"),
+    ("panda", "panda"),
+    ("franka", "panda"),
+    ("iiwa", "iiwa14"),
+)
+
+_reach_maps = {}
+
+
+class ReachMap:
+    """Memory-mapped reachability grid with O(1) lookups per target."""
+
+    def __init__(self, model, grid, origin, voxel, tool_length):
+        self.model = model
+        self.grid = grid
+        self.origin = np.asarray(origin, dtype=float)
+        self.voxel = float(voxel)
+        self.tool_length = float(tool_length)
+        self.shape = np.array(grid.shape)
+
+    def manipulability(self, points, base=(0.0, 0.0, 0.0)):
+        """
+        Manipulability of a downward-facing TCP at each (N, 3) world point for
+        a robot whose base sits at ``base`` (yaw 0). 0 outside the grid or
+        where the pose is unreachable.
+        """
+        pts = np.atleast_2d(np.asarray(points, dtype=float)) - np.asarray(base, dtype=float)
+        idx = np.floor((pts - self.origin) / self.voxel).astype(int)
+        inside = ((idx >= 0) & (idx < self.shape)).all(axis=1)
+        out = np.zeros(len(pts))
+        if inside.any():
+            i = idx[inside]
+            out[inside] = self.grid[i[:, 0], i[:, 1], i[:, 2]]
+        return out
+
+    def reachable(self, points, base=(0.0, 0.0, 0.0)):
+        return self.manipulability(points, base) > 0.0
+
+
+def reach_map_name(robot_model):
+    """Map name for a Stage 1 robot model string, or None when no map applies."""
+    model = str(robot_model or "").lower()
+    for key, name in REACH_MAP_ALIASES:
+        if key in model:
+            return name
+    return None
+
+
+def save_reach_map(name, grid, origin, voxel, tool_length=REACH_MAP_TOOL_LENGTH, directory=REACH_MAP_DIR):
+    """Write a map built by build_reach_maps.py; returns the grid path."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.npy"
+    np.save(path, np.asarray(grid, dtype=np.float32))
+    np.save(directory / f"{name}_grid.npy", np.array([*origin, voxel, tool_length], dtype=float))
+    _reach_maps.pop((str(directory), name), None)
+    return path
+
+
+def load_reach_map(robot_model, directory=REACH_MAP_DIR):
+    """
+    ReachMap for a Stage 1 robot model, or None when the model has no map.
+
+    Grids are opened with ``mmap_mode='r'`` and kept per process, so only
+    the pages a lookup touches are ever read.
+    """
+    name = reach_map_name(robot_model)
+    if name is None:
+        return None
+    key = (str(directory), name)
+    if key not in _reach_maps:
+        path = Path(directory) / f"{name}.npy"
+        reach_map = None
+        if path.exists():
+            grid = np.load(path, mmap_mode="r")
+            spec = np.load(Path(directory) / f"{name}_grid.npy")
+            reach_map = ReachMap(name, grid, spec[:3], spec[3], spec[4])
+        _reach_maps[key] = reach_map
+    return _reach_maps[key]
+
+
+def reach_maps_version(directory=REACH_MAP_DIR):
+    """Size/mtime signature of the map files, so rebuilt maps invalidate cached layouts."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return ""
+    return ";".join(f"{p.name}:{p.stat().st_size}:{p.stat().st_mtime_ns}"
+                    for p in sorted(directory.glob("*.npy")))
+
+# ============================================================================
+# END OF REACHABILITY MAPS
+# ============================================================================
+
+
+# ============================================================================
+# REACH-AWARE LAYOUT OPTIMIZER
+# ============================================================================
+
+# Layout modes selectable via solver_options["layout_mode"]:
+#   "greedy" - layout_generator.py placement (conveyor on +X, pallet on +Y)
+#   "reach"  - grid search keeping pick/place inside the reach annulus while
+#              minimizing the pick->place distance (cycle-time proxy)
+#   "pso"    - particle swarm over conveyor/pallet x, y and yaw
+# When "reach" / "pso" find no feasible layout the result is the greedy one,
+# reported as layout_mode "greedy_fallback" with reach_check["fallback"]
+LAYOUT_MODES = ("greedy", "reach", "pso")
+GREEDY_FALLBACK = "greedy_fallback"
+
+# Stage 2 validator rejects pick/place targets closer than this (metres)
+MIN_PICK_PLACE_DISTANCE = 0.8
+
+# Keep targets this far inside the reach annulus; IK is unreliable at the edge
+MIN_REACH_MARGIN = 0.02
+
+
+def reach_margins(layout, reach_min, reach_max, reach_map=None):
+    """
+    Distance from the robot base to each motion target and its reach margin.
+
+    The margin is the distance to the nearer edge of the reach annulus
+    [reach_min, reach_max]; it is negative when the target is outside.
+    With a ``reach_map`` each target also gets the map's downward-TCP
+    verdict (``ik_reachable``) and manipulability.
+    """
+    base = np.asarray(layout["robot_pos"], dtype=float)
+    targets = {}
+    for key in ("pick_target_xyz", "place_target_xyz"):
+        dist = float(np.linalg.norm(np.asarray(layout[key], dtype=float) - base))
+        margin = min(reach_max - dist, dist - reach_min)
+        targets[key] = {
+            "distance_m": round(dist, 4),
+            "margin_m": round(margin, 4),
+            "reachable": margin >= 0.0,
+        }
+        if reach_map is not None:
+            manip = float(reach_map.manipulability(layout[key], base)[0])
+            targets[key]["ik_reachable"] = manip > 0.0
+            targets[key]["manipulability"] = round(manip, 4)
+    pick_place = float(np.linalg.norm(np.asarray(layout["pick_target_xyz"], dtype=float)
+                                      - np.asarray(layout["place_target_xyz"], dtype=float)))
+    check = {
+        "reach_min": reach_min,
+        "reach_max": reach_max,
+        "targets": targets,
+        "all_reachable": all(t["reachable"] for t in targets.values()),
+        "pick_place_distance_m": round(pick_place, 4),
+    }
+    if reach_map is not None:
+        check["reach_map"] = {"model": reach_map.model, "voxel_m": reach_map.voxel}
+        check["all_ik_reachable"] = all(t["ik_reachable"] for t in targets.values())
+    return check
+
+
+def fallback_report(requested_mode, reach_check, required_margin=MIN_REACH_MARGIN):
+    """
+    reach_check entry of a layout that fell back to greedy: the mode asked
+    for, the reach margin it required and the margin the greedy layout
+    actually achieves (its worst target).
+    """
+    return {
+        "requested_mode": requested_mode,
+        "required_margin_m": required_margin,
+        "achieved_margin_m": min(t["margin_m"] for t in reach_check["targets"].values()),
+    }
+
+
+def _annulus_ok(xy, z, base, reach_min, reach_max, margin):
+    dist = np.sqrt((xy[:, 0] - base[0]) ** 2 + (xy[:, 1] - base[1]) ** 2 + (z - base[2]) ** 2)
+    return (dist >= reach_min + margin) & (dist <= reach_max - margin)
+
+
+def _search_grid(center, half_span, step):
+    """XY candidate grid of (M, 2) around ``center``, on multiples of ``step`` from it."""
+    n = int(math.floor(half_span / step + 1e-9))
+    axis = np.arange(-n, n + 1) * step
+    gx, gy = np.meshgrid(center[0] + axis, center[1] + axis, indexing="ij")
+    return np.stack([gx.ravel(), gy.ravel()], axis=1)
+
+
+def _best_pair(conv_xy, pal_xy, yaws, dims, base, reach, heights, anchors, min_pick_place, min_margin,
+               reach_map=None, chunk=4096, deadline=None):
+    """
+    Evaluate every feasible (conveyor, pallet) candidate pair in one array pass.
+
+    ``yaws`` is the (conveyor, pallet) yaw in radians shared by all candidates.
+    With a ``reach_map``, targets must also be reachable with a downward TCP.
+    Returns (conv_xy, pal_xy, pick_xy, cost) of the best pair, or None (also
+    once ``deadline``, a time.perf_counter() value, has passed).
+    """
+    pedestal_dim, conveyor_dim, pallet_dim, box_dim = dims
+    conv_yaw, pal_yaw = yaws
+    reach_min, reach_max = reach
+    pick_z, place_z = heights
+    origin = np.zeros(2)
+
+    conv_ok = ~obb_overlap(conv_xy, conveyor_dim, conv_yaw, origin, pedestal_dim, 0.0, CONVEYOR_CLEARANCE)
+    pick_xy = _belt_pick_points(conv_xy, conv_yaw, conveyor_dim, box_dim, base[:2])
+    conv_ok &= _annulus_ok(pick_xy, pick_z, base, reach_min, reach_max, min_margin)
+    pal_ok = ~obb_overlap(pal_xy, pallet_dim, pal_yaw, origin, pedestal_dim, 0.0, PALLET_CLEARANCE)
+    pal_ok &= _annulus_ok(pal_xy, place_z, base, reach_min, reach_max, min_margin)
+    if reach_map is not None:
+        conv_ok &= reach_map.reachable(np.column_stack([pick_xy, np.full(len(pick_xy), pick_z)]), base)
+        pal_ok &= reach_map.reachable(np.column_stack([pal_xy, np.full(len(pal_xy), place_z)]), base)
+    conv_xy, pick_xy, pal_xy = conv_xy[conv_ok], pick_xy[conv_ok], pal_xy[pal_ok]
+    if not len(conv_xy) or not len(pal_xy):
+        return None
+
+    # (Nc, 1, 2) vs (1, Np, 2) -> (Nc, Np)
+    dxy = pick_xy[:, None, :] - pal_xy[None, :, :]
+    travel = np.sqrt((dxy ** 2).sum(axis=-1) + (pick_z - place_z) ** 2)
+    # Tie-break toward the greedy layout so equal-travel solutions stay recognisable
+    drift = (np.linalg.norm(conv_xy - anchors[0], axis=1)[:, None]
+             + np.linalg.norm(pal_xy - anchors[1], axis=1)[None, :]
+             + abs(conv_yaw) + abs(pal_yaw))
+    cost = np.where(travel < min_pick_place, np.inf, travel + 1e-3 * drift).ravel()
+
+    # The conveyor/pallet OBB test is the expensive part, so run it lazily on
+    # the cheapest pairs first, one chunk at a time.
+    n_pal = len(pal_xy)
+    while True:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        k = min(chunk, cost.size)
+        cand = np.argpartition(cost, k - 1)[:k] if k < cost.size else np.arange(cost.size)
+        cand = cand[np.argsort(cost[cand], kind="stable")]
+        cand = cand[np.isfinite(cost[cand])]
+        if not len(cand):
+            return None
+        ci, pi = cand // n_pal, cand % n_pal
+        clash = obb_overlap(conv_xy[ci], conveyor_dim, conv_yaw, pal_xy[pi], pallet_dim, pal_yaw,
+                            COMPONENT_CLEARANCE)
+        free = np.flatnonzero(~clash)
+        if len(free):
+            i = cand[free[0]]
+            return conv_xy[i // n_pal], pal_xy[i % n_pal], pick_xy[i // n_pal], float(cost[i])
+        cost[cand] = np.inf
+
+
+def optimize_layout(config_json, coarse_step=0.05, fine_step=0.01,
+                    min_pick_place_distance=MIN_PICK_PLACE_DISTANCE,
+                    min_reach_margin=MIN_REACH_MARGIN, yaw_candidates_deg=(0.0, 90.0),
+                    reach_map=None, verbose=True, deadline=None):
+    """
+    Reach-aware layout: pick and place targets inside [reach_min, reach_max]
+    of the robot base (less ``min_reach_margin``), with the shortest
+    pick->place distance.
+
+    Conveyor and pallet may move anywhere on the floor and take any yaw in
+    ``yaw_candidates_deg``. For each yaw combination a coarse grid over the
+    reachable area is searched first, then a fine grid around the best
+    pair. A ``reach_map`` (see load_reach_map) additionally rejects targets
+    the robot cannot reach with a downward-facing TCP. Falls back to the
+    greedy layout when no feasible pair exists: ``layout_mode`` is then
+    GREEDY_FALLBACK and ``reach_check["fallback"]`` gives the margin
+    required and achieved (fallback_report). With a ``deadline``
+    (time.perf_counter() value) yaw combinations left when it passes are
+    skipped.
+
+    Returns the ``calculate_layout`` keys plus conveyor/pallet yaw (degrees),
+    ``reach_check`` and ``layout_mode``.
+    """
+    config = json.loads(config_json)
+    reach_max = float(config["robot"]["reach_max"])
+    reach_min = float(config["robot"]["reach_min"])
+    pedestal_dim, conveyor_dim, pallet_dim, box_dim = (
+        np.asarray(config[part]["dimensions"], dtype=float) for part in LAYOUT_PARTS
+    )
+
+    greedy = calculate_layout(config_json, verbose=False)
+    base = np.array(greedy["robot_pos"], dtype=float)
+    pick_z = greedy["pick_target_xyz"][2]
+    place_z = greedy["place_target_xyz"][2]
+    anchors = (np.array(greedy["conveyor_pos"][:2]), np.array(greedy["pallet_pos"][:2]))
+    dims = (pedestal_dim, conveyor_dim, pallet_dim, box_dim)
+    args = (dims, base, (reach_min, reach_max), (pick_z, place_z), anchors,
+            min_pick_place_distance, min_reach_margin, reach_map)
+
+    conv_span = reach_max + max(conveyor_dim[0], conveyor_dim[1]) / 2
+    pal_span = reach_max
+    conv_grid = _search_grid(np.zeros(2), conv_span, coarse_step)
+    pal_grid = _search_grid(np.zeros(2), pal_span, coarse_step)
+
+    best, best_yaws = None, (0.0, 0.0)
+    for conv_yaw_deg in yaw_candidates_deg:
+        for pal_yaw_deg in yaw_candidates_deg:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            yaws = (math.radians(conv_yaw_deg), math.radians(pal_yaw_deg))
+            found = _best_pair(conv_grid, pal_grid, yaws, *args, deadline=deadline)
+            if found is None:
+                continue
+            refined = _best_pair(_search_grid(found[0], coarse_step, fine_step),
+                                 _search_grid(found[1], coarse_step, fine_step), yaws, *args, deadline=deadline)
+            if refined is not None and refined[3] <= found[3]:
+                found = refined
+            if best is None or found[3] < best[3]:
+                best, best_yaws = found, (float(conv_yaw_deg), float(pal_yaw_deg))
+
+    if best is None:
+        layout = dict(greedy)
+        layout["layout_mode"] = GREEDY_FALLBACK
+    else:
+        conv_xy, pal_xy, pick_xy = (np.round(v, 3) for v in best[:3])
+        pick_x, pick_y = float(pick_xy[0]), float(pick_xy[1])
+        layout = {
+            "pedestal_pos": greedy["pedestal_pos"],
+            "robot_pos": greedy["robot_pos"],
+            "conveyor_pos": [float(conv_xy[0]), float(conv_xy[1]), 0.0],
+            "pallet_pos": [float(pal_xy[0]), float(pal_xy[1]), 0.0],
+            "box_spawn_pos": [pick_x, pick_y, greedy["box_spawn_pos"][2]],
+            "pick_target_xyz": [pick_x, pick_y, pick_z],
+            "place_target_xyz": [float(pal_xy[0]), float(pal_xy[1]), place_z],
+            "conveyor_yaw_deg": best_yaws[0],
+            "pallet_yaw_deg": best_yaws[1],
+            "layout_mode": "reach",
+        }
+
+    layout["reach_check"] = reach_margins(layout, reach_min, reach_max, reach_map)
+    if best is None:
+        layout["reach_check"]["fallback"] = fallback_report("reach", layout["reach_check"], min_reach_margin)
+    if verbose:
+        rc = layout["reach_check"]
+        print(f"\n=== REACH OPTIMIZER DEBUG ===", file=sys.stderr)
+        print(f"Reach annulus: [{reach_min}, {reach_max}] m, mode used: {layout['layout_mode']}", file=sys.stderr)
+        print(f"conveyor_pos={layout['conveyor_pos']} yaw={layout.get('conveyor_yaw_deg', 0.0)}, "
+              f"pallet_pos={layout['pallet_pos']} yaw={layout.get('pallet_yaw_deg', 0.0)}", file=sys.stderr)
+        for key, t in rc["targets"].items():
+            print(f"{key}: dist={t['distance_m']} margin={t['margin_m']} reachable={t['reachable']}"
+                  f" ik_reachable={t.get('ik_reachable', 'n/a')}", file=sys.stderr)
+        print(f"pick->place distance: {rc['pick_place_distance_m']} m", file=sys.stderr)
+        print(f"=============================\n", file=sys.stderr)
+    return layout
+
+# ============================================================================
+# END OF REACH-AWARE LAYOUT OPTIMIZER
+# ============================================================================
+
+
+# ============================================================================
+# PARTICLE SWARM LAYOUT SEARCH
+# ============================================================================
+
+# Weights of the PSO cost terms (override via solver_options["pso"]["weights"])
+PSO_WEIGHTS = {
+    "overlap": 1000.0,    # per metre of clearance-inflated OBB penetration depth
+    "reach": 100.0,       # per metre outside the reach annulus (less margin)
+    "separation": 100.0,  # per metre below MIN_PICK_PLACE_DISTANCE
+    "travel": 1.0,        # per metre of pick->place distance
+    "footprint": 0.05,    # per m^2 of the cell's XY bounding box
+}
+
+PSO_DEFAULTS = {
+    "particles": 64,
+    "max_iters": 200,
+    "time_budget_s": 0.5,
+    "patience": 40,       # stop after this many iterations without improvement
+    "tolerance": 1e-6,
+    "inertia": 0.7,
+    "cognitive": 1.5,
+    "social": 1.5,
+    "seed": 0,
+    "slack": 0.002,       # metres added to every constraint while searching
+}
+
+
+def layout_cost(x, dims, base, reach, heights, weights, min_pick_place, min_margin, slack=0.0):
+    """
+    Vectorized PSO cost for a population of layouts.
+
+    Args:
+        x: (P, 6) array of [conv_x, conv_y, conv_yaw, pal_x, pal_y, pal_yaw]
+           (yaw in radians).
+        slack: Extra metres on every clearance and limit, so the search
+            optimum survives rounding to mm / 0.1 deg.
+
+    Returns:
+        (cost, terms): (P,) total cost and a dict of the (P,) unweighted terms.
+    """
+    pedestal_dim, conveyor_dim, pallet_dim, box_dim = dims
+    reach_min, reach_max = reach
+    pick_z, place_z = heights
+    conv_xy, conv_yaw = x[:, 0:2], x[:, 2]
+    pal_xy, pal_yaw = x[:, 3:5], x[:, 5]
+
+    ped_e = np.array([pedestal_dim[0] / 2.0, pedestal_dim[1] / 2.0])
+    conv_half = np.array([conveyor_dim[0] / 2.0, conveyor_dim[1] / 2.0])
+    pal_half = np.array([pallet_dim[0] / 2.0, pallet_dim[1] / 2.0])
+    origin = np.zeros(2)
+
+    def penetration(c1, h1, yaw1, c2, h2, yaw2, clearance):
+        pad = clearance + slack
+        return np.clip(obb_penetration(c1, h1 + pad, yaw1, c2, h2 + pad, yaw2), 0.0, None)
+
+    overlap = (penetration(conv_xy, conv_half, conv_yaw, origin, ped_e, 0.0, CONVEYOR_CLEARANCE)
+               + penetration(pal_xy, pal_half, pal_yaw, origin, ped_e, 0.0, PALLET_CLEARANCE)
+               + penetration(conv_xy, conv_half, conv_yaw, pal_xy, pal_half, pal_yaw, COMPONENT_CLEARANCE))
+
+    pick_xy = _belt_pick_points(conv_xy, conv_yaw, conveyor_dim, box_dim, base[:2])
+    d_pick = np.sqrt(((pick_xy - base[:2]) ** 2).sum(axis=-1) + (pick_z - base[2]) ** 2)
+    d_place = np.sqrt(((pal_xy - base[:2]) ** 2).sum(axis=-1) + (place_z - base[2]) ** 2)
+    margin = min_margin + slack
+    reach_violation = sum(
+        np.clip(d - (reach_max - margin), 0.0, None) + np.clip((reach_min + margin) - d, 0.0, None)
+        for d in (d_pick, d_place)
+    )
+
+    travel = np.sqrt(((pick_xy - pal_xy) ** 2).sum(axis=-1) + (pick_z - place_z) ** 2)
+    separation = np.clip(min_pick_place + slack - travel, 0.0, None)
+
+    conv_e = rotated_half_extents(conveyor_dim, conv_yaw)
+    pal_e = rotated_half_extents(pallet_dim, pal_yaw)
+    lo = np.minimum(np.minimum(conv_xy - conv_e, pal_xy - pal_e), -ped_e)
+    hi = np.maximum(np.maximum(conv_xy + conv_e, pal_xy + pal_e), ped_e)
+    footprint = np.prod(hi - lo, axis=-1)
+
+    terms = {
+        "overlap": overlap,
+        "reach": reach_violation,
+        "separation": separation,
+        "travel": travel,
+        "footprint": footprint,
+    }
+    cost = sum(weights[k] * v for k, v in terms.items())
+    return cost, terms
+
+
+def pso_layout(config_json, options=None, reach_map=None, verbose=True):
+    """
+    Global layout search with a particle swarm over conveyor/pallet x, y, yaw.
+
+    The whole swarm is scored with one ``layout_cost`` call per iteration.
+    The swarm is seeded with the greedy and reach-aware layouts, and stops
+    on ``max_iters``, ``time_budget_s`` (which includes the reach-aware
+    seed search) or ``patience`` iterations without improvement. A result
+    with any overlap, reach or separation violation is discarded in favour
+    of the reach-aware (or else greedy, GREEDY_FALLBACK) layout.
+
+    A ``reach_map`` is applied to the reach-aware seed and the final
+    ``reach_check``; the swarm cost itself stays annulus-based.
+
+    Returns the ``calculate_layout`` keys plus conveyor/pallet yaw (degrees),
+    ``reach_check``, ``layout_mode`` and ``pso_stats`` (convergence history).
+    """
+    opts = dict(PSO_DEFAULTS)
+    opts.update(options or {})
+    weights = dict(PSO_WEIGHTS)
+    weights.update(opts.pop("weights", None) or {})
+    rng = np.random.default_rng(opts["seed"])
+
+    config = json.loads(config_json)
+    reach_max = float(config["robot"]["reach_max"])
+    reach_min = float(config["robot"]["reach_min"])
+    dims = tuple(np.asarray(config[part]["dimensions"], dtype=float) for part in LAYOUT_PARTS)
+    _, conveyor_dim, pallet_dim, _ = dims
+
+    greedy = calculate_layout(config_json, verbose=False)
+    base = np.array(greedy["robot_pos"], dtype=float)
+    heights = (greedy["pick_target_xyz"][2], greedy["place_target_xyz"][2])
+
+    def cost_fn(x, slack=opts["slack"]):
+        return layout_cost(x, dims, base, (reach_min, reach_max), heights, weights,
+                           MIN_PICK_PLACE_DISTANCE, MIN_REACH_MARGIN, slack=slack)
+
+    # Search box: anything further out cannot reach; yaw in [-90, 90] covers symmetric footprints
+    conv_span = reach_max + max(conveyor_dim[0], conveyor_dim[1]) / 2.0
+    pal_span = reach_max + max(pallet_dim[0], pallet_dim[1]) / 2.0
+    half_pi = math.pi / 2.0
+    lower = np.array([-conv_span, -conv_span, -half_pi, -pal_span, -pal_span, -half_pi])
+    upper = -lower
+    v_max = 0.2 * (upper - lower)
+
+    n = int(opts["particles"])
+    pos = rng.uniform(lower, upper, size=(n, 6))
+    seeds = [[*greedy["conveyor_pos"][:2], 0.0, *greedy["pallet_pos"][:2], 0.0]]
+    # The seed search is charged to the time budget
+    t0 = time.perf_counter()
+    reach_seed = optimize_layout(config_json, reach_map=reach_map, verbose=False,
+                                 deadline=t0 + opts["time_budget_s"])
+    seed_s = time.perf_counter() - t0
+    if reach_seed["layout_mode"] == "reach":
+        seeds.append([*reach_seed["conveyor_pos"][:2], math.radians(reach_seed["conveyor_yaw_deg"]),
+                      *reach_seed["pallet_pos"][:2], math.radians(reach_seed["pallet_yaw_deg"])])
+    pos[:len(seeds)] = np.clip(seeds, lower, upper)
+    vel = rng.uniform(-v_max, v_max, size=(n, 6))
+
+    cost, _ = cost_fn(pos)
+    best_pos, best_cost = pos.copy(), cost.copy()
+    g = int(np.argmin(best_cost))
+    g_pos, g_cost = best_pos[g].copy(), float(best_cost[g])
+
+    history = [round(g_cost, 6)]
+    stop_reason = "max_iters"
+    stall = 0
+    it = 0
+    for it in range(1, int(opts["max_iters"]) + 1):
+        if time.perf_counter() - t0 >= opts["time_budget_s"]:
+            stop_reason = "time_budget"
+            it -= 1
+            break
+        r1, r2 = rng.random((n, 6)), rng.random((n, 6))
+        vel = (opts["inertia"] * vel
+               + opts["cognitive"] * r1 * (best_pos - pos)
+               + opts["social"] * r2 * (g_pos - pos))
+        vel = np.clip(vel, -v_max, v_max)
+        pos = np.clip(pos + vel, lower, upper)
+
+        cost, _ = cost_fn(pos)
+        improved = cost < best_cost
+        best_pos[improved], best_cost[improved] = pos[improved], cost[improved]
+        g = int(np.argmin(best_cost))
+        if best_cost[g] < g_cost - opts["tolerance"]:
+            g_pos, g_cost = best_pos[g].copy(), float(best_cost[g])
+            stall = 0
+        else:
+            stall += 1
+        history.append(round(g_cost, 6))
+
+        if stall >= opts["patience"]:
+            stop_reason = "stalled"
+            break
+    elapsed = time.perf_counter() - t0
+
+    # Round to mm / 0.1 deg, then re-score the layout that will actually be emitted
+    conv_xy = np.round(g_pos[0:2], 3)
+    pal_xy = np.round(g_pos[3:5], 3)
+    conv_yaw_deg = round(float(np.degrees(g_pos[2])), 1) + 0.0  # + 0.0 drops -0.0
+    pal_yaw_deg = round(float(np.degrees(g_pos[5])), 1) + 0.0
+    final = np.array([[*conv_xy, math.radians(conv_yaw_deg), *pal_xy, math.radians(pal_yaw_deg)]])
+    final_cost, terms = cost_fn(final, slack=0.0)
+    terms = {k: round(float(v[0]), 6) for k, v in terms.items()}
+    feasible = terms["overlap"] <= OBB_TOLERANCE and terms["reach"] == 0.0 and terms["separation"] == 0.0
+
+    stats = {
+        "iterations": it,
+        "evaluations": n * (it + 1),
+        "particles": n,
+        "elapsed_s": round(elapsed, 4),
+        "seed_s": round(seed_s, 4),
+        "stop_reason": stop_reason,
+        "best_cost": round(float(final_cost[0]), 6),
+        "cost_terms": terms,
+        "feasible": feasible,
+        "history": history,
+    }
+
+    if feasible:
+        pick_xy = np.round(_belt_pick_points(conv_xy, math.radians(conv_yaw_deg), conveyor_dim,
+                                             dims[3], base[:2]), 3)
+        pick_x, pick_y = float(pick_xy[0]), float(pick_xy[1])
+        layout = {
+            "pedestal_pos": greedy["pedestal_pos"],
+            "robot_pos": greedy["robot_pos"],
+            "conveyor_pos": [float(conv_xy[0]), float(conv_xy[1]), 0.0],
+            "pallet_pos": [float(pal_xy[0]), float(pal_xy[1]), 0.0],
+            "box_spawn_pos": [pick_x, pick_y, greedy["box_spawn_pos"][2]],
+            "pick_target_xyz": [pick_x, pick_y, heights[0]],
+            "place_target_xyz": [float(pal_xy[0]), float(pal_xy[1]), heights[1]],
+            "conveyor_yaw_deg": conv_yaw_deg,
+            "pallet_yaw_deg": pal_yaw_deg,
+            "layout_mode": "pso",
+        }
+    else:
+        layout = dict(reach_seed)
+
+    layout["reach_check"] = reach_margins(layout, reach_min, reach_max, reach_map)
+    if layout["layout_mode"] == GREEDY_FALLBACK:
+        layout["reach_check"]["fallback"] = fallback_report("pso", layout["reach_check"])
+    layout["pso_stats"] = stats
+    if verbose:
+        print(f"\n=== PSO LAYOUT DEBUG ===", file=sys.stderr)
+        print(f"{n} particles, {it} iterations in {elapsed:.3f}s (stop: {stop_reason})", file=sys.stderr)
+        print(f"best cost={stats['best_cost']} terms={terms} feasible={feasible}", file=sys.stderr)
+        print(f"mode used: {layout['layout_mode']}, conveyor_pos={layout['conveyor_pos']}, "
+              f"pallet_pos={layout['pallet_pos']}", file=sys.stderr)
+        print(f"========================\n", file=sys.stderr)
+    return layout
+
+# ============================================================================
+# END OF PARTICLE SWARM LAYOUT SEARCH
+# ============================================================================
+
+
+# ============================================================================
+# AUXILIARY COMPONENTS (uniform-grid broad phase)
+# ============================================================================
+
+# Broad-phase cell size (metres); roughly the footprint of a table or bin
+SPATIAL_CELL_SIZE = 0.5
+
+# Spacing of the candidate floor positions tried for auxiliary components (metres)
+AUX_SEARCH_STEP = 0.1
+
+# Auxiliary components are kept this far outside reach_max so they never
+# obstruct the pick/place motion (metres)
+AUX_REACH_CLEARANCE = 0.05
+
+# A candidate position rejected this many times is retired; gaps that keep
+# failing rarely fit anything later and rescanning them makes placement O(N^2)
+AUX_MAX_REJECTIONS = 2
+
+# Component types that are never placed on the floor as auxiliary components
+AUX_SKIP_TYPES = ("robot", "manipulator", "arm", "gripper", "carton", "box", "object")
+
+
+class UniformGridIndex:
+    """
+    Uniform-grid broad phase for yaw-rotated floor footprints.
+
+    Every footprint is registered in each grid cell its enclosing
+    axis-aligned box touches, so a query runs the exact OBB test only
+    against footprints sharing a cell with it instead of against all of
+    them. Footprints are inserted one by one as they are placed; the index
+    never needs rebuilding.
+    """
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.centers = []
+        self.dims = []
+        self.yaws = []
+        self._boxes = []    # (cx, cy, hx, hy, cos, sin) for the scalar narrow phase
+        self.narrow_tests = 0
+
+    def __len__(self):
+        return len(self.centers)
+
+    def _cells(self, center, dim, yaw, pad):
+        # Scalar math: called once per query, where NumPy overhead dominates
+        c, s = abs(math.cos(yaw)), abs(math.sin(yaw))
+        hx = c * dim[0] / 2.0 + s * dim[1] / 2.0 + pad
+        hy = s * dim[0] / 2.0 + c * dim[1] / 2.0 + pad
+        size = self.cell_size
+        return [(i, j)
+                for i in range(math.floor((center[0] - hx) / size), math.floor((center[0] + hx) / size) + 1)
+                for j in range(math.floor((center[1] - hy) / size), math.floor((center[1] + hy) / size) + 1)]
+
+    def insert(self, center, dim, yaw=0.0):
+        """Register a footprint (``yaw`` in radians) and return its id."""
+        center = np.asarray(center, dtype=float)[:2]
+        dim = np.asarray(dim, dtype=float)[:2]
+        idx = len(self.centers)
+        self.centers.append(center)
+        self.dims.append(dim)
+        self.yaws.append(float(yaw))
+        self._boxes.append(_box_tuple(center, dim, yaw, 0.0))
+        for cell in self._cells(center, dim, yaw, 0.0):
+            self.cells.setdefault(cell, []).append(idx)
+        return idx
+
+    def candidates(self, center, dim, yaw=0.0, clearance=0.0):
+        """Ids of footprints sharing a grid cell with the query box."""
+        found = set()
+        # Both boxes are inflated by clearance, so pad the query by twice that
+        for cell in self._cells(center, dim, yaw, 2.0 * clearance):
+            found.update(self.cells.get(cell, ()))
+        return sorted(found)
+
+    def collisions(self, center, dim, yaw=0.0, clearance=0.0):
+        """Ids of footprints overlapping the query box (same rules as ``obb_overlap``)."""
+        ids = self.candidates(center, dim, yaw, clearance)
+        self.narrow_tests += len(ids)
+        # One query meets only a handful of neighbours, far too few to
+        # amortise NumPy call overhead, so the narrow phase is scalar here
+        query = _box_tuple(center, dim, yaw, clearance)
+        return [i for i in ids
+                if _box_penetration(query, _inflate(self._boxes[i], clearance)) > OBB_TOLERANCE]
+
+
+def _box_tuple(center, dim, yaw, clearance):
+    return (float(center[0]), float(center[1]), float(dim[0]) / 2.0 + clearance,
+            float(dim[1]) / 2.0 + clearance, math.cos(yaw), math.sin(yaw))
+
+
+def _inflate(box, clearance):
+    return box[:2] + (box[2] + clearance, box[3] + clearance) + box[4:]
+
+
+def _box_penetration(a, b):
+    """Scalar ``obb_penetration`` for two ``_box_tuple`` footprints."""
+    ax, ay, ahx, ahy, ac, as_ = a
+    bx, by, bhx, bhy, bc, bs = b
+    dx, dy = bx - ax, by - ay
+    # Cosines between the two boxes' local axes
+    uu, uv = abs(ac * bc + as_ * bs), abs(ac * -bs + as_ * bc)
+    vu, vv = abs(-as_ * bc + ac * bs), abs(as_ * bs + ac * bc)
+    return min(
+        ahx + bhx * uu + bhy * uv - abs(dx * ac + dy * as_),
+        ahy + bhx * vu + bhy * vv - abs(-dx * as_ + dy * ac),
+        ahx * uu + ahy * vu + bhx - abs(dx * bc + dy * bs),
+        ahx * uv + ahy * vv + bhy - abs(-dx * bs + dy * bc),
+    )
+
+
+def get_auxiliary_components(components, primary):
+    """Floor components other than the pedestal/conveyor/pallet already laid out."""
+    aux = []
+    for comp in components:
+        if any(comp is p for p in primary if p is not None):
+            continue
+        comp_type = comp.get('component_type', '').lower()
+        if any(kw in comp_type for kw in AUX_SKIP_TYPES):
+            continue
+        aux.append(comp)
+    return aux
+
+
+def _ring_candidates(r_in, r_out, step):
+    """Floor points on multiples of ``step`` with r_in <= |p| < r_out, nearest first."""
+    n = int(np.ceil(r_out / step))
+    g = np.arange(-n, n + 1) * step
+    pts = np.stack(np.meshgrid(g, g, indexing="ij"), axis=-1).reshape(-1, 2)
+    r = np.hypot(pts[:, 0], pts[:, 1])
+    keep = (r >= r_in) & (r < r_out)
+    pts, r = pts[keep], r[keep]
+    order = np.lexsort((np.arctan2(pts[:, 1], pts[:, 0]), np.round(r, 9)))
+    return np.round(pts[order], 3) + 0.0
+
+
+def place_auxiliary_components(layout, layout_input, aux_dims, clearance=COMPONENT_CLEARANCE,
+                               step=AUX_SEARCH_STEP, index=None, verbose=True):
+    """
+    Place an arbitrary list of auxiliary floor components (tables, bins,
+    fences, ...) around an existing pedestal/conveyor/pallet layout.
+
+    Components are placed in order at the free candidate position closest
+    to the robot base, outside its reach plus ``AUX_REACH_CLEARANCE``. Each
+    collision query goes through a ``UniformGridIndex`` seeded with the
+    primary components and updated as every auxiliary component is placed,
+    so a query only meets its neighbours; together with retiring candidates
+    after ``AUX_MAX_REJECTIONS`` the whole placement stays close to linear
+    in the number of components.
+
+    Returns:
+        (positions, stats): one [x, y, 0.0] per entry of ``aux_dims`` and a
+        dict of search counters.
+    """
+    t0 = time.perf_counter()
+    index = UniformGridIndex() if index is None else index
+    index.insert(layout["pedestal_pos"], layout_input["pedestal"]["dimensions"])
+    index.insert(layout["conveyor_pos"], layout_input["conveyor"]["dimensions"],
+                 math.radians(layout.get("conveyor_yaw_deg", 0.0)))
+    index.insert(layout["pallet_pos"], layout_input["pallet"]["dimensions"],
+                 math.radians(layout.get("pallet_yaw_deg", 0.0)))
+
+    base = np.asarray(layout["robot_pos"], dtype=float)[:2]
+    keep_out = layout_input["robot"]["reach_max"] + AUX_REACH_CLEARANCE
+    dims = [np.asarray(d, dtype=float)[:2] for d in aux_dims]
+    if not dims:
+        return [], {"components": 0, "candidates_tested": 0, "narrow_tests": 0,
+                    "cell_size_m": index.cell_size, "elapsed_s": 0.0}
+
+    # Every footprint contains the disc of radius min_half about its centre,
+    # so nearer centres can never clear the keep-out circle
+    min_half = min(float(d.min()) for d in dims) / 2.0
+    r_in = keep_out + min_half
+    r_out = r_in + max(float(np.hypot(*d)) for d in dims) + step
+    cands = _ring_candidates(r_in, r_out, step) + base
+    rejections = np.zeros(len(cands), dtype=int)
+    tested = 0
+
+    positions = []
+    for dim in dims:
+        half = dim / 2.0
+        placed = None
+        while placed is None:
+            gap = np.maximum(np.abs(cands - base) - half, 0.0)
+            clear_of_reach = np.hypot(gap[:, 0], gap[:, 1]) > keep_out
+            for i in np.flatnonzero(clear_of_reach & (rejections < AUX_MAX_REJECTIONS)):
+                tested += 1
+                if not index.collisions(cands[i], dim, 0.0, clearance):
+                    placed = cands[i]
+                    break
+                rejections[i] += 1
+            if placed is None:
+                # Ring exhausted: grow it outwards and keep searching
+                more = _ring_candidates(r_out, 2.0 * r_out, step) + base
+                cands = np.concatenate([cands, more])
+                rejections = np.concatenate([rejections, np.zeros(len(more), dtype=int)])
+                r_out *= 2.0
+        index.insert(placed, dim)
+        positions.append([round(float(placed[0]), 3), round(float(placed[1]), 3), 0.0])
+
+    stats = {
+        "components": len(positions),
+        "candidates_tested": tested,
+        "narrow_tests": index.narrow_tests,
+        "cell_size_m": index.cell_size,
+        "elapsed_s": round(time.perf_counter() - t0, 4),
+    }
+    if verbose:
+        print(f"\n=== AUXILIARY PLACEMENT DEBUG ===", file=sys.stderr)
+        print(f"{stats['components']} components outside r={keep_out:.3f}m, "
+              f"{tested} candidates, {index.narrow_tests} narrow-phase tests in {stats['elapsed_s']}s",
+              file=sys.stderr)
+        print(f"================================\n", file=sys.stderr)
+    return positions, stats
+
+# ============================================================================
+# END OF AUXILIARY COMPONENTS
+# ============================================================================
+
+
+# ============================================================================
+# PALLETIZING PATTERNS
+# ============================================================================
+
+# Stacking patterns selectable via solver_options["pallet_pattern"]:
+#   "column"    - identical layers, every carton in the same orientation
+#   "interlock" - two-block layer (cartons at 0 and 90 deg), mirrored on
+#                 alternate layers so seams never line up
+#   "pinwheel"  - four blocks rotating around the pallet centre, rotated
+#                 180 deg on alternate layers
+PALLET_PATTERNS = ("column", "interlock", "pinwheel")
+
+# Defaults for solver_options["pallet_pattern"] (a pattern name or a dict of these)
+PALLET_PATTERN_DEFAULTS = {
+    "pattern": "interlock",
+    "layers": None,          # None: as many layers as fit under max_load_height
+    "max_load_height": 1.2,  # carton stack height above the pallet surface (metres)
+    "gap": 0.005,            # space left between neighbouring cartons (metres)
+    "reachable_only": True,  # drop slots the robot cannot reach (annulus and reach map)
+}
+
+
+def _block(x0, y0, nx, ny, sx, sy, yaw_deg):
+    """Centres of an nx * ny block of sx * sy cells from corner (x0, y0), with carton yaw."""
+    gx, gy = np.meshgrid(x0 + (np.arange(nx) + 0.5) * sx, y0 + (np.arange(ny) + 0.5) * sy, indexing="ij")
+    return np.stack([gx.ravel(), gy.ravel(), np.full(nx * ny, float(yaw_deg))], axis=-1)
+
+
+def _column_layer(length, width, l, w):
+    """Best single-orientation grid: (N, 3) local [x, y, yaw_deg] from the pallet corner."""
+    options = [(int(length // l), int(width // w), l, w, 0.0), (int(length // w), int(width // l), w, l, 90.0)]
+    nx, ny, sx, sy, yaw = max(options, key=lambda o: o[0] * o[1])
+    return _block(0.0, 0.0, nx, ny, sx, sy, yaw)
+
+
+def _interlock_layer(length, width, l, w):
+    """Best two-block split along the pallet length (0 deg block, then 90 deg block)."""
+    column = _column_layer(length, width, l, w)
+    best, best_count = column, len(column)
+    for a, b in (((l, w, 0.0), (w, l, 90.0)), ((w, l, 90.0), (l, w, 0.0))):
+        ny_a, ny_b = int(width // a[1]), int(width // b[1])
+        for nx_a in range(1, int(length // a[0])):
+            nx_b = int((length - nx_a * a[0]) // b[0])
+            count = nx_a * ny_a + nx_b * ny_b
+            # A genuine two-block layer wins ties: mirroring a uniform grid interlocks nothing
+            if nx_b * ny_b and (count > best_count or (count == best_count and best is column)):
+                best, best_count = np.concatenate([_block(0.0, 0.0, nx_a, ny_a, *a),
+                                                   _block(nx_a * a[0], 0.0, nx_b, ny_b, *b)]), count
+    return best
+
+
+def _pinwheel_layer(length, width, l, w):
+    """
+    Best point-symmetric pinwheel: blocks R1/R3 of 0 deg cartons at opposite
+    corners, R2/R4 of 90 deg cartons filling the remaining strips.
+    """
+    best = _column_layer(length, width, l, w)
+    for p, q, yaw_a, yaw_b in ((l, w, 0.0, 90.0), (w, l, 90.0, 0.0)):
+        for n1 in range(1, int(length // p) + 1):
+            a = n1 * p
+            if a < length / 2.0:
+                continue
+            for m1 in range(1, int((width / 2.0) // q) + 1):
+                b = m1 * q
+                n2, m2 = int((length - a) // q), int((width - b) // p)
+                if 2 * (n1 * m1 + n2 * m2) <= len(best):
+                    continue
+                r1 = _block(0.0, 0.0, n1, m1, p, q, yaw_a)
+                r2 = _block(a, 0.0, n2, m2, q, p, yaw_b)
+                half = np.concatenate([r1, r2])
+                mirrored = half.copy()
+                mirrored[:, :2] = [length, width] - half[:, :2]
+                best = np.concatenate([half, mirrored])
+    return best
+
+
+def pallet_pattern(pallet_dim, box_dim, pattern="interlock", layers=None,
+                   max_load_height=PALLET_PATTERN_DEFAULTS["max_load_height"],
+                   gap=PALLET_PATTERN_DEFAULTS["gap"]):
+    """
+    Carton poses for a full multi-layer pallet load, in the pallet frame.
+
+    Returns:
+        (N, 4) array of [x, y, z, yaw_deg]: x/y relative to the pallet
+        centre, z the place height (same rule as ``place_target_xyz``:
+        surface + carton height + 0.01 m air gap, one carton height per
+        layer) and yaw relative to the pallet. Layer by layer.
+    """
+    if pattern not in PALLET_PATTERNS:
+        raise ValueError(f"Unknown pallet pattern '{pattern}' (expected one of {PALLET_PATTERNS})")
+    length, width, height = (float(v) for v in pallet_dim)
+    l, w, h = (float(v) for v in box_dim)
+    builder = {"column": _column_layer, "interlock": _interlock_layer, "pinwheel": _pinwheel_layer}[pattern]
+    # Cells are carton + gap; the gap is only needed between cartons, not at the pallet edge
+    layer = builder(length + gap, width + gap, l + gap, w + gap)
+    if len(layer) == 0:
+        return np.zeros((0, 4))
+    # Centre the used area on the pallet
+    half_extent = np.where(layer[:, 2:3] == 0.0, [l + gap, w + gap], [w + gap, l + gap]) / 2.0
+    lo = (layer[:, :2] - half_extent).min(axis=0)
+    hi = (layer[:, :2] + half_extent).max(axis=0)
+    layer[:, :2] -= (lo + hi) / 2.0
+
+    if layers is None:
+        layers = max(1, int((max_load_height + 1e-9) // h))
+    k = np.arange(int(layers))
+    odd = (k % 2 == 1)[:, None, None]
+    # Alternate layers: mirror across the pallet's short axis (interlock) or
+    # its long axis (pinwheel, which is point-symmetric, so a 180 deg turn
+    # would map it onto itself) so vertical seams never stack up
+    flip = {"column": [1.0, 1.0], "interlock": [-1.0, 1.0], "pinwheel": [1.0, -1.0]}[pattern]
+    xy = np.where(odd, layer[None, :, :2] * flip, layer[None, :, :2])
+    z = np.broadcast_to((height + (k + 1) * h + 0.01)[:, None, None], xy.shape[:2] + (1,))
+    yaw = np.broadcast_to(layer[None, :, 2:3], xy.shape[:2] + (1,))
+    return np.concatenate([xy, z, yaw], axis=-1).reshape(-1, 4)
+
+
+def pallet_place_targets(layout, layout_input, options=None, reach_map=None):
+    """
+    World-frame place targets for the whole pallet load.
+
+    Within each layer cartons are ordered farthest from the robot first,
+    so the arm never reaches over a carton it has already placed. With
+    ``reachable_only`` (default) slots outside the reach annulus, or
+    unreachable with a downward TCP per the ``reach_map``, are dropped, so
+    the load is capped at the layers the arm can actually serve.
+
+    Returns:
+        (targets, summary): ``targets`` is a list of [x, y, z, yaw_deg];
+        ``summary`` has the pattern, the served layers and load height, the
+        emitted and skipped slot counts, how many slots of the full pattern
+        sit inside the reach annulus (and, with a ``reach_map``, how many
+        are reachable with a downward TCP) and the emitted targets' worst
+        reach margin.
+    """
+    if isinstance(options, str):
+        options = {"pattern": options}
+    opts = dict(PALLET_PATTERN_DEFAULTS)
+    opts.update(options or {})
+    box_dim = layout_input["box"]["dimensions"]
+    local = pallet_pattern(layout_input["pallet"]["dimensions"], box_dim, opts["pattern"], opts["layers"],
+                           opts["max_load_height"], opts["gap"])
+
+    yaw_deg = float(layout.get("pallet_yaw_deg", 0.0))
+    c, s = math.cos(math.radians(yaw_deg)), math.sin(math.radians(yaw_deg))
+    world = local.copy()
+    world[:, 0] = layout["pallet_pos"][0] + c * local[:, 0] - s * local[:, 1]
+    world[:, 1] = layout["pallet_pos"][1] + s * local[:, 0] + c * local[:, 1]
+    world[:, 3] = (local[:, 3] + yaw_deg) % 180.0   # cartons are symmetric under 180 deg
+
+    base = np.asarray(layout["robot_pos"], dtype=float)
+    dist = np.linalg.norm(world[:, :3] - base, axis=-1)
+    order = np.lexsort((-dist, world[:, 2]))
+    world, dist = world[order], dist[order]
+    reach_min, reach_max = layout_input["robot"]["reach_min"], layout_input["robot"]["reach_max"]
+    margin = np.minimum(reach_max - dist, dist - reach_min)
+    reachable = margin >= 0.0
+    ik_reachable = reach_map.reachable(world[:, :3], base) if reach_map is not None else None
+
+    pattern_layers = len(np.unique(world[:, 2]))
+    pattern_count = len(world)
+    if opts["reachable_only"]:
+        keep = reachable if ik_reachable is None else reachable & ik_reachable
+        world, margin = world[keep], margin[keep]
+    layers = len(np.unique(world[:, 2]))
+    targets = [[round(float(x), 3) + 0.0, round(float(y), 3) + 0.0, round(float(z), 3), round(float(a), 1) + 0.0]
+               for x, y, z, a in world]
+    summary = {
+        "pattern": opts["pattern"],
+        "layers": layers,
+        "pattern_layers": pattern_layers,
+        "cartons_per_layer": pattern_count // pattern_layers if pattern_layers else 0,
+        "count": len(world),
+        "skipped": pattern_count - len(world),
+        "load_height_m": round(float(world[:, 2].max()) - float(layout_input["pallet"]["dimensions"][2]) - 0.01, 3)
+                         if len(world) else 0.0,
+        "reachable": int(reachable.sum()),
+        "min_margin_m": round(float(margin.min()), 4) if len(margin) else None,
+    }
+    if ik_reachable is not None:
+        summary["ik_reachable"] = int(ik_reachable.sum())
+    return targets, summary
+
+# ============================================================================
+# END OF PALLETIZING PATTERNS
+# ============================================================================
+
+
+# ============================================================================
+# LAYOUT CACHE (content-addressed, SQLite)
+# ============================================================================
+
+# Override with PLACEMENT_CACHE_PATH; "off" disables caching
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[3] / "output" / "placement_cache.sqlite3"
+
+# Least-recently-used entries beyond this count are evicted (PLACEMENT_CACHE_MAX_ENTRIES)
+DEFAULT_CACHE_MAX_ENTRIES = 2000
+
+# Floats are rounded to this many decimals before hashing so 0.3 and 0.30000000000000004 share a key
+CACHE_KEY_DECIMALS = 6
+
+
+# Per process: the solver version (computed once) and one open LayoutCache per cache path and thread
+_solver_version = None
+_layout_caches = {}
+
+
+def solver_version():
+    """
+    Hash of this script's source and the reach maps: any edit or map rebuild
+    invalidates cached layouts. Computed once per process, like the reach
+    maps themselves (load_reach_map).
+    """
+    global _solver_version
+    if _solver_version is None:
+        digest = hashlib.sha256(Path(__file__).read_bytes())
+        digest.update(reach_maps_version().encode())
+        _solver_version = digest.hexdigest()[:16]
+    return _solver_version
+
+
+def _canonical(value):
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return round(float(value), CACHE_KEY_DECIMALS) + 0.0
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    raise TypeError(f"Cannot fingerprint {type(value).__name__}")
+
+
+def layout_fingerprint(layout_input, solver_options, aux_dims, version=None):
+    """
+    Canonical SHA-256 key of everything that determines a layout: component
+    dimensions, robot reach, solver options and the solver version. Robot
+    and component names are deliberately left out. PSO options are keyed
+    with their defaults filled in, so the time budget and the seed are
+    always part of a PSO key.
+    """
+    options = {k: v for k, v in (solver_options or {}).items() if k != "cache"}
+    if options.get("layout_mode") == "pso":
+        options["pso"] = {**PSO_DEFAULTS, **(options.get("pso") or {})}
+    payload = {
+        "solver": version or solver_version(),
+        "robot": {"reach_max": layout_input["robot"]["reach_max"],
+                  "reach_min": layout_input["robot"]["reach_min"]},
+        "dimensions": {part: layout_input[part]["dimensions"] for part in LAYOUT_PARTS},
+        "aux_dims": aux_dims,
+        "options": options,
+    }
+    blob = json.dumps(_canonical(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LayoutCache:
+    """
+    Size-bounded LRU store of solved layouts in a local SQLite file.
+
+    Entries are keyed by ``layout_fingerprint``; lookups refresh an entry's
+    last-used time and ``put`` evicts the least recently used entries beyond
+    ``max_entries``. Entries written by another solver version are dropped
+    on write. Hit/miss/eviction counters persist in the same file.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_CACHE_MAX_ENTRIES, version=None):
+        self.path = Path(path)
+        self.max_entries = int(max_entries)
+        self.version = version or solver_version()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=5.0)
+        # A cache may lose its last writes on power loss; never wait on fsync
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS layouts (key TEXT PRIMARY KEY, solver TEXT NOT NULL, "
+                              "value TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS layouts_last_used ON layouts (last_used)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _bump(self, name, amount=1):
+        self.conn.execute("INSERT INTO counters (name, value) VALUES (?, ?) "
+                          "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, amount))
+
+    def get(self, key):
+        """Cached value for ``key`` or None; counts a hit or a miss."""
+        with self.conn:
+            row = self.conn.execute("SELECT value FROM layouts WHERE key = ? AND solver = ?",
+                                    (key, self.version)).fetchone()
+            if row is None:
+                self._bump("misses")
+                return None
+            self.conn.execute("UPDATE layouts SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._bump("hits")
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        """Store ``value`` (JSON-serialisable) and evict down to ``max_entries``."""
+        now = time.time()
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO layouts (key, solver, value, created, last_used) "
+                              "VALUES (?, ?, ?, ?, ?)", (key, self.version, json.dumps(value), now, now))
+            stale = self.conn.execute("DELETE FROM layouts WHERE solver != ?", (self.version,)).rowcount
+            excess = self.conn.execute("SELECT COUNT(*) FROM layouts").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute("DELETE FROM layouts WHERE key IN "
+                                  "(SELECT key FROM layouts ORDER BY last_used ASC LIMIT ?)", (excess,))
+            if stale or excess > 0:
+                self._bump("evictions", stale + max(excess, 0))
+
+    def stats(self):
+        """Entry count plus persistent hit/miss/eviction counters."""
+        counters = dict(self.conn.execute("SELECT name, value FROM counters").fetchall())
+        return {
+            "entries": self.conn.execute("SELECT COUNT(*) FROM layouts").fetchone()[0],
+            "max_entries": self.max_entries,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+def open_layout_cache(solver_options=None):
+    """
+    LayoutCache configured from the environment, or None when disabled via
+    ``solver_options["cache"] = False`` or ``PLACEMENT_CACHE_PATH=off``.
+    The connection is opened on first use and kept open for later solves
+    in the same process and thread. A cache that cannot be opened is
+    reported on stderr and skipped.
+    """
+    path = os.environ.get("PLACEMENT_CACHE_PATH", str(DEFAULT_CACHE_PATH))
+    if not (solver_options or {}).get("cache", True) or path.lower() in ("", "off", "0", "false"):
+        return None
+    max_entries = int(os.environ.get("PLACEMENT_CACHE_MAX_ENTRIES", DEFAULT_CACHE_MAX_ENTRIES))
+    key = (path, max_entries, threading.get_ident())
+    if key not in _layout_caches:
+        try:
+            _layout_caches[key] = LayoutCache(path, max_entries)
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️  Layout cache unavailable ({e}); solving without it", file=sys.stderr)
+            return None
+    return _layout_caches[key]
+
+
+def discard_layout_cache(cache):
+    """Close a cache from open_layout_cache() after an error, so the next solve reopens it."""
+    for key, open_cache in list(_layout_caches.items()):
+        if open_cache is cache:
+            del _layout_caches[key]
+    try:
+        cache.close()
+    except sqlite3.Error:
+        pass
+
+# ============================================================================
+# END OF LAYOUT CACHE
+# ============================================================================
+
+
+def get_component(components, keywords):
+    """Find component by matching keywords in type or name.
+    
+    Prioritizes exact component_type matches over substring matches in names
+    to avoid false positives (e.g., 'pallet' in 'carton_to_palletize').
+    """
+    # First pass: Try to match component_type exactly
+    for comp in components:
+        comp_type = comp.get('component_type', '').lower()
+        for kw in keywords:
+            if comp_type == kw or comp_type.startswith(kw):
+                return comp
+    
+    # Second pass: Fall back to substring match in names
+    for comp in components:
+        comp_type = comp.get('component_type', '').lower()
+        comp_name = comp.get('name', '').lower()
+        for kw in keywords:
+            # Only match if keyword is standalone word (not substring of another word)
+            if (kw in comp_type or kw in comp_name) and comp_type != 'carton':
+                return comp
+    
+    return None
+
+
+def solve_layout(layout_input, solver_options, aux_dims, verbose=True):
+    """
+    Solve the geometry of one Stage 1 request.
+
+    Returns a JSON-serialisable dict with ``layout_coordinates``,
+    ``layout_mode``, ``reach_check``, ``pso_stats``, the full-pallet
+    ``place_targets``/``pallet_pattern`` and the auxiliary component
+    ``aux_positions``/``aux_stats`` - everything the layout cache stores.
+    """
+    # Call layout_generator (closed-form offsets; "grid" matches the original output)
+    offset_mode = solver_options.get("offset_mode", "grid")
+    layout_mode = solver_options.get("layout_mode", "greedy")
+    # Precomputed reachability grid for this robot (None: no map, annulus only)
+    reach_map = load_reach_map(layout_input["robot"]["name"]) if solver_options.get("reach_map", True) else None
+    pso_stats = None
+    if layout_mode == "reach":
+        layout_coords = optimize_layout(json.dumps(layout_input), reach_map=reach_map, verbose=verbose)
+        layout_mode = layout_coords.pop("layout_mode")
+        reach_check = layout_coords.pop("reach_check")
+    elif layout_mode == "pso":
+        layout_coords = pso_layout(json.dumps(layout_input), options=solver_options.get("pso"),
+                                   reach_map=reach_map, verbose=verbose)
+        layout_mode = layout_coords.pop("layout_mode")
+        reach_check = layout_coords.pop("reach_check")
+        pso_stats = layout_coords.pop("pso_stats")
+    elif layout_mode == "greedy":
+        layout_coords = calculate_layout(json.dumps(layout_input), offset_mode=offset_mode, verbose=verbose)
+        reach_check = reach_margins(layout_coords, layout_input["robot"]["reach_min"],
+                                    layout_input["robot"]["reach_max"], reach_map)
+    else:
+        raise ValueError(f"Unknown layout_mode '{layout_mode}' (expected one of {LAYOUT_MODES})")
+
+    # One place target per carton of the full pallet load
+    place_targets, pattern_summary = pallet_place_targets(layout_coords, layout_input,
+                                                          solver_options.get("pallet_pattern"), reach_map)
+
+    # Tables, bins, fences, ... go around the primary layout
+    aux_positions, aux_stats = [], None
+    if aux_dims:
+        aux_positions, aux_stats = place_auxiliary_components(layout_coords, layout_input, aux_dims,
+                                                              verbose=verbose)
+    return {
+        "layout_coordinates": layout_coords,
+        "layout_mode": layout_mode,
+        "reach_check": reach_check,
+        "pso_stats": pso_stats,
+        "place_targets": place_targets,
+        "pallet_pattern": pattern_summary,
+        "aux_positions": aux_positions,
+        "aux_stats": aux_stats,
+    }
+
+
+def cached_solve_layout(layout_input, solver_options, aux_dims, verbose=True):
+    """
+    ``solve_layout`` behind the persistent layout cache.
+
+    A PSO layout that stopped on its time budget depends on how fast this
+    machine ran the swarm, so it is returned but not stored.
+
+    Returns (solved, cache_info); cache_info is None when the cache is
+    disabled or unusable, in which case the layout is simply solved.
+    """
+    cache = open_layout_cache(solver_options)
+    if cache is None:
+        return solve_layout(layout_input, solver_options, aux_dims, verbose=verbose), None
+    try:
+        key = layout_fingerprint(layout_input, solver_options, aux_dims, version=cache.version)
+        solved = cache.get(key)
+        if verbose:
+            print(f"Layout cache {'HIT' if solved is not None else 'MISS'} {key[:16]}", file=sys.stderr)
+        hit = solved is not None
+        stored = False
+        if not hit:
+            solved = solve_layout(layout_input, solver_options, aux_dims, verbose=verbose)
+            stored = (solved["pso_stats"] or {}).get("stop_reason") != "time_budget"
+            if stored:
+                cache.put(key, solved)
+        return solved, {"hit": hit, "stored": stored, "key": key[:16], **cache.stats()}
+    except (sqlite3.Error, TypeError) as e:
+        print(f"⚠️  Layout cache failed ({e}); solving without it", file=sys.stderr)
+        if isinstance(e, sqlite3.Error):
+            discard_layout_cache(cache)
+        return solve_layout(layout_input, solver_options, aux_dims, verbose=verbose), None
+
+def solve(stage1: Dict[str, Any], verbose: bool = True, cache: bool = False) -> Dict[str, Any]:
+    """
+    Solve Stage 2 for a Stage 1 dict and return the Stage 2 result dict.
+
+    Accepts the direct Stage 1 format or the agent's wrapped
+    ``{"stage1_data": {...}}`` form. Debug output goes to stderr when
+    ``verbose``. The persistent layout cache is only used with ``cache``
+    (the agent and the solve_placement.py CLI) or ``"solver_options":
+    {"cache": true}``, so validators and benchmarks leave no files behind.
+    Raises ValueError for missing fields or unknown options. The result
+    shares no lists with ``stage1``, so callers may mutate it.
+    """
+    # Handle both direct Stage1 format and wrapped {"stage1_data": {...}} format
+    # (agent may wrap args under "stage1_data" key)
+    if "stage1_data" in stage1 and "robot_selection" not in stage1:
+        stage1 = stage1["stage1_data"]
+
+    # Validate inputs
+    if 'robot_selection' not in stage1 or 'workcell_components' not in stage1:
+        raise ValueError("Missing required fields")
+
+    # Extract components
+    robot = stage1["robot_selection"]
+    comps = stage1["workcell_components"]
+    task = stage1.get("task_specification", {})
+    # Optional solver knobs, e.g. {"offset_mode": "tight", "layout_mode": "reach"}
+    solver_options = stage1.get("solver_options", {})
+    
+    pedestal = get_component(comps, ['pedestal', 'base', 'mount'])
+    conveyor = get_component(comps, ['conveyor', 'belt'])
+    pallet = get_component(comps, ['pallet', 'station'])
+    carton = get_component(comps, ['box', 'carton', 'object'])
+    
+    # Get box dimensions from task_specification or components
+    box_dims = task.get('dimensions', [0.20, 0.20, 0.20])
+    if not box_dims or len(box_dims) != 3:
+        box_dims = carton.get('dimensions', [0.20, 0.20, 0.20]) if carton else [0.20, 0.20, 0.20]
+    
+    # Construct input JSON (EXACT format from layout_generator.py)
+    layout_input = {
+        "robot": {
+            "name": robot.get('model', 'ur5'),
+            "reach_max": robot.get('reach_m', 0.85),
+            "reach_min": 0.20
+        },
+        "pedestal": {
+            "dimensions": pedestal.get('dimensions', [0.60, 0.60, 0.50]) if pedestal else [0.60, 0.60, 0.50]
+        },
+        "conveyor": {
+            "dimensions": conveyor.get('dimensions', [2.00, 0.64, 0.82]) if conveyor else [2.00, 0.64, 0.82]
+        },
+        "pallet": {
+            "dimensions": pallet.get('dimensions', [1.20, 0.80, 0.15]) if pallet else [1.20, 0.80, 0.15]
+        },
+        "box": {
+            "dimensions": box_dims
+        }
+    }
+    
+    # DEBUG: Log the exact input being used
+    if verbose:
+        print(f"\n{'='*60}", file=sys.stderr)
+        print(f"LAYOUT GENERATOR INPUT", file=sys.stderr)
+        print(f"{'='*60}", file=sys.stderr)
+        print(f"Robot info:", file=sys.stderr)
+        print(f"  name: {layout_input['robot']['name']}", file=sys.stderr)
+        print(f"  reach_max: {layout_input['robot']['reach_max']}", file=sys.stderr)
+        print(f"  reach_min: {layout_input['robot']['reach_min']}", file=sys.stderr)
+        print(f"Component dimensions:", file=sys.stderr)
+        print(f"  pedestal: {layout_input['pedestal']['dimensions']}", file=sys.stderr)
+        print(f"  conveyor: {layout_input['conveyor']['dimensions']}", file=sys.stderr)
+        print(f"  pallet: {layout_input['pallet']['dimensions']}", file=sys.stderr)
+        print(f"  box: {layout_input['box']['dimensions']}", file=sys.stderr)
+        print(f"{'='*60}\n", file=sys.stderr)
+
+    # Tables, bins, fences, ... that are not part of the pick/place triangle
+    aux_components = get_auxiliary_components(comps, (pedestal, conveyor, pallet, carton))
+    aux_dims = [c.get('dimensions', [0.5, 0.5, 0.5]) for c in aux_components]
+
+    # Identical dimensions/reach/options reuse a cached layout (see LayoutCache)
+    if solver_options.get("cache", cache):
+        solved, cache_info = cached_solve_layout(layout_input, solver_options, aux_dims, verbose=verbose)
+    else:
+        solved, cache_info = solve_layout(layout_input, solver_options, aux_dims, verbose=verbose), None
+
+    layout_coords = solved["layout_coordinates"]
+    layout_mode = solved["layout_mode"]
+    reach_check = solved["reach_check"]
+    pso_stats = solved["pso_stats"]
+    aux_stats = solved["aux_stats"]
+    
+    # Convert to Stage 2 format (lists are copied: the result must not alias stage1 or
+    # layout_coordinates, since in-process callers may edit it)
+    # Orientation is [roll, pitch, yaw] in degrees; reach/pso layouts may rotate conveyor and pallet
+    conveyor_orientation = [0, 0, layout_coords.get('conveyor_yaw_deg', 0)]
+    pallet_orientation = [0, 0, layout_coords.get('pallet_yaw_deg', 0)]
+    optimized_components = []
+    
+    if pedestal:
+        optimized_components.append({
+            "name": pedestal['name'],
+            "component_type": pedestal.get('component_type', 'pedestal'),
+            "position": list(layout_coords['pedestal_pos']),
+            "orientation": [0, 0, 0],
+            "dimensions": list(pedestal['dimensions']),
+            "mjcf_path": pedestal.get('mjcf_path', '')
+        })
+    
+    if conveyor:
+        optimized_components.append({
+            "name": conveyor['name'],
+            "component_type": conveyor.get('component_type', 'conveyor'),
+            "position": list(layout_coords['conveyor_pos']),
+            "orientation": conveyor_orientation,
+            "dimensions": list(conveyor['dimensions']),
+            "mjcf_path": conveyor.get('mjcf_path', '')
+        })
+    
+    if pallet:
+        optimized_components.append({
+            "name": pallet['name'],
+            "component_type": pallet.get('component_type', 'pallet'),
+            "position": list(layout_coords['pallet_pos']),
+            "orientation": pallet_orientation,
+            "dimensions": list(pallet['dimensions']),
+            "mjcf_path": pallet.get('mjcf_path', '')
+        })
+    
+    # Tables, bins, fences, ... placed around the primary layout
+    for comp, pos in zip(aux_components, solved["aux_positions"]):
+        optimized_components.append({
+            "name": comp['name'],
+            "component_type": comp.get('component_type', ''),
+            "position": pos,
+            "orientation": [0, 0, 0],
+            "dimensions": list(comp.get('dimensions', [0.5, 0.5, 0.5])),
+            "mjcf_path": comp.get('mjcf_path', '')
+        })
+    
+    # Add carton at its spawn position (on top of conveyor)
+    # ALWAYS use component_type='carton' and the canonical mjcf path — never trust the LLM's type/path.
+    carton_name = carton['name'] if carton else 'cardboard_box'
+    CARTON_TYPE = 'carton'   # hardcoded — downstream code matches on this exact string
+    CARTON_MJCF = 'D:/GitHub/ieee_case/workcell_components/boxes/cardboard_box.xml'  # canonical path
+    optimized_components.append({
+        "name": carton_name,
+        "component_type": CARTON_TYPE,
+        "position": list(layout_coords['box_spawn_pos']),
+        "orientation": list(conveyor_orientation),  # carton rides the belt
+        "dimensions": list(box_dims),
+        "mjcf_path": CARTON_MJCF
+    })
+    
+    # Output result
+    result = {
+        "status": "success",
+        "layout_mode": layout_mode,
+        "optimized_components": optimized_components,
+        "layout_coordinates": layout_coords,
+        "motion_targets": {
+            "robot_pos": list(layout_coords['robot_pos']),
+            "pick_target_xyz": list(layout_coords['pick_target_xyz']),
+            "place_target_xyz": list(layout_coords['place_target_xyz']),
+            "box_spawn_pos": list(layout_coords['box_spawn_pos']),
+            # Full pallet load, [x, y, z, yaw_deg] per carton in placing order
+            "place_targets": solved["place_targets"]
+        },
+        "reach_check": reach_check,
+        "pallet_pattern": solved["pallet_pattern"]
+    }
+    if pso_stats is not None:
+        result["pso_stats"] = pso_stats
+    if aux_stats is not None:
+        result["auxiliary_stats"] = aux_stats
+    if cache_info is not None:
+        result["cache"] = cache_info
+    return result
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Closed-form inverse kinematics for the Universal Robots arms (NumPy)
+
+UR3e/UR5e/UR10e have three parallel joint axes (shoulder, elbow, wrist 1),
+so their standard DH parameters (ROBOT_KINEMATICS in kinematics.py)
+admit the classic analytic solution: two shoulder, two wrist and two elbow branches, i.e. up to eight
+joint solutions per TCP pose. Everything is vectorized over targets, so a
+batch of thousands of poses solves in microseconds per target.
+
+Poses are in the robot base (DH) frame with the suction TCP
+``tool_length`` along the flange z axis, as for the reachability maps.
+Solutions are wrapped into the joint limits and ranked by distance to a
+seed configuration; invalid branches (target out of reach or inside the
+shoulder cylinder) sort last with ``valid`` False.
+
+Usage:
+    python skills/placement_solver/scripts/ur_ik.py ur5e 0.4 0.2 0.1
+"""
+
+import argparse
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from kinematics import ROBOT_KINEMATICS, forward_kinematics  # noqa: E402
+from placement_core import REACH_MAP_TOOL_LENGTH, reach_map_name  # noqa: E402
+
+# Models solved in closed form (standard-DH UR arms)
+UR_MODELS = tuple(name for name in ROBOT_KINEMATICS if name.startswith("ur"))
+
+# Branches with |sin(theta5)| below this are wrist-singular; theta6 is then taken from the seed
+WRIST_SINGULAR_EPS = 1e-6
+
+
+def ur_model(robot_model):
+    """UR_MODELS entry for a Stage 1 model string or MJCF file name, or None."""
+    name = reach_map_name(Path(str(robot_model or "")).name)
+    return name if name in UR_MODELS else None
+
+
+def _dh(theta, d, a, alpha):
+    """(..., 4, 4) standard DH transforms Rz(theta) Tz(d) Tx(a) Rx(alpha)."""
+    ct, st = np.cos(theta), np.sin(theta)
+    ca, sa = math.cos(alpha), math.sin(alpha)
+    t = np.zeros(np.shape(theta) + (4, 4))
+    t[..., 0, 0], t[..., 0, 1], t[..., 0, 2], t[..., 0, 3] = ct, -st * ca, st * sa, a * ct
+    t[..., 1, 0], t[..., 1, 1], t[..., 1, 2], t[..., 1, 3] = st, ct * ca, -ct * sa, a * st
+    t[..., 2, 1], t[..., 2, 2], t[..., 2, 3] = sa, ca, d
+    t[..., 3, 3] = 1.0
+    return t
+
+
+def _inv(t):
+    """Inverse of (..., 4, 4) rigid transforms."""
+    inv = np.zeros_like(t)
+    rt = np.swapaxes(t[..., :3, :3], -1, -2)
+    inv[..., :3, :3] = rt
+    inv[..., :3, 3] = -(rt @ t[..., :3, 3, None])[..., 0]
+    inv[..., 3, 3] = 1.0
+    return inv
+
+
+def _wrap_to_seed(q, seed, lo, hi):
+    """Shift each angle by multiples of 2*pi toward the seed, staying inside the limits."""
+    q = seed + (q - seed + np.pi) % (2 * np.pi) - np.pi
+    q = np.where(q > hi, q - 2 * np.pi, q)
+    q = np.where(q < lo, q + 2 * np.pi, q)
+    return q, (q >= lo - 1e-9) & (q <= hi + 1e-9)
+
+
+def ur_ik(model, tcp_poses, seed=None, tool_length=REACH_MAP_TOOL_LENGTH):
+    """
+    Every analytic IK branch for a batch of TCP poses.
+
+    Args:
+        model: UR_MODELS entry (or any alias ur_model() resolves).
+        tcp_poses: (B, 4, 4) TCP poses in the base frame.
+        seed: (6,) or (B, 6) joint configuration to rank branches by
+            (default zeros).
+
+    Returns:
+        (solutions (B, 8, 6), valid (B, 8)) with each target's branches
+        sorted by max joint distance to the seed, valid ones first.
+    """
+    spec = ROBOT_KINEMATICS[ur_model(model) or model]
+    a, d, alpha = spec["a"], spec["d"], spec["alpha"]
+    lo, hi = np.array(spec["limits"]).T
+    tcp = np.asarray(tcp_poses, dtype=float).reshape(-1, 4, 4)
+    b = len(tcp)
+    seed = np.broadcast_to(np.zeros(6) if seed is None else np.asarray(seed, dtype=float), (b, 6))
+
+    # Flange pose: back off the tool along its z axis
+    t06 = tcp.copy()
+    t06[:, :3, 3] -= t06[:, :3, 2] * (spec["flange"] + tool_length)
+    p06 = t06[:, :3, 3]
+    p05 = p06 - d[5] * t06[:, :3, 2]
+
+    # Branch grid (B, 8): shoulder s1, wrist s5, elbow s3 signs
+    s1, s5, s3 = (np.array(bits, dtype=float) for bits in
+                  zip(*[(i, j, k) for i in (1, -1) for j in (1, -1) for k in (1, -1)]))
+    valid = np.ones((b, 8), dtype=bool)
+
+    # theta1: shoulder left/right of the wrist centre
+    r = np.hypot(p05[:, 0], p05[:, 1])
+    ratio = d[3] / np.maximum(r, 1e-12)
+    valid &= (ratio <= 1.0)[:, None]
+    th1 = (np.arctan2(p05[:, 1], p05[:, 0])[:, None]
+           + s1 * np.arccos(np.clip(ratio, -1.0, 1.0))[:, None] + np.pi / 2)
+    c1, sn1 = np.cos(th1), np.sin(th1)
+
+    # theta5: wrist up/down
+    c5 = (p06[:, 0, None] * sn1 - p06[:, 1, None] * c1 - d[3]) / d[5]
+    valid &= np.abs(c5) <= 1.0 + 1e-9
+    th5 = s5 * np.arccos(np.clip(c5, -1.0, 1.0))
+    sn5 = np.sin(th5)
+
+    # theta6 from the base axes seen from the flange (free when the wrist is singular)
+    r06 = t06[:, :3, :3]
+    singular = np.abs(sn5) < WRIST_SINGULAR_EPS
+    safe5 = np.where(singular, 1.0, sn5)
+    th6 = np.arctan2((-r06[:, 0, 1, None] * sn1 + r06[:, 1, 1, None] * c1) / safe5,
+                     (r06[:, 0, 0, None] * sn1 - r06[:, 1, 0, None] * c1) / safe5)
+    th6 = np.where(singular, seed[:, 5, None], th6)
+
+    # Planar 3R problem for theta2..theta4 in frame 1
+    t01 = _dh(th1, d[0], a[0], alpha[0])
+    t46 = _dh(th5, d[4], a[4], alpha[4]) @ _dh(th6, d[5], a[5], alpha[5])
+    t14 = _inv(t01) @ t06[:, None] @ _inv(t46)
+    p13 = t14[..., :3, 3] - d[3] * t14[..., :3, 1]
+    n13 = np.linalg.norm(p13, axis=-1)
+    c3 = (n13 ** 2 - a[1] ** 2 - a[2] ** 2) / (2 * a[1] * a[2])
+    valid &= np.abs(c3) <= 1.0 + 1e-9
+    th3 = s3 * np.arccos(np.clip(c3, -1.0, 1.0))
+    th2 = (-np.arctan2(p13[..., 1], -p13[..., 0])
+           + np.arcsin(np.clip(a[2] * np.sin(th3) / np.maximum(n13, 1e-12), -1.0, 1.0)))
+    t34 = _inv(_dh(th2, d[1], a[1], alpha[1]) @ _dh(th3, d[2], a[2], alpha[2])) @ t14
+    th4 = np.arctan2(t34[..., 1, 0], t34[..., 0, 0])
+
+    q = np.stack([th1, th2, th3, th4, th5, th6], axis=-1)
+    q, in_limits = _wrap_to_seed(q, seed[:, None, :], lo, hi)
+    valid &= in_limits.all(axis=-1)
+
+    # Rank: valid first, then by max joint distance to the seed
+    cost = np.abs(q - seed[:, None, :]).max(axis=-1) + np.where(valid, 0.0, 1e6)
+    order = np.argsort(cost, axis=1, kind="stable")
+    return np.take_along_axis(q, order[..., None], axis=1), np.take_along_axis(valid, order, axis=1)
+
+
+def down_poses(positions, yaw=0.0):
+    """(B, 4, 4) TCP poses at ``positions`` with the tool pointing straight down, rotated ``yaw`` about it."""
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    yaw = np.broadcast_to(np.asarray(yaw, dtype=float), (len(positions),))
+    c, s = np.cos(yaw), np.sin(yaw)
+    poses = np.zeros((len(positions), 4, 4))
+    # Rz(yaw) @ Rx(pi): x = (c, s, 0), y = (s, -c, 0), z = (0, 0, -1)
+    poses[:, 0, 0], poses[:, 1, 0] = c, s
+    poses[:, 0, 1], poses[:, 1, 1] = s, -c
+    poses[:, 2, 2] = -1.0
+    poses[:, :3, 3] = positions
+    poses[:, 3, 3] = 1.0
+    return poses
+
+
+def ur_ik_down(model, positions, yaw=0.0, seed=None, tool_length=REACH_MAP_TOOL_LENGTH):
+    """ur_ik() for downward-facing TCP targets (``positions`` (B, 3) in the base frame)."""
+    return ur_ik(model, down_poses(positions, yaw), seed, tool_length)
+
+
+def ur_reachable(model, positions, yaws=(0.0, np.pi / 2, np.pi, -np.pi / 2), tool_length=REACH_MAP_TOOL_LENGTH):
+    """(B,) True where a downward-facing TCP has a valid branch at any of ``yaws``."""
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    reachable = np.zeros(len(positions), dtype=bool)
+    for yaw in yaws:
+        reachable |= ur_ik_down(model, positions, yaw, tool_length=tool_length)[1][:, 0]
+    return reachable
+
+
+def tcp_pose(model, q, tool_length=REACH_MAP_TOOL_LENGTH):
+    """(B, 4, 4) TCP poses for (B, 6) joint angles (forward kinematics of the same model)."""
+    spec = ROBOT_KINEMATICS[ur_model(model) or model]
+    return forward_kinematics(spec, np.asarray(q, dtype=float).reshape(-1, 6), tool_length)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytic IK for a downward-facing UR TCP")
+    parser.add_argument("model", choices=UR_MODELS)
+    parser.add_argument("xyz", type=float, nargs=3, help="TCP position in the base frame (m)")
+    parser.add_argument("--yaw", type=float, default=0.0, help="Tool yaw (deg)")
+    args = parser.parse_args()
+
+    solutions, valid = ur_ik_down(args.model, [args.xyz], math.radians(args.yaw))
+    for q, ok in zip(solutions[0], valid[0]):
+        err = np.linalg.norm(tcp_pose(args.model, q)[0, :3, 3] - args.xyz) if ok else float("nan")
+        print(f"{'ok ' if ok else '-- '} {np.round(q, 4)}  fk err {err:.2e} m")
+
+
+if __name__ == "__main__":
+    main()
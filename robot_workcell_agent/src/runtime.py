@@ -6,11 +6,22 @@ Scripts communicate via stdin/stdout using JSON format.
 For long-running scripts (like genesis_scene_builder), uses Popen to read
 stdout without waiting for the process to terminate.
 
+Trusted skills whose script is a thin CLI over an importable module (see
+IN_PROCESS_SKILLS) are called in-process instead, skipping interpreter
+start-up and the JSON round-trip. Set SKILLS_IN_PROCESS=0 to force
+subprocesses everywhere.
+
+With GENESIS_SIM_SERVER=1, Genesis runs are sent to a warm simulation
+server (genesis_scene_builder/scripts/sim_server.py, started on first
+use) instead of a fresh build_and_execute process.
+
 Pattern inspired by Anthropic custom skills and coleam00/custom-agent-with-skills.
 """
 
 import subprocess
+import importlib.util
 import json
+import os
 import sys
 import logging
 from pathlib import Path
@@ -24,6 +35,86 @@ SKILLS_DIR = Path(__file__).parent.parent / "skills"
 # Skills that run continuously (simulation loop) - use Popen instead of run
 LONG_RUNNING_SKILLS = {"genesis_scene_builder"}
 
+# Trusted (skill, script) pairs whose script is a thin CLI around an importable
+# module exposing solve(args: dict, verbose: bool, cache: bool) -> dict
+IN_PROCESS_SKILLS = {
+    ("placement_solver", "solve_placement"): "placement_core",
+}
+
+_skill_modules: Dict[str, Any] = {}
+
+
+def sim_server_enabled() -> bool:
+    """True when GENESIS_SIM_SERVER is set to 1/true/yes/on."""
+    return os.environ.get("GENESIS_SIM_SERVER", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def run_on_sim_server(input_data: Dict[str, Any], timeout: int = 900) -> Optional[Dict[str, Any]]:
+    """
+    Run a Stage 3 request on the warm simulation server (starting it if
+    needed). Returns None when the server cannot be reached or started, so
+    callers can fall back to a build_and_execute process.
+    """
+    try:
+        protocol = load_skill_module("genesis_scene_builder", "sim_protocol")
+    except Exception as e:
+        logger.warning(f"sim_server_unavailable: error={e}")
+        return None
+
+    def _log_event(event: Dict[str, Any]) -> None:
+        logger.info(f"🔵 sim_server: phase {event.get('index')} {event.get('phase')} ({event.get('elapsed_s')}s)")
+
+    try:
+        return protocol.simulate(input_data, timeout=timeout, on_event=_log_event)
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"sim_server_failed: address={protocol.default_address()}, error={e}")
+        return None
+
+
+def in_process_enabled() -> bool:
+    """True unless SKILLS_IN_PROCESS is set to 0/false/no/off."""
+    return os.environ.get("SKILLS_IN_PROCESS", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def load_skill_module(skill_name: str, module_name: str):
+    """
+    Import skills/<skill_name>/scripts/<module_name>.py once per process.
+
+    Skill script directories are not packages, so the module is loaded by
+    path and cached under a skill-qualified name.
+    """
+    key = f"skill_{skill_name}_{module_name}"
+    module = _skill_modules.get(key)
+    if module is None:
+        module_path = SKILLS_DIR / skill_name / "scripts" / f"{module_name}.py"
+        spec = importlib.util.spec_from_file_location(key, module_path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Cannot load skill module: {module_path}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[key] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(key, None)
+            raise
+        _skill_modules[key] = module
+    return module
+
+
+def skill_entry_point(skill_name: str, script_name: str):
+    """
+    In-process ``solve`` for a trusted skill script, or None when the script
+    must run as a subprocess (not trusted, disabled, or not importable here).
+    """
+    module_name = IN_PROCESS_SKILLS.get((skill_name, script_name))
+    if module_name is None or not in_process_enabled():
+        return None
+    try:
+        return load_skill_module(skill_name, module_name).solve
+    except Exception as e:
+        logger.warning(f"in_process_unavailable: skill={skill_name}, module={module_name}, error={e}")
+        return None
+
 
 def run_skill_script(
     skill_name: str,
@@ -34,9 +125,12 @@ def run_skill_script(
     """
     Execute a skill script with JSON input/output via stdin/stdout.
 
+    For trusted scripts in IN_PROCESS_SKILLS: calls the module's solve() directly.
     For normal scripts: uses subprocess.run (blocking).
     For long-running scripts (genesis): uses Popen to read JSON output
-    without waiting for the process to terminate (it keeps running).
+    without waiting for the process to terminate (it keeps running),
+    unless args request ``"headless": true``, in which case the script
+    exits after its result and runs like a normal script.
 
     Args:
         skill_name: Name of the skill (e.g., "request_interpreter")
@@ -74,13 +168,44 @@ def run_skill_script(
     logger.info(f"{json.dumps(args or {}, indent=2)}")
     logger.info(f"{'='*80}\n")
 
-    # Use Popen for long-running scripts (genesis simulation loop)
-    if skill_name in LONG_RUNNING_SKILLS:
+    # Trusted skills with an importable core run in-process
+    solve = skill_entry_point(skill_name, script_name)
+    if solve is not None:
+        return _run_in_process(skill_name, script_name, solve, args or {})
+
+    # Use Popen for long-running scripts (genesis simulation loop) or the warm
+    # simulation server; headless runs otherwise exit on their own
+    if skill_name in LONG_RUNNING_SKILLS and (sim_server_enabled() or not (args or {}).get("headless")):
         return _run_long_running_script(skill_name, script_name, script_path, input_json, timeout)
     else:
         return _run_short_script(skill_name, script_name, script_path, input_json, timeout)
 
 
+def _run_in_process(
+    skill_name: str,
+    script_name: str,
+    solve,
+    args: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Call a trusted skill's solve() directly; exceptions propagate like a failed script."""
+    try:
+        result = solve(args, verbose=False, cache=True)
+    except Exception as e:
+        logger.error(
+            f"script_error: skill={skill_name}, script={script_name}, in_process=True, error={e}"
+        )
+        raise
+
+    logger.info(f"\n{'='*80}\n📤 SCRIPT OUTPUT: {skill_name}/{script_name}\n{'-'*80}")
+    logger.info(f"{json.dumps(result, indent=2)}")
+    logger.info(f"{'='*80}\n")
+
+    logger.info(
+        f"script_success: skill={skill_name}, script={script_name}, in_process=True"
+    )
+    return result
+
+
 def _run_short_script(
     skill_name: str,
     script_name: str,
@@ -171,7 +296,15 @@ def _run_long_running_script(
     import queue
     import time
     import platform
-    
+
+    # Warm simulation server: no interpreter start-up, gs.init or rebuild of an identical scene
+    if skill_name == "genesis_scene_builder" and sim_server_enabled():
+        result = run_on_sim_server(json.loads(input_json), timeout=timeout)
+        if result is not None:
+            logger.info(f"script_success: skill={skill_name}, script={script_name}, sim_server={result.get('server')}")
+            return result
+        logger.warning("Simulation server unavailable; falling back to a build_and_execute process")
+
     logger.info(f"🚀 Starting long-running script: {skill_name}/{script_name}")
     logger.info(f"📦 Input JSON length: {len(input_json)} chars")
     
@@ -130,48 +130,51 @@ def run_skill_script_tool(
         # Store Stage 2 results for later use
         if skill_name == "placement_solver" and script_name == "solve_placement":
             if isinstance(result, dict) and result.get("status") == "success":
-                # CRITICAL: Auto-correct motion targets to match validated physics coordinates
-                # Values derived from genesis_world_pnp_7.py with BOX_SIZE=0.20:
-                #   PICK_Z  = 0.82 + 0.20 + 0.002 = 1.022
-                #   PLACE_Z = 0.15 + 0.20 + 0.025 = 0.375
-                #   box_spawn_z = 0.82 + 0.10 = 0.92
-                EXPECTED_TARGETS = {
-                    "pick_target_xyz": [0.65, 0.0, 1.022],
-                    "place_target_xyz": [0.0, 0.75, 0.375],
-                    "box_spawn_pos": [0.65, 0.0, 0.92]
-                }
+                # Optimized layouts carry their own targets — keep them. A reach/pso
+                # request that fell back ("greedy_fallback") is a greedy layout.
+                if result.get("layout_mode", "greedy") in ("greedy", "greedy_fallback"):
+                    # CRITICAL: Auto-correct motion targets to match validated physics coordinates
+                    # Values derived from genesis_world_pnp_7.py with BOX_SIZE=0.20:
+                    #   PICK_Z  = 0.82 + 0.20 + 0.002 = 1.022
+                    #   PLACE_Z = 0.15 + 0.20 + 0.025 = 0.375
+                    #   box_spawn_z = 0.82 + 0.10 = 0.92
+                    EXPECTED_TARGETS = {
+                        "pick_target_xyz": [0.65, 0.0, 1.022],
+                        "place_target_xyz": [0.0, 0.75, 0.375],
+                        "box_spawn_pos": [0.65, 0.0, 0.92]
+                    }
                 
-                motion_targets = result.get("motion_targets", {})
-                for target_name, expected_value in EXPECTED_TARGETS.items():
-                    current_value = motion_targets.get(target_name, [])
-                    # Check if values differ (with small tolerance for floating point)
-                    if not all(abs(a - b) < 0.001 for a, b in zip(current_value, expected_value)):
-                        #logger.warning(f"⚠️  Correcting {target_name} from {current_value} to {expected_value}")
-                        motion_targets[target_name] = expected_value
+                    motion_targets = result.get("motion_targets", {})
+                    for target_name, expected_value in EXPECTED_TARGETS.items():
+                        current_value = motion_targets.get(target_name, [])
+                        # Check if values differ (with small tolerance for floating point)
+                        if not all(abs(a - b) < 0.001 for a, b in zip(current_value, expected_value)):
+                            #logger.warning(f"⚠️  Correcting {target_name} from {current_value} to {expected_value}")
+                            motion_targets[target_name] = expected_value
                 
-                # Also update layout_coordinates to keep them consistent
-                layout_coords = result.get("layout_coordinates", {})
-                if "pick_target_xyz" in layout_coords:
-                    layout_coords["pick_target_xyz"] = EXPECTED_TARGETS["pick_target_xyz"]
-                if "place_target_xyz" in layout_coords:
-                    layout_coords["place_target_xyz"] = EXPECTED_TARGETS["place_target_xyz"]
-                if "box_spawn_pos" in layout_coords:
-                    layout_coords["box_spawn_pos"] = EXPECTED_TARGETS["box_spawn_pos"]
+                    # Also update layout_coordinates to keep them consistent
+                    layout_coords = result.get("layout_coordinates", {})
+                    if "pick_target_xyz" in layout_coords:
+                        layout_coords["pick_target_xyz"] = EXPECTED_TARGETS["pick_target_xyz"]
+                    if "place_target_xyz" in layout_coords:
+                        layout_coords["place_target_xyz"] = EXPECTED_TARGETS["place_target_xyz"]
+                    if "box_spawn_pos" in layout_coords:
+                        layout_coords["box_spawn_pos"] = EXPECTED_TARGETS["box_spawn_pos"]
                 
-                # CRITICAL: Also update carton position in optimized_components list.
-                # prepare_genesis_input() reads position directly from there, not from motion_targets.
-                correct_spawn = EXPECTED_TARGETS["box_spawn_pos"]
-                for comp in result.get("optimized_components", []):
-                    comp_type = comp.get("component_type", "").lower()
-                    if comp_type in ("carton", "box", "cardboard_box", "carton_to_palletize", "object"):
-                        old_pos = comp.get("position", [])
-                        if old_pos != correct_spawn:
-                            #logger.warning(f"⚠️  Correcting carton position in optimized_components from {old_pos} to {correct_spawn}")
-                            comp["position"] = correct_spawn
-                        # Also normalise component_type so downstream code always sees 'carton'
-                        if comp_type != "carton":
-                            logger.warning(f"⚠️  Normalising carton component_type from '{comp_type}' to 'carton'")
-                            comp["component_type"] = "carton"
+                    # CRITICAL: Also update carton position in optimized_components list.
+                    # prepare_genesis_input() reads position directly from there, not from motion_targets.
+                    correct_spawn = EXPECTED_TARGETS["box_spawn_pos"]
+                    for comp in result.get("optimized_components", []):
+                        comp_type = comp.get("component_type", "").lower()
+                        if comp_type in ("carton", "box", "cardboard_box", "carton_to_palletize", "object"):
+                            old_pos = comp.get("position", [])
+                            if old_pos != correct_spawn:
+                                #logger.warning(f"⚠️  Correcting carton position in optimized_components from {old_pos} to {correct_spawn}")
+                                comp["position"] = correct_spawn
+                            # Also normalise component_type so downstream code always sees 'carton'
+                            if comp_type != "carton":
+                                logger.warning(f"⚠️  Normalising carton component_type from '{comp_type}' to 'carton'")
+                                comp["component_type"] = "carton"
                 
                 ctx.deps.stage2_result = result
                 logger.info("✅ Stage 2 results stored in ctx.deps.stage2_result")
@@ -394,7 +397,8 @@ def prepare_genesis_input(
         "task_objective": stage1.get('task_objective', ''),
         "execute_trajectory": True,  # Always execute trajectory
         "motion_targets": stage2.get('motion_targets', {}),  # Pick/place targets from PSO
-        "z_lift": 0.35  # Z_HOVER from genesis_world_pnp_7.py
+        "z_lift": 0.35,  # Z_HOVER from genesis_world_pnp_7.py
+        "throughput_requirement": stage1.get('throughput_requirement') or {},  # Cycle-time target for the report
     }
     
     logger.info("✅ Added trajectory execution parameters: execute_trajectory=True, motion_targets, z_lift=0.35")
@@ -0,0 +1,100 @@
+"""Tests for the persistent Stage 2 layout cache (placement_core.LayoutCache)."""
+
+import copy
+
+import pytest
+
+from comparisons.benchmarks.common import load_skill_script, random_layout_inputs
+from comparisons.benchmarks.placement_inprocess import stage1_from_layout_input
+
+core = load_skill_script("placement_solver", "placement_core")
+
+LAYOUT_INPUT = random_layout_inputs(1, seed=0)[0]
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "placement_cache.sqlite3"
+    monkeypatch.setenv("PLACEMENT_CACHE_PATH", str(path))
+    yield path
+    for key, cache in list(core._layout_caches.items()):
+        if key[0] == str(path):
+            core.discard_layout_cache(cache)
+
+
+def test_second_solve_is_a_hit(cache_path):
+    options = {"layout_mode": "greedy"}
+    solved, info = core.cached_solve_layout(LAYOUT_INPUT, options, [], verbose=False)
+    assert (info["hit"], info["stored"], info["misses"]) == (False, True, 1)
+    again, info = core.cached_solve_layout(LAYOUT_INPUT, options, [], verbose=False)
+    assert (info["hit"], info["hits"], info["entries"]) == (True, 1, 1)
+    assert again == solved
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = core.LayoutCache(tmp_path / "lru.sqlite3", max_entries=3, version="test")
+    try:
+        for i in range(3):
+            cache.put(f"k{i}", {"i": i})
+        assert cache.get("k0") == {"i": 0}     # k0 is now newer than k1
+        cache.put("k3", {"i": 3})
+        assert cache.get("k1") is None
+        assert [cache.get(k) for k in ("k0", "k2", "k3")] == [{"i": 0}, {"i": 2}, {"i": 3}]
+        stats = cache.stats()
+        assert (stats["entries"], stats["evictions"]) == (3, 1)
+    finally:
+        cache.close()
+
+
+def test_entries_of_another_solver_version_are_dropped(tmp_path):
+    path = tmp_path / "versions.sqlite3"
+    old = core.LayoutCache(path, version="old")
+    old.put("k", {"v": 1})
+    old.close()
+    new = core.LayoutCache(path, version="new")
+    try:
+        assert new.get("k") is None
+        new.put("k2", {"v": 2})
+        assert new.stats()["entries"] == 1
+    finally:
+        new.close()
+
+
+def test_fingerprint_is_stable():
+    options = {"layout_mode": "reach", "cache": True}
+    key = core.layout_fingerprint(LAYOUT_INPUT, options, [[0.5, 0.5, 0.5]], version="v")
+    renamed = copy.deepcopy(LAYOUT_INPUT)
+    renamed["robot"]["name"] = "another_robot"
+    noisy = copy.deepcopy(LAYOUT_INPUT)
+    noisy["box"]["dimensions"] = [d + 1e-12 for d in noisy["box"]["dimensions"]]
+    assert core.layout_fingerprint(renamed, options, [[0.5, 0.5, 0.5]], version="v") == key
+    assert core.layout_fingerprint(noisy, options, [[0.5, 0.5, 0.5]], version="v") == key
+    assert core.layout_fingerprint(LAYOUT_INPUT, {"layout_mode": "reach"}, [[0.5, 0.5, 0.5]], version="v") == key
+    assert core.layout_fingerprint(LAYOUT_INPUT, options, [[0.5, 0.5, 0.5]], version="w") != key
+    assert core.layout_fingerprint(LAYOUT_INPUT, options, [], version="v") != key
+
+
+def test_pso_key_includes_budget_and_seed():
+    def key(pso=None):
+        options = {"layout_mode": "pso", **({"pso": pso} if pso is not None else {})}
+        return core.layout_fingerprint(LAYOUT_INPUT, options, [], version="v")
+
+    defaults = key()
+    assert key({"time_budget_s": core.PSO_DEFAULTS["time_budget_s"], "seed": core.PSO_DEFAULTS["seed"]}) == defaults
+    assert key({"time_budget_s": 2.0}) != defaults
+    assert key({"seed": 1}) != defaults
+
+
+def test_budget_limited_pso_layout_is_not_stored(cache_path):
+    options = {"layout_mode": "pso", "pso": {"time_budget_s": 0.0}}
+    solved, info = core.cached_solve_layout(LAYOUT_INPUT, options, [], verbose=False)
+    assert solved["pso_stats"]["stop_reason"] == "time_budget"
+    assert (info["stored"], info["entries"]) == (False, 0)
+
+
+def test_solve_leaves_no_cache_unless_asked(cache_path):
+    stage1 = stage1_from_layout_input(LAYOUT_INPUT)
+    assert "cache" not in core.solve(stage1, verbose=False)
+    assert not cache_path.exists()
+    assert core.solve(stage1, verbose=False, cache=True)["cache"]["stored"]
+    assert cache_path.exists()
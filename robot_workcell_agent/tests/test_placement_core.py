@@ -0,0 +1,139 @@
+"""Tests for the Stage 2 placement core (skills/placement_solver/scripts/placement_core.py)."""
+
+import json
+
+import numpy as np
+import pytest
+
+from comparisons.benchmarks.common import load_skill_script, random_layout_inputs
+
+core = load_skill_script("placement_solver", "placement_core")
+
+LAYOUT_INPUTS = random_layout_inputs(100, seed=0, max_length=6.0)
+
+
+@pytest.mark.parametrize("layout_input", LAYOUT_INPUTS)
+def test_grid_offsets_match_reference_stepping(layout_input):
+    config_json = json.dumps(layout_input)
+    reference = core.calculate_layout(config_json, offset_mode="reference", verbose=False)
+    grid = core.calculate_layout(config_json, offset_mode="grid", verbose=False)
+    assert json.dumps(grid) == json.dumps(reference)
+
+
+@pytest.mark.parametrize("axis, clearance", [(0, core.CONVEYOR_CLEARANCE), (1, core.PALLET_CLEARANCE)])
+def test_solve_offset_matches_reference_per_axis(axis, clearance):
+    rng = np.random.default_rng(1)
+    for _ in range(500):
+        dim = rng.uniform(0.1, 6.0, 3).round(3).tolist()
+        anchor_dim = rng.uniform(0.3, 1.0, 3).round(3).tolist()
+        anchor_pos = [0.0, 0.0, anchor_dim[2] / 2]
+        reference = core.solve_offset(dim, anchor_pos, anchor_dim, clearance, axis, mode="reference")
+        assert core.solve_offset(dim, anchor_pos, anchor_dim, clearance, axis, mode="grid") == reference
+
+
+@pytest.mark.parametrize("layout_input", LAYOUT_INPUTS)
+def test_tight_layouts_clear_the_pedestal(layout_input):
+    config_json = json.dumps(layout_input)
+    grid = core.calculate_layout(config_json, offset_mode="grid", verbose=False)
+    tight = core.calculate_layout(config_json, offset_mode="tight", verbose=False)
+    ped = layout_input["pedestal"]["dimensions"]
+    assert not core.check_2d_overlap(tight["conveyor_pos"], layout_input["conveyor"]["dimensions"],
+                                     tight["pedestal_pos"], ped, core.CONVEYOR_CLEARANCE)
+    assert not core.check_2d_overlap(tight["pallet_pos"], layout_input["pallet"]["dimensions"],
+                                     tight["pedestal_pos"], ped, core.PALLET_CLEARANCE)
+    assert tight["conveyor_pos"][0] <= grid["conveyor_pos"][0]
+    assert tight["pallet_pos"][1] <= grid["pallet_pos"][1]
+
+
+def test_round_like_python_matches_round():
+    rng = np.random.default_rng(2)
+    # Half of the values sit on (or next to) a 3-decimal tie, where np.round and round can disagree
+    ties = (rng.integers(0, 20000, 5000) + 0.5) / 1000.0 + rng.choice([0.0, 1e-17, -1e-17], 5000)
+    values = np.concatenate([ties, rng.uniform(-5.0, 5.0, 5000)])
+    for ndigits in (3, 4):
+        rounded = core._round_like_python(values, ndigits)
+        assert [repr(float(r)) for r in rounded] == [repr(round(float(v), ndigits)) for v in values]
+
+
+@pytest.mark.parametrize("mode", ["grid", "tight"])
+def test_batch_layouts_match_scalar_bit_for_bit(mode):
+    inputs = random_layout_inputs(2000, seed=3, max_length=6.0)
+    vectorized = core.layouts_to_dicts(core.calculate_layouts(core.stack_layout_inputs(inputs), offset_mode=mode))
+    for layout_input, batch in zip(inputs, vectorized):
+        scalar = core.calculate_layout(json.dumps(layout_input), offset_mode=mode, verbose=False)
+        for key in core.LAYOUT_KEYS:
+            assert [float(v).hex() for v in batch[key]] == [float(v).hex() for v in scalar[key]], key
+
+
+@pytest.mark.parametrize("quarter_turns", [0, 1])
+def test_axis_aligned_obb_agrees_with_check_2d_overlap(quarter_turns):
+    rng = np.random.default_rng(4)
+    for _ in range(2000):
+        # Millimetre grid, so touching cases come up and the 4-decimal rounding never decides
+        c1, c2 = rng.integers(-800, 800, (2, 2)) / 1000.0
+        d1, d2 = rng.integers(50, 1200, (2, 2)) / 1000.0
+        clearance = rng.choice([0.0, 0.01, 0.025])
+        expected = core.check_2d_overlap(c1, d1, c2, d2, clearance)
+        # A quarter turn of the second box with swapped dims covers the same footprint
+        d2_rotated = d2[::-1] if quarter_turns else d2
+        yaw2 = quarter_turns * np.pi / 2
+        assert core.obb_overlap(c1, d1, 0.0, c2, d2_rotated, yaw2, clearance) == expected
+
+
+@pytest.mark.parametrize("yaw", [0.3, np.pi / 4, 1.1, -2.0])
+def test_rotated_face_contact(yaw):
+    dim1, dim2 = np.array([0.6, 0.4]), np.array([0.5, 0.3])
+    axis = np.array([np.cos(yaw), np.sin(yaw)])
+    c1 = np.array([0.2, -0.1])
+    touching = c1 + axis * (dim1[0] + dim2[0]) / 2.0
+    assert not core.obb_overlap(c1, dim1, yaw, touching, dim2, yaw)
+    assert not core.obb_overlap(c1, dim1, yaw, touching + axis * 1e-6, dim2, yaw)
+    assert core.obb_overlap(c1, dim1, yaw, touching - axis * 1e-6, dim2, yaw)
+    assert core.obb_overlap(c1, dim1, yaw, touching, dim2, yaw, clearance=1e-6)
+
+
+def test_rotated_corner_contact():
+    # A 45 deg square whose corner touches the face of an axis-aligned square
+    dim = np.array([1.0, 1.0])
+    touching = np.array([0.5 + np.sqrt(0.5), 0.0])
+    assert not core.obb_overlap([0.0, 0.0], dim, 0.0, touching, dim, np.pi / 4)
+    assert core.obb_overlap([0.0, 0.0], dim, 0.0, touching - [1e-6, 0.0], dim, np.pi / 4)
+    # Diagonally, its face touches the square's corner while the enclosing
+    # axis-aligned boxes overlap by far
+    diagonal = np.full(2, 0.5 + 0.5 / np.sqrt(2.0))
+    assert not core.obb_overlap([0.0, 0.0], dim, 0.0, diagonal, dim, np.pi / 4)
+    assert core.obb_overlap([0.0, 0.0], dim, 0.0, diagonal - 1e-6, dim, np.pi / 4)
+    enclosing = 2.0 * core.rotated_half_extents(dim, np.pi / 4)
+    assert core.check_2d_overlap(diagonal, enclosing, [0.0, 0.0], dim, 0.0)
+
+
+def test_layout_pair_overlaps_matches_pairwise_obb_overlap():
+    rng = np.random.default_rng(5)
+    centers = rng.uniform(-1.0, 1.0, (8, 5, 2))
+    dims = rng.uniform(0.2, 0.9, (8, 5, 2))
+    yaws = rng.uniform(-np.pi, np.pi, (8, 5))
+    matrix = core.layout_pair_overlaps(centers, dims, yaws, clearance=0.01)
+    for b in range(8):
+        for i in range(5):
+            for j in range(5):
+                expected = i != j and core.obb_overlap(centers[b, i], dims[b, i], yaws[b, i],
+                                                       centers[b, j], dims[b, j], yaws[b, j], 0.01)
+                assert matrix[b, i, j] == expected
+
+
+def layer_key(layer):
+    """Order-free identity of one pattern layer: its (x, y, yaw) slots."""
+    return sorted(map(tuple, np.round(layer[:, [0, 1, 3]], 4)))
+
+
+@pytest.mark.parametrize("pattern", ["interlock", "pinwheel"])
+@pytest.mark.parametrize("pallet_dim, box_dim", [
+    ((1.2, 0.8, 0.15), (0.4, 0.3, 0.2)),
+    ((1.2, 1.0, 0.15), (0.4, 0.25, 0.2)),
+    ((1.2, 0.8, 0.15), (0.3, 0.2, 0.2)),
+])
+def test_alternate_layers_differ(pattern, pallet_dim, box_dim):
+    poses = core.pallet_pattern(pallet_dim, box_dim, pattern, layers=2)
+    per_layer = len(poses) // 2
+    assert per_layer > 0
+    assert layer_key(poses[:per_layer]) != layer_key(poses[per_layer:])